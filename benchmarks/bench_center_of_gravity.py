@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from shakespeare_geo.aggregate import center_of_gravity, center_of_gravity_frame
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare row-wise and vectorized center_of_gravity."
+    )
+    parser.add_argument("--min-exp", type=int, default=3, help="Smallest size as 10**n rows")
+    parser.add_argument("--max-exp", type=int, default=7, help="Largest size as 10**n rows")
+    parser.add_argument(
+        "--max-rows-dicts",
+        type=int,
+        default=1_000_000,
+        help="Skip the row-wise variant above this size (list of dicts does not fit in RAM)",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def make_frame(n_rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    lat = rng.uniform(35.0, 55.0, size=n_rows)
+    lon = rng.uniform(-10.0, 30.0, size=n_rows)
+    # Sprinkle in rows the masking has to drop.
+    lat[::97] = np.nan
+    return pd.DataFrame({"geocode_lat": lat, "geocode_lon": lon, "weight": 1.0})
+
+
+def best_of(repeat: int, fn) -> tuple[float, tuple[float, float]]:
+    best = float("inf")
+    result = (0.0, 0.0)
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main() -> None:
+    args = parse_args()
+    rng = np.random.default_rng(args.seed)
+    results = []
+
+    for exp in range(args.min_exp, args.max_exp + 1):
+        n_rows = 10**exp
+        frame = make_frame(n_rows, rng)
+        row = {"rows": n_rows}
+
+        vec_s, vec_cog = best_of(args.repeat, lambda: center_of_gravity_frame(frame))
+        row["vectorized_s"] = vec_s
+
+        if n_rows <= args.max_rows_dicts:
+            # Include the DataFrame -> records conversion run_play used to pay for.
+            dict_s, dict_cog = best_of(
+                args.repeat,
+                lambda: center_of_gravity(frame.to_dict(orient="records")),
+            )
+            row["rows_s"] = dict_s
+            row["speedup"] = dict_s / vec_s if vec_s else None
+            row["max_abs_diff"] = float(np.max(np.abs(np.subtract(vec_cog, dict_cog))))
+        results.append(row)
+        print(json.dumps(row))
+
+
+if __name__ == "__main__":
+    main()
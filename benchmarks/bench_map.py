@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from shakespeare_geo.map import MAP_MODES, build_map
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare build_map rendering modes.")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[100, 1000, 5000],
+        help="Number of places to render",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--keep-dir",
+        default=None,
+        help="Keep the generated HTML files here (e.g. to time them in a browser)",
+    )
+    return parser.parse_args()
+
+
+def make_places(n_places: int, rng: np.random.Generator) -> list[dict]:
+    lat = rng.uniform(30.0, 60.0, size=n_places)
+    lon = rng.uniform(-10.0, 40.0, size=n_places)
+    counts = rng.integers(1, 20, size=n_places)
+    return [
+        {
+            "normalized_place": f"Place {i}",
+            "geocode_name": f"Place {i}, Region, Country",
+            "geocode_lat": float(lat[i]),
+            "geocode_lon": float(lon[i]),
+            "mention_count": int(counts[i]),
+        }
+        for i in range(n_places)
+    ]
+
+
+def main() -> None:
+    args = parse_args()
+    rng = np.random.default_rng(args.seed)
+    out_dir = Path(args.keep_dir) if args.keep_dir else Path(tempfile.mkdtemp())
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    for n_places in args.sizes:
+        places = make_places(n_places, rng)
+        for mode in MAP_MODES:
+            path = out_dir / f"map_{mode}_{n_places}.html"
+            started = time.perf_counter()
+            build_map(45.0, 12.0, places, str(path), mode=mode)
+            elapsed = time.perf_counter() - started
+            html = path.read_text()
+            print(
+                json.dumps(
+                    {
+                        "places": n_places,
+                        "mode": mode,
+                        "build_s": round(elapsed, 4),
+                        "html_bytes": len(html.encode()),
+                        "html_lines": html.count("\n"),
+                        "path": str(path),
+                    }
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
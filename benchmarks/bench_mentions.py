@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import run_play
+from shakespeare_geo.parser import index_text_lines
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Time and peak memory of mention assembly and the geocode merge."
+    )
+    parser.add_argument("--mentions", type=int, default=100_000)
+    parser.add_argument("--places", type=int, default=2_000, help="Distinct place names")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def make_play(n_mentions: int, n_places: int, rng: np.random.Generator):
+    # One mention per dialogue line, a speaker change every few lines and a
+    # share of records without spans (resolved by text search).
+    places = [f"Town{i}" for i in range(n_places)]
+    place_ids = rng.integers(0, n_places, size=n_mentions)
+    lines = ["ACT I", "SCENE I"]
+    records = []
+    offset = sum(len(line) + 1 for line in lines)
+    for i, place_id in enumerate(place_ids.tolist()):
+        if i % 5 == 0:
+            speaker = f"SPEAKER {chr(ord('A') + i % 26)}."
+            lines.append(speaker)
+            offset += len(speaker) + 1
+        line = f"We ride to {places[place_id]} tonight."
+        start = offset + len("We ride to ")
+        has_span = i % 10 != 0
+        records.append(
+            {
+                "extraction_text": places[place_id],
+                "span_start": start if has_span else None,
+                "span_end": start + len(places[place_id]) if has_span else None,
+                "attributes": {
+                    "normalized_place": places[place_id],
+                    "entity_kind": "place",
+                    "place_granularity": "city" if place_id % 7 else "region",
+                    "is_real_world": "true",
+                    "should_keep": "true" if place_id % 11 else "false",
+                },
+            }
+        )
+        lines.append(line)
+        offset += len(line) + 1
+    geocodes = {
+        place: None
+        if i % 13 == 0
+        else {
+            "geocode_name": f"{place}, Country",
+            "geocode_lat": float(rng.uniform(35.0, 55.0)),
+            "geocode_lon": float(rng.uniform(-10.0, 30.0)),
+            "geocode_precision": "city" if i % 5 else "administrative",
+            "geocode_addresstype": "city" if i % 5 else "state",
+            "geocode_class": "place" if i % 5 else "boundary",
+            "geocode_id": f"relation:{i}",
+        }
+        for i, place in enumerate(places)
+    }
+    return "\n".join(lines) + "\n", records, geocodes
+
+
+def measure(fn):
+    # Timed and traced separately: tracemalloc slows allocation-heavy code
+    # several times over.
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main() -> None:
+    args = parse_args()
+    rng = np.random.default_rng(args.seed)
+    text, records, geocodes = make_play(args.mentions, args.places, rng)
+    contexts = index_text_lines(text)
+    play_args = run_play.parse_args(["--play-id", "bench", "--title", "Bench"])
+    play_args.output_dir = tempfile.mkdtemp()
+    play_args.bootstrap_resamples = 10
+
+    mentions, build_s, build_peak = measure(
+        lambda: run_play.build_mentions(text, contexts, records, play_args)
+    )
+    queries = run_play.geocode_candidates(mentions)
+    results = {query: geocodes[query] for query in queries}
+    summary, aggregate_s, aggregate_peak = measure(
+        lambda: run_play.aggregate_outputs(mentions, results, play_args, "bench")
+    )
+    print(
+        json.dumps(
+            {
+                "mentions": summary["mentions"],
+                "spatial": summary["spatial"],
+                "build_s": round(build_s, 3),
+                "build_peak_mb": round(build_peak / 2**20, 1),
+                "aggregate_s": round(aggregate_s, 3),
+                "aggregate_peak_mb": round(aggregate_peak / 2**20, 1),
+            }
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import types
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "scripts"))
+
+try:
+    import langextract  # noqa: F401
+except ImportError:
+    # Extractions are synthetic, so the LLM client is never called; this
+    # stand-in only lets run_play import where langextract is missing.
+    sys.modules["langextract"] = types.SimpleNamespace(
+        data=types.SimpleNamespace(ExampleData=object, Extraction=object),
+        extract=lambda **kwargs: None,
+    )
+
+import run_play
+from shakespeare_geo.checkpoint import STAGES
+from shakespeare_geo.parser import index_text_lines
+from synthetic_play import DEFAULT_MENTIONS_PER_1K_LINES, fake_geocode, make_play
+
+
+RSS_SAMPLE_S = 0.002
+_PAGE_BYTES = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Time each run_play stage on synthetic plays of 1x-100x Romeo and Juliet."
+    )
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 3, 10, 30, 100])
+    parser.add_argument("--mentions-per-1k-lines", type=float, default=DEFAULT_MENTIONS_PER_1K_LINES)
+    parser.add_argument("--bootstrap-resamples", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=1, help="Best-of-N timing per scale")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Write the full report here as JSON")
+    # Internal: run one scale in this process and print its result.
+    parser.add_argument("--single-scale", type=float, default=None, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def current_rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as handle:
+            return int(handle.read().split()[1]) * _PAGE_BYTES
+    except OSError:
+        # No /proc (e.g. macOS): fall back to the process high-water mark.
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+@contextmanager
+def stage_meter(report: dict, stage: str) -> Iterator[None]:
+    # Wall time plus peak RSS sampled on a background thread while the
+    # stage runs. Most of the process RSS is the interpreter and imports,
+    # so the growth over the stage's starting RSS is what the stage itself
+    # costs.
+    start_rss = current_rss_bytes()
+    peak = start_rss
+    done = threading.Event()
+
+    def sample() -> None:
+        nonlocal peak
+        while not done.wait(RSS_SAMPLE_S):
+            peak = max(peak, current_rss_bytes())
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        done.set()
+        sampler.join()
+        peak = max(peak, current_rss_bytes())
+        report[stage] = {
+            "seconds": round(elapsed, 4),
+            "peak_rss_mb": round(peak / 2**20, 1),
+            "rss_growth_mb": round((peak - start_rss) / 2**20, 1),
+        }
+
+
+def forbid_network() -> None:
+    # Everything is local or faked; make any stray request fail loudly
+    # instead of quietly timing the network.
+    def refuse(*args, **kwargs):
+        raise RuntimeError("benchmark stages must not open network connections")
+
+    socket.socket.connect = refuse
+    socket.create_connection = refuse
+
+
+def run_stages(scale: float, args: argparse.Namespace, workdir: Path) -> dict:
+    play = make_play(scale, args.mentions_per_1k_lines, args.seed)
+    play_args = run_play.parse_args(
+        [
+            "--play-id",
+            "synthetic",
+            "--title",
+            "Synthetic",
+            "--nominatim-email",
+            "bench@example.com",
+            "--output-dir",
+            str(workdir / "outputs"),
+            "--plays-dir",
+            str(workdir / "plays"),
+            "--geocode-cache",
+            str(workdir / "geocode_cache.json"),
+            "--bootstrap-resamples",
+            str(args.bootstrap_resamples),
+        ]
+    )
+    Path(play_args.output_dir).mkdir(parents=True, exist_ok=True)
+    Path(play_args.plays_dir).mkdir(parents=True, exist_ok=True)
+    (Path(play_args.plays_dir) / "synthetic.txt").write_text(play.text)
+    run_play.geocode_place = lambda query, session, user_agent, email, cache: cache.setdefault(
+        query, fake_geocode(query)
+    )
+
+    # Same order and calls as run_play.run, minus the checkpoint store.
+    stages: dict = {}
+    with stage_meter(stages, "load"):
+        text = run_play.load_play_text(play_args)
+    with stage_meter(stages, "index"):
+        contexts = index_text_lines(text)
+    with stage_meter(stages, "extract"):
+        records = [run_play.extraction_record(extraction) for extraction in play.extractions]
+    with stage_meter(stages, "filter"):
+        mentions = run_play.build_mentions(text, contexts, records, play_args)
+    with stage_meter(stages, "geocode"):
+        results = run_play.geocode_queries(run_play.geocode_candidates(mentions), play_args)
+    with stage_meter(stages, "aggregate"):
+        aggregate = run_play.aggregate_outputs(mentions, results, play_args, "bench")
+    with stage_meter(stages, "render"):
+        run_play.render_map(aggregate, play_args)
+
+    return {
+        "scale": scale,
+        "chars": len(text),
+        "lines": len(contexts),
+        "extractions": len(records),
+        "mentions": aggregate["mentions"],
+        "spatial": aggregate["spatial"],
+        "places": aggregate["places"],
+        "stages": stages,
+    }
+
+
+def run_scale(scale: float, args: argparse.Namespace) -> dict:
+    # Each scale (and repeat) runs in a fresh interpreter so one stage's
+    # peak RSS is not inflated by an earlier, larger run's heap.
+    best = None
+    for _ in range(max(1, args.repeat)):
+        command = [
+            sys.executable,
+            __file__,
+            "--single-scale",
+            str(scale),
+            "--mentions-per-1k-lines",
+            str(args.mentions_per_1k_lines),
+            "--bootstrap-resamples",
+            str(args.bootstrap_resamples),
+            "--seed",
+            str(args.seed),
+        ]
+        completed = subprocess.run(command, capture_output=True, text=True, check=True)
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        if best is None:
+            best = result
+            continue
+        for stage, metrics in result["stages"].items():
+            kept = best["stages"][stage]
+            kept["seconds"] = min(kept["seconds"], metrics["seconds"])
+            kept["peak_rss_mb"] = min(kept["peak_rss_mb"], metrics["peak_rss_mb"])
+            kept["rss_growth_mb"] = min(kept["rss_growth_mb"], metrics["rss_growth_mb"])
+    return best
+
+
+def scaling_exponents(results: list[dict]) -> dict[str, float | None]:
+    # Slope of log(time) against log(scale) between the smallest and largest
+    # run: ~1 is linear, ~2 is quadratic.
+    if len(results) < 2:
+        return {}
+    low, high = results[0], results[-1]
+    exponents = {}
+    for stage in STAGES:
+        t_low = low["stages"][stage]["seconds"]
+        t_high = high["stages"][stage]["seconds"]
+        if t_low <= 0 or t_high <= 0:
+            exponents[stage] = None
+            continue
+        exponents[stage] = round(
+            math.log(t_high / t_low) / math.log(high["scale"] / low["scale"]), 2
+        )
+    return exponents
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    if args.single_scale is not None:
+        forbid_network()
+        with tempfile.TemporaryDirectory() as workdir:
+            print(json.dumps(run_stages(args.single_scale, args, Path(workdir))))
+        return
+
+    results = []
+    for scale in sorted(args.scales):
+        result = run_scale(scale, args)
+        print(json.dumps(result), flush=True)
+        results.append(result)
+
+    report = {
+        "python": sys.version.split()[0],
+        "mentions_per_1k_lines": args.mentions_per_1k_lines,
+        "bootstrap_resamples": args.bootstrap_resamples,
+        "results": results,
+        "scaling_exponents": scaling_exponents(results),
+    }
+    print(json.dumps({"scaling_exponents": report["scaling_exponents"]}))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Rerun the stage benchmarks and fail if any stage is slower or "
+        "bigger than the committed baseline.",
+    )
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument(
+        "--time-tolerance",
+        type=float,
+        default=0.5,
+        help="Allowed relative slowdown per stage (0.5 = 50%% slower)",
+    )
+    parser.add_argument(
+        "--memory-tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed relative increase in a stage's RSS growth (peak over its starting RSS)",
+    )
+    parser.add_argument(
+        "--min-seconds",
+        type=float,
+        default=0.05,
+        help="Absolute slack added to every time limit, so millisecond stages do not flap",
+    )
+    parser.add_argument(
+        "--min-mb", type=float, default=2.0, help="Absolute slack on each stage's RSS growth"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Best-of-N runs per scale")
+    parser.add_argument(
+        "--update",
+        action="store_true",
+        help="Write the current measurements as the new baseline instead of comparing",
+    )
+    return parser.parse_args(argv)
+
+
+def compare(
+    baseline: dict,
+    current: dict,
+    time_tolerance: float,
+    memory_tolerance: float,
+    min_seconds: float,
+    min_mb: float,
+) -> list[dict]:
+    # One row per scale and stage; "regressed" is set when either metric is
+    # past baseline * (1 + tolerance) + slack.
+    current_by_scale = {result["scale"]: result for result in current["results"]}
+    rows = []
+    for base in baseline["results"]:
+        result = current_by_scale.get(base["scale"])
+        for stage, base_metrics in base["stages"].items():
+            metrics = (result or {}).get("stages", {}).get(stage)
+            if metrics is None:
+                rows.append({"scale": base["scale"], "stage": stage, "regressed": ["missing"]})
+                continue
+            time_limit = base_metrics["seconds"] * (1 + time_tolerance) + min_seconds
+            # Gated on what the stage adds over its starting RSS, not the
+            # process total, which is mostly interpreter and imports.
+            memory_limit = base_metrics["rss_growth_mb"] * (1 + memory_tolerance) + min_mb
+            regressed = []
+            if metrics["seconds"] > time_limit:
+                regressed.append("time")
+            if metrics["rss_growth_mb"] > memory_limit:
+                regressed.append("memory")
+            rows.append(
+                {
+                    "scale": base["scale"],
+                    "stage": stage,
+                    "base_s": base_metrics["seconds"],
+                    "current_s": metrics["seconds"],
+                    "base_mb": base_metrics["rss_growth_mb"],
+                    "current_mb": metrics["rss_growth_mb"],
+                    "regressed": regressed,
+                }
+            )
+    return rows
+
+
+def format_rows(rows: list[dict]) -> str:
+    lines = [
+        f"{'scale':>6} {'stage':<10} {'base s':>8} {'now s':>8} {'base +MB':>8} {'now +MB':>8}"
+    ]
+    for row in rows:
+        if "base_s" not in row:
+            lines.append(f"{row['scale']:>6g} {row['stage']:<10} {'missing':>8}")
+            continue
+        flag = f"  REGRESSED ({', '.join(row['regressed'])})" if row["regressed"] else ""
+        lines.append(
+            f"{row['scale']:>6g} {row['stage']:<10} {row['base_s']:>8.3f} {row['current_s']:>8.3f} "
+            f"{row['base_mb']:>8.1f} {row['current_mb']:>8.1f}{flag}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    # Imported here so compare() can be used without loading run_play.
+    import bench_stages
+
+    baseline_path = Path(args.baseline)
+    baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else None
+    if baseline is None and not args.update:
+        raise SystemExit(f"No baseline at {baseline_path}; create one with --update")
+
+    settings = baseline or {}
+    bench_args = bench_stages.parse_args(
+        [
+            "--mentions-per-1k-lines",
+            str(settings.get("mentions_per_1k_lines", bench_stages.DEFAULT_MENTIONS_PER_1K_LINES)),
+            "--bootstrap-resamples",
+            str(settings.get("bootstrap_resamples", 200)),
+            "--repeat",
+            str(args.repeat),
+        ]
+    )
+    scales = [result["scale"] for result in baseline["results"]] if baseline else [1.0, 10.0]
+    current = {
+        "python": sys.version.split()[0],
+        "mentions_per_1k_lines": bench_args.mentions_per_1k_lines,
+        "bootstrap_resamples": bench_args.bootstrap_resamples,
+        "results": [bench_stages.run_scale(scale, bench_args) for scale in scales],
+    }
+
+    if args.update:
+        baseline_path.write_text(json.dumps(current, indent=2) + "\n")
+        print(f"Baseline written: {baseline_path}")
+        return
+
+    rows = compare(
+        baseline,
+        current,
+        time_tolerance=args.time_tolerance,
+        memory_tolerance=args.memory_tolerance,
+        min_seconds=args.min_seconds,
+        min_mb=args.min_mb,
+    )
+    print(format_rows(rows))
+    regressions = [row for row in rows if row["regressed"]]
+    if regressions:
+        raise SystemExit(f"{len(regressions)} stage(s) regressed against {baseline_path}")
+    print("No regressions.")
+
+
+if __name__ == "__main__":
+    main()
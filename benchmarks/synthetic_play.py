@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import hashlib
+import random
+from dataclasses import dataclass, field
+
+
+# Rough shape of Romeo and Juliet in the Gutenberg text: five acts, about
+# 3,000 spoken lines and 150 placename mentions.
+ROMEO_AND_JULIET_SCENES_PER_ACT = 5
+ROMEO_AND_JULIET_LINES = 3_000
+DEFAULT_MENTIONS_PER_1K_LINES = 50.0
+# index_text_lines only recognises I/V/X numerals.
+MAX_SCENES_PER_ACT = 39
+
+SPEAKERS = [
+    "ROMEO",
+    "JULIET",
+    "NURSE",
+    "MERCUTIO",
+    "BENVOLIO",
+    "TYBALT",
+    "FRIAR LAWRENCE",
+    "CAPULET",
+    "LADY CAPULET",
+    "PRINCE",
+]
+WORDS = (
+    "and the of to my that is in you not with it me be his but for thy this "
+    "love night day sweet fair death heaven light name hand heart eyes true "
+    "come go speak stay hence away upon what shall would now here there"
+).split()
+_PREFIXES = ["Monte", "San", "Porto", "Castel", "Villa", "Borgo", "Rocca", "Terra"]
+_SUFFIXES = ["bello", "fiore", "nuovo", "alto", "verde", "rosso", "mare", "lago", "franco", "vecchio"]
+REAL_PLACES = ["Verona", "Mantua", "Padua", "Venice", "Rome", "Milan", "Florence", "Naples"]
+PLACES = REAL_PLACES + [prefix + suffix for prefix in _PREFIXES for suffix in _SUFFIXES]
+
+
+class FakeExtraction:
+    # Same shape as the langextract extractions run_play consumes.
+    def __init__(
+        self,
+        text: str,
+        start: int | None,
+        end: int | None,
+        normalized: str,
+        place_granularity: str = "city",
+    ):
+        self.extraction_text = text
+        if start is not None:
+            self.char_start = start
+            self.char_end = end
+        self.attributes = {
+            "normalized_place": normalized,
+            "entity_kind": "place",
+            "place_granularity": place_granularity,
+            "is_real_world": "true",
+            "should_keep": "true",
+        }
+        self.confidence = 0.9
+
+
+@dataclass
+class SyntheticPlay:
+    text: str
+    extractions: list[FakeExtraction] = field(default_factory=list)
+    dialogue_lines: int = 0
+
+
+def roman(number: int) -> str:
+    numerals = [(10, "X"), (9, "IX"), (5, "V"), (4, "IV"), (1, "I")]
+    result = ""
+    for value, numeral in numerals:
+        while number >= value:
+            result += numeral
+            number -= value
+    return result
+
+
+def make_play(
+    scale: float = 1.0,
+    mentions_per_1k_lines: float = DEFAULT_MENTIONS_PER_1K_LINES,
+    seed: int = 0,
+) -> SyntheticPlay:
+    # A play in the layout index_text_lines expects (acts, scenes, speaker
+    # headings, stage directions, dialogue) with scale x Romeo and Juliet's
+    # spoken lines. Mentions are mostly settlements with spans; some lack
+    # spans (resolved by text search) and some are countries or character
+    # names for the filters to reject.
+    rng = random.Random(seed)
+    total_lines = max(1, int(ROMEO_AND_JULIET_LINES * scale))
+    scenes_per_act = min(MAX_SCENES_PER_ACT, max(1, round(ROMEO_AND_JULIET_SCENES_PER_ACT * scale)))
+    lines_per_scene = max(1, total_lines // (5 * scenes_per_act))
+    mention_probability = mentions_per_1k_lines / 1000.0
+
+    parts: list[str] = []
+    offset = 0
+    extractions: list[FakeExtraction] = []
+    dialogue_lines = 0
+
+    def emit(line: str) -> int:
+        nonlocal offset
+        start = offset
+        parts.append(line)
+        offset += len(line) + 1
+        return start
+
+    for act in range(1, 6):
+        emit(f"ACT {roman(act)}")
+        emit("")
+        for scene in range(1, scenes_per_act + 1):
+            emit(f"SCENE {roman(scene)}. {rng.choice(REAL_PLACES)}. A public place.")
+            emit("")
+            emit(f"Enter {rng.choice(SPEAKERS)} and {rng.choice(SPEAKERS)}.")
+            emit("")
+            for line_no in range(lines_per_scene):
+                if line_no % 4 == 0:
+                    emit(f"{rng.choice(SPEAKERS)}.")
+                words = rng.choices(WORDS, k=rng.randint(5, 10))
+                mention = None
+                if rng.random() < mention_probability:
+                    kind = rng.random()
+                    if kind < 0.05:
+                        mention = ("France", "France", "country", True)
+                    elif kind < 0.10:
+                        mention = ("Romeo", "Romeo", "city", True)
+                    else:
+                        place = rng.choice(PLACES)
+                        mention = (place, place, "city", kind >= 0.20)
+                    words.insert(rng.randint(0, len(words)), mention[0])
+                words[0] = words[0][:1].upper() + words[0][1:]
+                line = " ".join(words) + rng.choice([",", ".", ";", "!"])
+                start = emit(line)
+                dialogue_lines += 1
+                if mention is not None:
+                    text, normalized, granularity, has_span = mention
+                    span_start = start + line.index(text) if has_span else None
+                    extractions.append(
+                        FakeExtraction(
+                            text,
+                            span_start,
+                            span_start + len(text) if has_span else None,
+                            normalized,
+                            granularity,
+                        )
+                    )
+            emit("")
+            emit("[_Exeunt._]")
+            emit("")
+
+    return SyntheticPlay("\n".join(parts) + "\n", extractions, dialogue_lines)
+
+
+def fake_geocode(query: str) -> dict:
+    # Deterministic coordinates around northern Italy.
+    digest = hashlib.sha256(query.encode("utf-8")).digest()
+    return {
+        "geocode_name": f"{query}, Italia",
+        "geocode_lat": 43.0 + digest[0] / 255.0 * 4.0,
+        "geocode_lon": 8.0 + digest[1] / 255.0 * 6.0,
+        "geocode_precision": "city",
+        "geocode_addresstype": "city",
+        "geocode_class": "place",
+        "geocode_id": f"relation:{int.from_bytes(digest[:4], 'big')}",
+    }
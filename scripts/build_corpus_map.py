@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+
+from shakespeare_geo.corpus import PLACES_SUFFIX
+from shakespeare_geo.map import build_corpus_map
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Build one layered map from every play's places CSV."
+    )
+    parser.add_argument(
+        "--outputs-dir",
+        default="outputs",
+        help="Directory containing {play_id}_places.csv files",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Where per-play layer JSON is cached (default: <outputs-dir>/.map_layers)",
+    )
+    parser.add_argument("--cog-method", choices=("arithmetic", "spherical"), default="spherical")
+    parser.add_argument("--output", default=None)
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Write a self-contained map: inlined Leaflet and a bundled coastline, no tiles",
+    )
+    parser.add_argument("--asset-cache-dir", default="data/map_assets")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    outputs_dir = Path(args.outputs_dir)
+    places_csvs = {
+        path.name[: -len(PLACES_SUFFIX)]: path
+        for path in sorted(outputs_dir.glob(f"*{PLACES_SUFFIX}"))
+    }
+    if not places_csvs:
+        raise ValueError(f"No *{PLACES_SUFFIX} files found in {outputs_dir}")
+
+    titles = {}
+    for play_id in places_csvs:
+        cog_json = outputs_dir / f"{play_id}_cog.json"
+        if cog_json.exists():
+            titles[play_id] = json.loads(cog_json.read_text()).get("play_title") or play_id
+
+    cache_dir = Path(args.cache_dir) if args.cache_dir else outputs_dir / ".map_layers"
+    output_path = Path(args.output) if args.output else outputs_dir / "corpus_map.html"
+    build_corpus_map(
+        places_csvs,
+        str(output_path),
+        cache_dir=cache_dir,
+        titles=titles,
+        cog_method=args.cog_method,
+        offline=args.offline,
+        asset_cache_dir=Path(args.asset_cache_dir),
+    )
+    print(f"Plays: {len(places_csvs)}")
+    print(f"Map:   {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+from shakespeare_geo.corpus import (
+    DEFAULT_BLOCK_CELLS,
+    DISTANCE_METRICS,
+    load_places_by_play,
+    play_distance_matrix,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Pairwise spatial dissimilarity between plays from their places CSVs."
+    )
+    parser.add_argument(
+        "--outputs-dir",
+        default="outputs",
+        help="Directory containing {play_id}_places.csv files",
+    )
+    parser.add_argument("--metric", choices=DISTANCE_METRICS, default="energy")
+    parser.add_argument(
+        "--block-cells",
+        type=int,
+        default=DEFAULT_BLOCK_CELLS,
+        help="Max place-by-place distances held in memory at once",
+    )
+    parser.add_argument("--output", default=None)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    outputs_dir = Path(args.outputs_dir)
+    places_by_play = load_places_by_play(outputs_dir)
+    if not places_by_play:
+        raise ValueError(f"No *_places.csv files found in {outputs_dir}")
+
+    matrix = play_distance_matrix(
+        places_by_play, metric=args.metric, block_cells=args.block_cells
+    )
+
+    output_path = (
+        Path(args.output)
+        if args.output
+        else outputs_dir / f"corpus_distance_{args.metric}.csv"
+    )
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    matrix.to_csv(output_path, index_label="play_id")
+    print(f"Plays:  {len(matrix)}")
+    print(f"Matrix: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
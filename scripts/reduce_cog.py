@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from shakespeare_geo.aggregate import CenterOfGravityAccumulator, merge_accumulators
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Combine per-play center-of-gravity partials into corpus or group centers."
+    )
+    parser.add_argument(
+        "--partials-dir",
+        default="outputs",
+        help="Directory containing {play_id}_cog.json files",
+    )
+    parser.add_argument(
+        "--groups",
+        default=None,
+        help="Optional CSV with play_id and group columns (e.g. genre)",
+    )
+    parser.add_argument("--method", choices=("arithmetic", "spherical"), default="arithmetic")
+    parser.add_argument("--output", default="outputs/corpus_cog.csv")
+    return parser.parse_args()
+
+
+def load_partials(partials_dir: Path) -> dict[str, CenterOfGravityAccumulator]:
+    partials = {}
+    for path in sorted(partials_dir.glob("*_cog.json")):
+        payload = json.loads(path.read_text())
+        partials[payload["play_id"]] = CenterOfGravityAccumulator.from_dict(
+            payload["accumulator"]
+        )
+    return partials
+
+
+def main() -> None:
+    args = parse_args()
+    partials = load_partials(Path(args.partials_dir))
+    if not partials:
+        raise ValueError(f"No *_cog.json partials found in {args.partials_dir}")
+
+    if args.groups:
+        groups_df = pd.read_csv(args.groups)
+        group_of = dict(zip(groups_df["play_id"], groups_df["group"]))
+    else:
+        group_of = {}
+
+    members: dict[str, list[CenterOfGravityAccumulator]] = {}
+    for play_id, partial in partials.items():
+        members.setdefault(group_of.get(play_id, "corpus"), []).append(partial)
+
+    rows = []
+    for group, parts in sorted(members.items()):
+        accumulator = merge_accumulators(parts)
+        cog_lat, cog_lon = accumulator.center(args.method)
+        rows.append(
+            {
+                "group": group,
+                "plays": len(parts),
+                "mention_count": accumulator.count,
+                "total_weight": accumulator.weight_sum,
+                "cog_lat": cog_lat,
+                "cog_lon": cog_lon,
+            }
+        )
+
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    pd.DataFrame(rows).to_csv(output_path, index=False)
+    print(f"Reduced {len(partials)} plays into {len(rows)} groups: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
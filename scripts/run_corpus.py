@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import argparse
+import json
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import Manager
+from pathlib import Path
+from typing import MutableMapping
+
+import pandas as pd
+
+import run_play
+from shakespeare_geo.geocode import load_cache, save_cache
+from shakespeare_geo.sink import SINK_FORMATS, MentionSink
+
+
+SUMMARY_COLUMNS = [
+    "play_id",
+    "play_title",
+    "status",
+    "error",
+    "seconds",
+    "mentions",
+    "kept",
+    "rejected",
+    "spatial",
+    "places",
+    "cog_lat",
+    "cog_lon",
+]
+
+# Set once per worker process by _init_worker.
+_SHARED: dict = {}
+# Wall-clock start of each play by play_id, so a play whose worker process
+# died still gets a runtime in the summary.
+_STARTED: MutableMapping[str, float] = {}
+
+
+def parse_args(argv: list[str] | None = None) -> tuple[argparse.Namespace, list[str]]:
+    parser = argparse.ArgumentParser(
+        description="Run run_play.py for every play in a manifest on a process pool.",
+        epilog="Any other options are passed through to run_play.py for every play.",
+    )
+    parser.add_argument(
+        "--manifest",
+        required=True,
+        help="JSON manifest from split_complete_works.py, or a CSV with play_id,title[,gutenberg_url]",
+    )
+    parser.add_argument("--workers", type=int, default=4, help="1 runs plays in-process, serially")
+    parser.add_argument(
+        "--llm-concurrency",
+        type=int,
+        default=2,
+        help="Plays allowed to call the LLM at the same time, across all workers",
+    )
+    parser.add_argument(
+        "--geocode-concurrency",
+        type=int,
+        default=1,
+        help="Concurrent Nominatim lookups across all workers (their policy is 1 req/s)",
+    )
+    parser.add_argument(
+        "--combined",
+        choices=SINK_FORMATS,
+        default=None,
+        help="Also stream every play's mentions into <output-dir>/corpus/ as plays finish, "
+        "with corpus place counts and CoG sums",
+    )
+    parser.add_argument("--summary", default=None, help="Default: <output-dir>/corpus_summary.csv")
+    return parser.parse_known_args(argv)
+
+
+def load_manifest(path: Path) -> list[dict]:
+    path = Path(path)
+    if path.suffix == ".json":
+        entries = json.loads(path.read_text())["plays"]
+    else:
+        entries = pd.read_csv(path, dtype=str).fillna("").to_dict(orient="records")
+
+    plays = []
+    for entry in entries:
+        if entry.get("kind", "play") != "play":
+            continue
+        plays.append(
+            {
+                "play_id": entry["play_id"],
+                "title": entry.get("title") or entry["play_id"],
+                "gutenberg_url": entry.get("gutenberg_url") or None,
+                # Split manifests point at the text files they wrote.
+                "plays_dir": str(Path(entry["path"]).parent) if entry.get("path") else None,
+            }
+        )
+    return plays
+
+
+def play_argv(play: dict, passthrough: list[str]) -> list[str]:
+    argv = ["--play-id", play["play_id"], "--title", play["title"]]
+    if play["gutenberg_url"]:
+        argv += ["--gutenberg-url", play["gutenberg_url"]]
+    if play["plays_dir"]:
+        argv += ["--plays-dir", play["plays_dir"]]
+    return argv + passthrough
+
+
+def _init_worker(geocode_cache, llm_limit, geocode_limit, started=None) -> None:
+    global _STARTED
+    if started is not None:
+        _STARTED = started
+    _SHARED.update(
+        geocode_cache=geocode_cache,
+        llm_limit=llm_limit,
+        geocode_limit=geocode_limit,
+    )
+
+
+def run_one(argv: list[str]) -> dict:
+    # Never raises: a failing play becomes a summary row and the rest of the
+    # corpus keeps going. --trace, --profile and --trace-memory write
+    # per-play reports; each worker runs one play at a time, so the
+    # process-wide tracer, profiler and tracemalloc see only that play.
+    args = run_play.parse_args(argv)
+    _STARTED[args.play_id] = time.time()
+    started = time.perf_counter()
+    try:
+        summary, _ = run_play.run_with_reports(args, **_SHARED)
+        summary["status"] = "ok"
+    except Exception as exc:
+        summary = {
+            "play_id": args.play_id,
+            "play_title": args.title,
+            "status": "failed",
+            "error": f"{type(exc).__name__}: {exc}",
+            "traceback": traceback.format_exc(),
+        }
+    summary["seconds"] = round(time.perf_counter() - started, 3)
+    return summary
+
+
+def run_corpus(
+    plays: list[dict],
+    passthrough: list[str],
+    workers: int,
+    llm_concurrency: int,
+    geocode_concurrency: int,
+    geocode_cache_path: Path,
+    sink: MentionSink | None = None,
+) -> list[dict]:
+    def collect(result: dict) -> None:
+        # The sink reads each play's mentions back from disk as it finishes,
+        # so the runner never holds more than one chunk of mentions.
+        if sink is not None and result["status"] == "ok":
+            sink.add_play(
+                result["play_id"], Path(result.get("mentions_parquet") or result["mentions_csv"])
+            )
+
+    argvs = [play_argv(play, passthrough) for play in plays]
+    if workers <= 1:
+        cache = load_cache(geocode_cache_path)
+        _init_worker(cache, None, None)
+        results = []
+        try:
+            for argv in argvs:
+                results.append(run_one(argv))
+                collect(results[-1])
+        finally:
+            save_cache(geocode_cache_path, cache)
+            _SHARED.clear()
+        return results
+
+    with Manager() as manager:
+        # One cache for every worker, so a place geocoded for one play is a
+        # hit for all the others; written back once at the end.
+        cache = manager.dict(load_cache(geocode_cache_path))
+        llm_limit = manager.BoundedSemaphore(max(1, llm_concurrency))
+        geocode_limit = manager.BoundedSemaphore(max(1, geocode_concurrency))
+        started = manager.dict()
+
+        results = []
+        try:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(cache, llm_limit, geocode_limit, started),
+            ) as pool:
+                futures = {pool.submit(run_one, argv): play for argv, play in zip(argvs, plays)}
+                for future in as_completed(futures):
+                    play = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as exc:
+                        # The worker process itself died (e.g. killed or OOM);
+                        # plays it never started took no time.
+                        started_at = started.get(play["play_id"])
+                        result = {
+                            "play_id": play["play_id"],
+                            "play_title": play["title"],
+                            "status": "failed",
+                            "error": f"{type(exc).__name__}: {exc}",
+                            "seconds": round(time.time() - started_at, 3) if started_at else 0.0,
+                        }
+                    print(f"[{result['status']}] {result['play_id']}", flush=True)
+                    collect(result)
+                    results.append(result)
+        finally:
+            save_cache(geocode_cache_path, dict(cache))
+
+    order = {play["play_id"]: i for i, play in enumerate(plays)}
+    return sorted(results, key=lambda result: order[result["play_id"]])
+
+
+def main(argv: list[str] | None = None) -> None:
+    args, passthrough = parse_args(argv)
+    plays = load_manifest(Path(args.manifest))
+    if not plays:
+        raise ValueError(f"No plays found in {args.manifest}")
+
+    # Defaults shared by every play (output dir, cache path) come from
+    # run_play's own parser.
+    play_defaults = run_play.parse_args(play_argv(plays[0], passthrough))
+    output_dir = Path(play_defaults.output_dir)
+    sink = (
+        MentionSink(output_dir, args.combined, merge_radius_km=play_defaults.merge_radius_km)
+        if args.combined
+        else None
+    )
+    try:
+        results = run_corpus(
+            plays,
+            passthrough,
+            workers=args.workers,
+            llm_concurrency=args.llm_concurrency,
+            geocode_concurrency=args.geocode_concurrency,
+            geocode_cache_path=Path(play_defaults.geocode_cache),
+            sink=sink,
+        )
+    except BaseException:
+        if sink is not None:
+            sink.abort()
+        raise
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    summary_csv = Path(args.summary) if args.summary else output_dir / "corpus_summary.csv"
+    pd.DataFrame(results, columns=SUMMARY_COLUMNS).to_csv(summary_csv, index=False)
+
+    for result in results:
+        if result["status"] != "ok" and result.get("traceback"):
+            print(f"--- {result['play_id']} ---\n{result['traceback']}")
+    failed = sum(result["status"] != "ok" for result in results)
+    print(f"Plays:   {len(results)} ({failed} failed)")
+    print(f"Summary: {summary_csv}")
+    if sink is not None:
+        combined = sink.close()
+        print(f"Combined: {Path(combined['mentions']).parent} ({sink.mentions} mentions)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,49 +1,215 @@
 from __future__ import annotations
 
 import argparse
+import json
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from dataclasses import asdict, fields
 from datetime import UTC, datetime
 from pathlib import Path
+from queue import Queue
+from typing import Callable, ContextManager, Iterable, MutableMapping
 
+import numpy as np
 import pandas as pd
 import requests
 
-from shakespeare_geo.aggregate import center_of_gravity
+from shakespeare_geo.aggregate import (
+    COG_METHODS,
+    CenterOfGravityAccumulator,
+    ConfidenceRegion,
+    DEFAULT_BOOTSTRAP_RESAMPLES,
+    DEFAULT_CONFIDENCE,
+    DEFAULT_MEDIAN_MAX_ITER,
+    DEFAULT_MEDIAN_TOL_KM,
+    PlaceAccumulator,
+    bootstrap_center_of_gravity_frame,
+    center_of_gravity_frame,
+    center_of_gravity_trajectory,
+)
+from shakespeare_geo import aggregate as aggregate_module
+from shakespeare_geo import filtering as filtering_module
+from shakespeare_geo import parser as parser_module
+from shakespeare_geo import memory, profiling, trace
+from shakespeare_geo.checkpoint import (
+    STAGES,
+    CheckpointStore,
+    content_hash,
+    file_hash,
+    reusable_stages,
+)
 from shakespeare_geo.config import DEFAULT_GUTENBERG_URL, DEFAULT_MODEL, DEFAULT_USER_AGENT
-from shakespeare_geo.extract import extract_places
+from shakespeare_geo.extract import PROMPT as EXTRACTION_PROMPT
+from shakespeare_geo.extract import DEFAULT_CHUNK_CHARS, extract_places, split_text_chunks
 from shakespeare_geo.filtering import (
     SETTLEMENT_GRANULARITIES,
     build_character_lexicon,
     llm_settlement_rejection_reason,
     normalize_text,
     parse_bool,
+    postfilter_rejection_reason,
     prefilter_rejection_reason,
 )
-from shakespeare_geo.geocode import geocode_place, load_cache, save_cache
+from shakespeare_geo.geocode import (
+    geocode_place,
+    load_cache,
+    normalize_cached_result,
+    save_cache,
+)
 from shakespeare_geo.gutenberg import (
     fetch_gutenberg_text,
     strip_gutenberg_header_footer,
     trim_play_front_matter,
 )
-from shakespeare_geo.map import build_map
+from shakespeare_geo.map import MAP_MODES, build_map
 from shakespeare_geo.parser import (
-    extract_sentence_for_span,
-    find_context_for_span,
+    LineContext,
+    context_indices_for_spans,
     find_span_for_text,
     index_text_lines,
+    sentences_for_spans,
 )
+from shakespeare_geo.spatial import DEFAULT_MERGE_RADIUS_KM, merge_near_duplicate_places
+from shakespeare_geo.tables import PARQUET_DIRNAME, write_play_partition
 
 
-def parse_args() -> argparse.Namespace:
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Extract and map placenames from a play.")
     parser.add_argument("--play-id", required=True, help="Short identifier, e.g. romeo_juliet")
     parser.add_argument("--title", required=True, help="Display title for the play")
     parser.add_argument("--gutenberg-url", default=DEFAULT_GUTENBERG_URL)
+    parser.add_argument(
+        "--mirror-dir",
+        default="data/raw",
+        help="Local mirror of downloaded Gutenberg sources and their ETag/Last-Modified",
+    )
+    parser.add_argument(
+        "--refresh-source",
+        action="store_true",
+        help="Revalidate the Gutenberg source (conditional GET) even if data/plays has a copy",
+    )
     parser.add_argument("--model", default=DEFAULT_MODEL)
     parser.add_argument("--user-agent", default=DEFAULT_USER_AGENT)
     parser.add_argument("--nominatim-email", default=os.environ.get("NOMINATIM_EMAIL"))
     parser.add_argument("--output-dir", default="outputs")
-    return parser.parse_args()
+    parser.add_argument("--plays-dir", default="data/plays")
+    parser.add_argument("--geocode-cache", default="data/geocode_cache.json")
+    parser.add_argument(
+        "--checkpoint-dir",
+        default=None,
+        help="Stage checkpoints (default: <output-dir>/.checkpoints)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip stages whose inputs are unchanged since their last checkpoint",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Extract in chunks and geocode each chunk's places while later chunks are "
+        "still with the LLM",
+    )
+    parser.add_argument("--extract-chunk-chars", type=int, default=DEFAULT_CHUNK_CHARS)
+    parser.add_argument(
+        "--extract-workers",
+        type=int,
+        default=2,
+        help="Chunks in flight with the LLM at once in --pipeline mode",
+    )
+    parser.add_argument(
+        "--refilter",
+        action="store_true",
+        help="Re-apply filters to cached extractions and geocodes (no LLM or network) "
+        "and write a keep/reject diff",
+    )
+    parser.add_argument(
+        "--from-stage",
+        choices=STAGES,
+        default=None,
+        help="Rerun this stage and every later one, reusing earlier checkpoints",
+    )
+    parser.add_argument(
+        "--cog-method",
+        choices=COG_METHODS,
+        default="arithmetic",
+        help="How to combine mention coordinates into the center of gravity",
+    )
+    parser.add_argument(
+        "--median-tol-km",
+        type=float,
+        default=DEFAULT_MEDIAN_TOL_KM,
+        help="Stop geometric median iteration once a step is shorter than this",
+    )
+    parser.add_argument(
+        "--median-max-iter",
+        type=int,
+        default=DEFAULT_MEDIAN_MAX_ITER,
+        help="Maximum Weiszfeld iterations for the geometric median",
+    )
+    parser.add_argument(
+        "--bootstrap-resamples",
+        type=int,
+        default=DEFAULT_BOOTSTRAP_RESAMPLES,
+        help="Bootstrap resamples for CoG confidence regions (0 disables)",
+    )
+    parser.add_argument("--confidence", type=float, default=DEFAULT_CONFIDENCE)
+    parser.add_argument("--bootstrap-seed", type=int, default=None)
+    parser.add_argument(
+        "--merge-radius-km",
+        type=float,
+        default=DEFAULT_MERGE_RADIUS_KM,
+        help="Merge same-named places geocoded within this distance (0 disables)",
+    )
+    parser.add_argument(
+        "--map-mode",
+        choices=MAP_MODES,
+        default="markers",
+        help="markers: one folium marker per place; geojson: one clustered GeoJSON layer",
+    )
+    parser.add_argument(
+        "--parquet",
+        action="store_true",
+        help="Also write typed mentions and places tables to <output-dir>/parquet/, "
+        "partitioned by play_id",
+    )
+    parser.add_argument(
+        "--offline-map",
+        action="store_true",
+        help="Write a self-contained map: inlined Leaflet and a bundled coastline, no tiles",
+    )
+    parser.add_argument(
+        "--map-asset-cache-dir",
+        default="data/map_assets",
+        help="Where Leaflet JS/CSS are cached for offline maps",
+    )
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="Time each stage and count cache hits, requests and bytes written; "
+        "writes <output-dir>/<play-id>_trace.json and prints a summary",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="cProfile each stage into <output-dir>/profile/<play-id>/<stage>.pstats and "
+        "write sampled stacks.collapsed for flamegraph tools",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Record each stage's peak and retained Python heap and the sites holding the "
+        "retained memory with tracemalloc; writes <output-dir>/<play-id>_memory.json",
+    )
+    parser.add_argument(
+        "--memory-top",
+        type=int,
+        default=memory.DEFAULT_TOP_SITES,
+        help="Retained-memory sites to keep per stage with --trace-memory",
+    )
+    return parser.parse_args(argv)
 
 
 def first_non_none(*values: object) -> object | None:
@@ -69,16 +235,6 @@ def coerce_optional_int(value: object) -> int | None:
         return None
 
 
-def first_non_empty(values: pd.Series) -> str | None:
-    for value in values:
-        if pd.isna(value):
-            continue
-        text = str(value).strip()
-        if text:
-            return text
-    return None
-
-
 def is_subtoken_span(text: str, span_start: int | None, span_end: int | None) -> bool:
     if span_start is None or span_end is None:
         return False
@@ -94,98 +250,180 @@ def is_settlement_scope(place_granularity: str | None) -> bool:
     return normalize_text(place_granularity) in SETTLEMENT_GRANULARITIES
 
 
-def main() -> None:
-    args = parse_args()
-    run_id = datetime.now(UTC).strftime("%Y%m%dT%H%M%SZ")
+MENTION_COLUMNS = [
+    "play_id",
+    "play_title",
+    "act",
+    "scene",
+    "line",
+    "speaker",
+    "mention_text",
+    "mention_sentence",
+    "span_start",
+    "span_end",
+    "normalized_place",
+    "entity_kind",
+    "place_granularity",
+    "settlement_scope",
+    "is_real_world",
+    "should_keep_llm",
+    "spatial_usable",
+    "spatial_blocked_reason",
+    "geocode_query",
+    "geocode_name",
+    "geocode_lat",
+    "geocode_lon",
+    "geocode_precision",
+    "geocode_addresstype",
+    "geocode_class",
+    "geocode_id",
+    "keep",
+    "rejected_reason",
+    "source_url",
+    "model_name",
+    "run_id",
+]
+# Nullable ints so spans and lines survive missing values (and checkpoint
+# round trips) as ints rather than floats.
+MENTION_DTYPES = {"line": "Int64", "span_start": "Int64", "span_end": "Int64"}
+GEOCODE_COLUMNS = [
+    "geocode_name",
+    "geocode_lat",
+    "geocode_lon",
+    "geocode_precision",
+    "geocode_addresstype",
+    "geocode_class",
+    "geocode_id",
+]
 
-    if "you@example.com" in args.user_agent and not args.nominatim_email:
-        raise ValueError(
-            "Set a real --user-agent and/or NOMINATIM_EMAIL for Nominatim requests."
+
+def limited(limit: object | None) -> ContextManager:
+    # Shared semaphores from the corpus runner; a no-op for single-play runs.
+    return limit if limit is not None else nullcontext()
+
+
+def limited_geocode(
+    query: str,
+    session: requests.Session,
+    args: argparse.Namespace,
+    cache: MutableMapping[str, dict | None],
+    geocode_limit: object | None = None,
+) -> dict | None:
+    # Only lookups headed for Nominatim take the shared limit, so one corpus
+    # worker's slow request does not hold up another's cache hits.
+    is_hit = query in cache and not normalize_cached_result(cache[query])[1]
+    with limited(None if is_hit else geocode_limit):
+        return geocode_place(
+            query=query,
+            session=session,
+            user_agent=args.user_agent,
+            email=args.nominatim_email,
+            cache=cache,
         )
 
-    output_dir = Path(args.output_dir)
-    output_dir.mkdir(parents=True, exist_ok=True)
 
-    play_path = Path("data/plays") / f"{args.play_id}.txt"
+def extraction_record(extraction: object) -> dict:
+    # Plain-dict form of an LLM extraction, resolving the span fields the
+    # various extraction shapes use; this is what the extract checkpoint
+    # stores.
+    attrs = dict(getattr(extraction, "attributes", None) or {})
+    extraction_text = getattr(extraction, "extraction_text", None) or getattr(
+        extraction, "text", None
+    )
+    span_start = coerce_optional_int(
+        first_non_none(
+            getattr(extraction, "char_start", None),
+            getattr(extraction, "start", None),
+            attrs.get("span_start"),
+            attrs.get("char_start"),
+            attrs.get("start"),
+        )
+    )
+    span_end = coerce_optional_int(
+        first_non_none(
+            getattr(extraction, "char_end", None),
+            getattr(extraction, "end", None),
+            attrs.get("span_end"),
+            attrs.get("char_end"),
+            attrs.get("end"),
+        )
+    )
+    return {
+        "extraction_text": extraction_text,
+        "span_start": span_start,
+        "span_end": span_end,
+        "attributes": attrs,
+    }
+
+
+def load_play_text(args: argparse.Namespace) -> str:
+    play_path = Path(args.plays_dir) / f"{args.play_id}.txt"
     play_path.parent.mkdir(parents=True, exist_ok=True)
 
-    if play_path.exists():
+    if play_path.exists() and not args.refresh_source:
+        # Copies saved before front-matter trimming existed still need it.
         text = play_path.read_text()
+        trimmed_text = trim_play_front_matter(text)
+        if trimmed_text != text:
+            text = trimmed_text
+            play_path.write_text(text)
+            trace.count_bytes(play_path)
     else:
-        raw = fetch_gutenberg_text(args.gutenberg_url)
+        raw = fetch_gutenberg_text(args.gutenberg_url, mirror_dir=Path(args.mirror_dir))
+        # strip_gutenberg_header_footer already trims front matter, except
+        # when the source has no START/END markers and comes back unchanged.
+        # Stripping always drops the marker lines, so equal means unmarked.
         text = strip_gutenberg_header_footer(raw)
+        if text == raw:
+            text = trim_play_front_matter(raw)
         play_path.write_text(text)
+        trace.count_bytes(play_path)
+    return text
 
-    trimmed_text = trim_play_front_matter(text)
-    if trimmed_text != text:
-        text = trimmed_text
-        play_path.write_text(text)
 
-    contexts = index_text_lines(text)
-    character_lexicon = build_character_lexicon(ctx.speaker for ctx in contexts)
+def map_unique(func: Callable[..., object], *columns: Iterable[object]) -> list[object]:
+    # The filter rules depend only on a few low-cardinality attributes, so
+    # each distinct combination is evaluated once.
+    results: dict[tuple, object] = {}
+    values = []
+    for key in zip(*columns):
+        if key not in results:
+            results[key] = func(*key)
+        values.append(results[key])
+    return values
 
-    extractions = extract_places(text=text, model_id=args.model)
-
-    mention_columns = [
-        "play_id",
-        "play_title",
-        "act",
-        "scene",
-        "line",
-        "speaker",
-        "mention_text",
-        "mention_sentence",
-        "span_start",
-        "span_end",
-        "normalized_place",
-        "entity_kind",
-        "place_granularity",
-        "settlement_scope",
-        "is_real_world",
-        "should_keep_llm",
-        "spatial_usable",
-        "spatial_blocked_reason",
-        "geocode_query",
-        "geocode_name",
-        "geocode_lat",
-        "geocode_lon",
-        "geocode_precision",
-        "geocode_addresstype",
-        "geocode_class",
-        "geocode_id",
-        "keep",
-        "rejected_reason",
-        "source_url",
-        "model_name",
-        "run_id",
-    ]
 
-    mentions = []
-    fallback_search_cursor = 0
-    for extraction in extractions:
-        attrs = extraction.attributes or {}
-        extraction_text = getattr(extraction, "extraction_text", None) or getattr(
-            extraction, "text", None
-        )
-        span_start = coerce_optional_int(
-            first_non_none(
-                getattr(extraction, "char_start", None),
-                getattr(extraction, "start", None),
-                attrs.get("span_start"),
-                attrs.get("char_start"),
-                attrs.get("start"),
-            )
-        )
-        span_end = coerce_optional_int(
-            first_non_none(
-                getattr(extraction, "char_end", None),
-                getattr(extraction, "end", None),
-                attrs.get("span_end"),
-                attrs.get("char_end"),
-                attrs.get("end"),
-            )
-        )
+def mention_frame(data: dict[str, list] | pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame(data, columns=MENTION_COLUMNS).astype(MENTION_DTYPES)
+
+
+def mention_columns(mentions: pd.DataFrame) -> dict[str, list]:
+    # JSON-safe column lists (missing values as None) for checkpoints and
+    # stage keys; mention_frame() turns them back into the same frame.
+    return {
+        column: [None if pd.isna(value) else value for value in values.tolist()]
+        for column, values in mentions.items()
+    }
 
+
+def build_mentions(
+    text: str,
+    contexts: list[LineContext],
+    records: list[dict],
+    args: argparse.Namespace,
+    search_start: int = 0,
+) -> pd.DataFrame:
+    # Built column by column: spans are resolved in one pass, then lines,
+    # sentences and filter reasons are looked up in batches for the
+    # dialogue mentions only.
+    character_lexicon = build_character_lexicon(ctx.speaker for ctx in contexts)
+    extraction_texts = [record["extraction_text"] for record in records]
+    span_starts = []
+    span_ends = []
+    fallback_search_cursor = search_start
+    for extraction_text, record in zip(extraction_texts, records):
+        span_start = record["span_start"]
+        span_end = record["span_end"]
         if span_start is None:
             span_start, inferred_end, fallback_search_cursor = find_span_for_text(
                 text=text,
@@ -196,198 +434,709 @@ def main() -> None:
                 span_end = inferred_end
         if span_start is not None and span_end is None and extraction_text:
             span_end = span_start + len(extraction_text)
+        span_starts.append(span_start)
+        span_ends.append(span_end)
 
-        mention_sentence = extract_sentence_for_span(
-            text=text,
-            span_start=span_start,
-            span_end=span_end,
-        )
+    context_indices = context_indices_for_spans(
+        contexts, np.array([start or 0 for start in span_starts], dtype=np.int64)
+    )
+    dialogue = [
+        i
+        for i, context_index in enumerate(context_indices.tolist())
+        if context_index >= 0 and contexts[context_index].is_dialogue
+    ]
+    line_contexts = [contexts[context_indices[i]] for i in dialogue]
+    attrs = [records[i]["attributes"] for i in dialogue]
+    extraction_texts = [extraction_texts[i] for i in dialogue]
+    span_starts = [span_starts[i] for i in dialogue]
+    span_ends = [span_ends[i] for i in dialogue]
 
-        normalized_place = attrs.get("normalized_place") or extraction_text
-        entity_kind = attrs.get("entity_kind")
-        place_granularity = (
-            attrs.get("place_granularity")
-            or attrs.get("place_type")
-            or attrs.get("normalized_type")
-        )
-        is_real_world = attrs.get("is_real_world")
-        if is_real_world is None and attrs.get("is_fictional") is not None:
-            is_fictional = parse_bool(attrs.get("is_fictional"))
+    normalized_places = [
+        a.get("normalized_place") or extraction_text
+        for a, extraction_text in zip(attrs, extraction_texts)
+    ]
+    entity_kinds = [a.get("entity_kind") for a in attrs]
+    place_granularities = [
+        a.get("place_granularity") or a.get("place_type") or a.get("normalized_type")
+        for a in attrs
+    ]
+    is_real_worlds = [a.get("is_real_world") for a in attrs]
+    for i, a in enumerate(attrs):
+        if is_real_worlds[i] is None and a.get("is_fictional") is not None:
+            is_fictional = parse_bool(a.get("is_fictional"))
             if is_fictional is not None:
-                is_real_world = not is_fictional
-        should_keep_llm = attrs.get("should_keep")
-
-        llm_rejection_reason = llm_settlement_rejection_reason(
-            entity_kind=entity_kind,
-            place_granularity=place_granularity,
-            is_real_world=is_real_world,
-            should_keep=should_keep_llm,
-        )
+                is_real_worlds[i] = not is_fictional
+    should_keep_llm = [a.get("should_keep") for a in attrs]
 
-        pre_rejection_reason = None
-        if llm_rejection_reason is None:
-            pre_rejection_reason = prefilter_rejection_reason(
-                mention_text=extraction_text,
-                normalized_place=normalized_place,
-                character_lexicon=character_lexicon,
+    llm_rejection_reasons = map_unique(
+        lambda entity_kind, place_granularity, is_real_world, should_keep: (
+            llm_settlement_rejection_reason(
+                entity_kind=entity_kind,
+                place_granularity=place_granularity,
+                is_real_world=is_real_world,
+                should_keep=should_keep,
             )
-        if pre_rejection_reason is None and is_subtoken_span(text, span_start, span_end):
-            pre_rejection_reason = "pre_subtoken_span"
+        ),
+        entity_kinds,
+        place_granularities,
+        is_real_worlds,
+        should_keep_llm,
+    )
+    pre_rejection_reasons = map_unique(
+        lambda mention_text, normalized_place: prefilter_rejection_reason(
+            mention_text=mention_text,
+            normalized_place=normalized_place,
+            character_lexicon=character_lexicon,
+        ),
+        extraction_texts,
+        normalized_places,
+    )
+    rejection_reasons = []
+    for llm_reason, pre_reason, span_start, span_end in zip(
+        llm_rejection_reasons, pre_rejection_reasons, span_starts, span_ends
+    ):
+        if llm_reason is not None:
+            rejection_reasons.append(llm_reason)
+        elif pre_reason is None and is_subtoken_span(text, span_start, span_end):
+            rejection_reasons.append("pre_subtoken_span")
+        else:
+            rejection_reasons.append(pre_reason)
 
-        rejection_reason = llm_rejection_reason or pre_rejection_reason
-        keep = rejection_reason is None
-        settlement_scope = is_settlement_scope(place_granularity)
+    n_mentions = len(dialogue)
+    return mention_frame(
+        {
+            "play_id": [args.play_id] * n_mentions,
+            "play_title": [args.title] * n_mentions,
+            "act": [ctx.act for ctx in line_contexts],
+            "scene": [ctx.scene for ctx in line_contexts],
+            "line": [ctx.line_no for ctx in line_contexts],
+            "speaker": [ctx.speaker for ctx in line_contexts],
+            "mention_text": extraction_texts,
+            "mention_sentence": sentences_for_spans(text, span_starts, span_ends),
+            "span_start": span_starts,
+            "span_end": span_ends,
+            "normalized_place": normalized_places,
+            "entity_kind": entity_kinds,
+            "place_granularity": place_granularities,
+            "settlement_scope": map_unique(is_settlement_scope, place_granularities),
+            "is_real_world": is_real_worlds,
+            "should_keep_llm": should_keep_llm,
+            "spatial_usable": [False] * n_mentions,
+            "spatial_blocked_reason": [None] * n_mentions,
+            "geocode_query": normalized_places,
+            **{column: [None] * n_mentions for column in GEOCODE_COLUMNS},
+            "keep": [reason is None for reason in rejection_reasons],
+            "rejected_reason": rejection_reasons,
+            "source_url": [args.gutenberg_url] * n_mentions,
+            "model_name": [args.model] * n_mentions,
+            "run_id": [None] * n_mentions,
+        }
+    )
 
-        ctx = find_context_for_span(contexts, span_start if span_start is not None else 0)
-        if ctx is None or not ctx.is_dialogue:
-            continue
 
-        mentions.append(
-            {
-                "play_id": args.play_id,
-                "play_title": args.title,
-                "act": ctx.act if ctx else None,
-                "scene": ctx.scene if ctx else None,
-                "line": ctx.line_no if ctx else None,
-                "speaker": ctx.speaker if ctx else None,
-                "mention_text": extraction_text,
-                "mention_sentence": mention_sentence,
-                "span_start": span_start,
-                "span_end": span_end,
-                "normalized_place": normalized_place,
-                "entity_kind": entity_kind,
-                "place_granularity": place_granularity,
-                "settlement_scope": settlement_scope,
-                "is_real_world": is_real_world,
-                "should_keep_llm": should_keep_llm,
-                "spatial_usable": False,
-                "spatial_blocked_reason": None,
-                "geocode_query": normalized_place,
-                "geocode_name": None,
-                "geocode_lat": None,
-                "geocode_lon": None,
-                "geocode_precision": None,
-                "geocode_addresstype": None,
-                "geocode_class": None,
-                "geocode_id": None,
-                "keep": keep,
-                "rejected_reason": rejection_reason,
-                "source_url": args.gutenberg_url,
-                "model_name": args.model,
-                "run_id": run_id,
-            }
-        )
+def geocode_candidates(mentions: pd.DataFrame) -> list[str]:
+    queries = mentions.loc[mentions["keep"] == True, "geocode_query"].dropna()
+    return sorted(query for query in queries.unique() if query)
 
-    cache_path = Path("data/geocode_cache.json")
-    cache = load_cache(cache_path)
+
+def geocode_queries(
+    queries: list[str],
+    args: argparse.Namespace,
+    geocode_cache: MutableMapping[str, dict | None] | None = None,
+    geocode_limit: object | None = None,
+) -> dict[str, dict | None]:
+    cache_path = Path(args.geocode_cache)
+    cache = load_cache(cache_path) if geocode_cache is None else geocode_cache
 
     session = requests.Session()
     geocode_results = {}
 
-    geocode_candidates = sorted(
-        {
-            m["geocode_query"]
-            for m in mentions
-            if m.get("keep") is True and m.get("geocode_query")
-        }
+    for place in queries:
+        geocode_results[place] = limited_geocode(place, session, args, cache, geocode_limit)
+
+    # A shared cache is saved once by whoever owns it.
+    if geocode_cache is None:
+        save_cache(cache_path, cache)
+    return geocode_results
+
+
+def offset_record(record: dict, offset: int) -> dict:
+    shifted = dict(record)
+    for key in ("span_start", "span_end"):
+        if shifted[key] is not None:
+            shifted[key] += offset
+    return shifted
+
+
+def pipelined_extract_geocode(
+    text: str,
+    contexts: list[LineContext],
+    args: argparse.Namespace,
+    geocode_cache: MutableMapping[str, dict | None] | None = None,
+    llm_limit: object | None = None,
+    geocode_limit: object | None = None,
+) -> tuple[list[dict], pd.DataFrame, dict[str, dict | None]]:
+    # Producer/consumer: the play is sent to the LLM in chunks, each chunk's
+    # extractions are resolved and filtered as soon as they return, and new
+    # geocode queries go onto a queue drained by one geocoder thread. The
+    # rate-limited Nominatim lookups overlap with LLM latency instead of
+    # waiting for the whole play to be extracted.
+    chunks = split_text_chunks(text, args.extract_chunk_chars)
+    cache_path = Path(args.geocode_cache)
+    cache = load_cache(cache_path) if geocode_cache is None else geocode_cache
+    session = requests.Session()
+    pending: Queue[str | None] = Queue()
+    geocode_results: dict[str, dict | None] = {}
+    geocode_errors: list[BaseException] = []
+    # Set on any failure so the geocoder skips what is still queued instead
+    # of spending a rate-limited lookup on each before the error surfaces.
+    stop = threading.Event()
+
+    def geocoder() -> None:
+        while (query := pending.get()) is not None:
+            if stop.is_set():
+                continue
+            try:
+                geocode_results[query] = limited_geocode(query, session, args, cache, geocode_limit)
+            except BaseException as exc:
+                geocode_errors.append(exc)
+                stop.set()
+
+    def extract_chunk(chunk_start: int, chunk_text: str) -> list[dict]:
+        with limited(llm_limit):
+            extractions = extract_places(text=chunk_text, model_id=args.model)
+        return [offset_record(extraction_record(e), chunk_start) for e in extractions]
+
+    records_by_chunk: list[list[dict]] = [[] for _ in chunks]
+    mentions_by_chunk: list[pd.DataFrame] = [mention_frame({}) for _ in chunks]
+    queued: set[str] = set()
+    consumer = threading.Thread(target=geocoder, name="geocoder", daemon=True)
+    consumer.start()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, args.extract_workers)) as pool:
+            futures = {
+                pool.submit(extract_chunk, chunk_start, chunk_text): i
+                for i, (chunk_start, chunk_text) in enumerate(chunks)
+            }
+            try:
+                for future in as_completed(futures):
+                    i = futures[future]
+                    records_by_chunk[i] = future.result()
+                    mentions_by_chunk[i] = build_mentions(
+                        text, contexts, records_by_chunk[i], args, search_start=chunks[i][0]
+                    )
+                    for query in geocode_candidates(mentions_by_chunk[i]):
+                        if query not in queued:
+                            queued.add(query)
+                            pending.put(query)
+            except BaseException:
+                stop.set()
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+    finally:
+        pending.put(None)
+        consumer.join()
+        if geocode_cache is None:
+            save_cache(cache_path, cache)
+    if geocode_errors:
+        raise geocode_errors[0]
+
+    records = [record for chunk in records_by_chunk for record in chunk]
+    mentions = mention_frame(pd.concat(mentions_by_chunk, ignore_index=True))
+    return records, mentions, {query: geocode_results[query] for query in sorted(queued)}
+
+
+def cached_geocodes(queries: list[str], args: argparse.Namespace) -> dict[str, dict | None]:
+    # Refilter never touches the network: queries missing from the cache are
+    # left out and end up blocked as geocode_not_cached.
+    cache = load_cache(Path(args.geocode_cache))
+    return {
+        query: normalize_cached_result(cache[query])[0] for query in queries if query in cache
+    }
+
+
+def mention_outcome_diff(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    keys = ["span_start", "span_end", "mention_text"]
+    context = ["normalized_place", "act", "line"]
+    outcomes = ["keep", "rejected_reason", "spatial_usable", "spatial_blocked_reason"]
+    merged = before[keys + context + outcomes].merge(
+        after[keys + context + outcomes],
+        on=keys,
+        how="outer",
+        suffixes=("_before", "_after"),
+        indicator=True,
     )
+    for column in context:
+        merged[column] = merged[f"{column}_after"].combine_first(merged[f"{column}_before"])
 
-    for place in geocode_candidates:
-        result = geocode_place(
-            query=place,
-            session=session,
-            user_agent=args.user_agent,
-            email=args.nominatim_email,
-            cache=cache,
-        )
-        geocode_results[place] = result
+    def changed(column: str) -> pd.Series:
+        return merged[f"{column}_before"].fillna("").astype(str) != merged[
+            f"{column}_after"
+        ].fillna("").astype(str)
 
-    save_cache(cache_path, cache)
+    keep_before = merged["keep_before"].fillna(False).astype(bool)
+    change = pd.Series("", index=merged.index)
+    change[changed("spatial_blocked_reason") | changed("spatial_usable")] = "spatial_changed"
+    change[changed("rejected_reason")] = "reason_changed"
+    change[changed("keep") & keep_before] = "kept_to_rejected"
+    change[changed("keep") & ~keep_before] = "rejected_to_kept"
+    change[merged["_merge"] == "left_only"] = "removed"
+    change[merged["_merge"] == "right_only"] = "added"
+    merged["change"] = change
 
-    for mention in mentions:
-        if mention.get("keep") is not True:
-            continue
+    columns = ["change"] + keys + context + [
+        f"{column}_{side}" for column in outcomes for side in ("before", "after")
+    ]
+    return merged.loc[change != "", columns].reset_index(drop=True)
 
-        result = geocode_results.get(mention.get("geocode_query"))
-        if result is None:
-            mention["spatial_usable"] = False
-            mention["spatial_blocked_reason"] = "geocode_not_found"
-            continue
 
-        mention.update(result)
-        mention["spatial_usable"] = True
-        mention["spatial_blocked_reason"] = None
+def aggregate_outputs(
+    mentions: pd.DataFrame,
+    geocode_results: dict[str, dict | None],
+    args: argparse.Namespace,
+    run_id: str,
+) -> dict:
+    output_dir = Path(args.output_dir)
+    # Geocodes are attached with one merge on geocode_query; the post-geocode
+    # filter runs once per distinct (class, type, addresstype).
+    found = {query: result for query, result in geocode_results.items() if result is not None}
+    geocodes_df = pd.DataFrame.from_dict(found, orient="index").reindex(columns=GEOCODE_COLUMNS)
+    keep = (mentions["keep"] == True).to_numpy()
+    mentions_df = mentions.drop(columns=GEOCODE_COLUMNS).merge(
+        geocodes_df.astype(object).where(geocodes_df.notna(), None),
+        how="left",
+        left_on="geocode_query",
+        right_index=True,
+        validate="many_to_one",
+    )
+    mentions_df.loc[~keep, GEOCODE_COLUMNS] = None
+    mentions_df["run_id"] = run_id
 
-    mentions_df = pd.DataFrame(mentions, columns=mention_columns)
-    kept_mentions_df = mentions_df[mentions_df["keep"] == True].copy()
-    spatial_mentions_df = mentions_df[
-        (mentions_df["keep"] == True)
-        & (mentions_df["spatial_usable"] == True)
-        & (mentions_df["settlement_scope"] == True)
-    ].copy()
-    rejected_mentions_df = mentions_df[mentions_df["keep"] != True].copy()
+    queries = mentions_df["geocode_query"]
+    is_found = keep & queries.isin(found.keys()).to_numpy()
+    post_rejection_reasons = map_unique(
+        lambda geocode_class, geocode_type, geocode_addresstype: postfilter_rejection_reason(
+            geocode_class=geocode_class,
+            geocode_type=geocode_type,
+            geocode_addresstype=geocode_addresstype,
+        ),
+        mentions_df["geocode_class"][is_found],
+        mentions_df["geocode_precision"][is_found],
+        mentions_df["geocode_addresstype"][is_found],
+    )
+    blocked_reason = np.full(len(mentions_df), None, dtype=object)
+    blocked_reason[keep & ~is_found] = np.where(
+        queries[keep & ~is_found].isin(geocode_results.keys()),
+        "geocode_not_found",
+        "geocode_not_cached",
+    )
+    blocked_reason[is_found] = post_rejection_reasons
+    mentions_df["spatial_blocked_reason"] = blocked_reason
+    mentions_df["spatial_usable"] = is_found & pd.isna(blocked_reason)
+    mentions_df = mentions_df[MENTION_COLUMNS]
+
+    settlement = (mentions_df["settlement_scope"] == True).to_numpy()
+    spatial_mentions_df = mentions_df[keep & mentions_df["spatial_usable"].to_numpy() & settlement]
 
     mentions_csv = output_dir / f"{args.play_id}_mentions.csv"
     mentions_df.to_csv(mentions_csv, index=False)
 
     rejections_csv = output_dir / f"{args.play_id}_rejections.csv"
-    rejected_mentions_df.to_csv(rejections_csv, index=False)
-
-    if spatial_mentions_df.empty:
-        places_df = pd.DataFrame(
-            columns=[
-                "normalized_place",
-                "mention_sentence",
-                "geocode_name",
-                "geocode_lat",
-                "geocode_lon",
-                "geocode_precision",
-                "geocode_addresstype",
-                "geocode_class",
-                "geocode_id",
-                "mention_count",
-            ]
+    mentions_df[~keep].to_csv(rejections_csv, index=False)
+
+    places_df = PlaceAccumulator().update(spatial_mentions_df).frame()
+    if not places_df.empty:
+        places_df = merge_near_duplicate_places(places_df, radius_km=args.merge_radius_km)
+
+    places_csv = output_dir / f"{args.play_id}_places.csv"
+    places_df.to_csv(places_csv, index=False)
+
+    # Rejections are not duplicated here; read_rejections() filters the
+    # mentions table on keep.
+    parquet_paths = {}
+    if args.parquet:
+        parquet_root = output_dir / PARQUET_DIRNAME
+        parquet_paths = {
+            f"{table}_parquet": str(write_play_partition(frame, parquet_root, table, args.play_id))
+            for table, frame in (("mentions", mentions_df), ("places", places_df))
+        }
+
+    cog_lat, cog_lon = center_of_gravity_frame(
+        spatial_mentions_df,
+        method=args.cog_method,
+        tol_km=args.median_tol_km,
+        max_iter=args.median_max_iter,
+    )
+
+    trajectory_df = center_of_gravity_trajectory(
+        spatial_mentions_df,
+        method=args.cog_method,
+        tol_km=args.median_tol_km,
+        max_iter=args.median_max_iter,
+    )
+    trajectory_csv = output_dir / f"{args.play_id}_trajectory.csv"
+    trajectory_df.to_csv(trajectory_csv, index=False)
+
+    bootstrap_kwargs = dict(
+        n_resamples=args.bootstrap_resamples,
+        confidence=args.confidence,
+        method=args.cog_method,
+        tol_km=args.median_tol_km,
+        max_iter=args.median_max_iter,
+        seed=args.bootstrap_seed,
+    )
+    play_region = bootstrap_center_of_gravity_frame(spatial_mentions_df, **bootstrap_kwargs)
+    confidence_rows = []
+    if play_region is not None:
+        confidence_rows.append({"level": "play", "act": None, **asdict(play_region)})
+        for act, act_df in spatial_mentions_df.groupby("act", sort=False):
+            act_region = bootstrap_center_of_gravity_frame(act_df, **bootstrap_kwargs)
+            if act_region is not None:
+                confidence_rows.append({"level": "act", "act": act, **asdict(act_region)})
+    confidence_columns = ["level", "act"] + [field.name for field in fields(ConfidenceRegion)]
+    confidence_csv = output_dir / f"{args.play_id}_cog_confidence.csv"
+    pd.DataFrame(confidence_rows, columns=confidence_columns).to_csv(
+        confidence_csv, index=False
+    )
+
+    # Mergeable partial sums so corpus-wide centers can be reduced later
+    # without reloading mentions.
+    cog_partial = CenterOfGravityAccumulator().update(spatial_mentions_df)
+    cog_json = output_dir / f"{args.play_id}_cog.json"
+    cog_json.write_text(
+        json.dumps(
+            {
+                "play_id": args.play_id,
+                "play_title": args.title,
+                "accumulator": cog_partial.to_dict(),
+            },
+            indent=2,
+            sort_keys=True,
         )
-    else:
-        group_key = spatial_mentions_df["geocode_id"].fillna(
-            spatial_mentions_df["normalized_place"]
+    )
+
+    trace.count_bytes(
+        mentions_csv,
+        rejections_csv,
+        places_csv,
+        trajectory_csv,
+        confidence_csv,
+        cog_json,
+        *parquet_paths.values(),
+    )
+
+    return {
+        "play_id": args.play_id,
+        "play_title": args.title,
+        "mentions_csv": str(mentions_csv),
+        "rejections_csv": str(rejections_csv),
+        "places_csv": str(places_csv),
+        "trajectory_csv": str(trajectory_csv),
+        "confidence_csv": str(confidence_csv),
+        "cog_json": str(cog_json),
+        **parquet_paths,
+        "mentions": len(mentions_df),
+        "kept": int(keep.sum()),
+        "rejected": int((~keep).sum()),
+        "spatial": len(spatial_mentions_df),
+        "places": len(places_df),
+        "cog_lat": cog_lat,
+        "cog_lon": cog_lon,
+        "place_records": places_df.to_dict(orient="records"),
+        "play_region": asdict(play_region) if play_region is not None else None,
+    }
+
+
+def render_map(aggregate: dict, args: argparse.Namespace) -> str:
+    map_path = Path(args.output_dir) / f"{args.play_id}_map.html"
+    region = aggregate["play_region"]
+    build_map(
+        aggregate["cog_lat"],
+        aggregate["cog_lon"],
+        aggregate["place_records"],
+        str(map_path),
+        confidence_region=ConfidenceRegion(**region) if region is not None else None,
+        mode=args.map_mode,
+        offline=args.offline_map,
+        asset_cache_dir=Path(args.map_asset_cache_dir),
+    )
+    return str(map_path)
+
+
+def outputs_exist(*paths: str) -> bool:
+    return all(Path(path).exists() for path in paths)
+
+
+def run(
+    args: argparse.Namespace,
+    geocode_cache: MutableMapping[str, dict | None] | None = None,
+    llm_limit: object | None = None,
+    geocode_limit: object | None = None,
+) -> dict:
+    run_id = datetime.now(UTC).strftime("%Y%m%dT%H%M%SZ")
+
+    if "you@example.com" in args.user_agent and not args.nominatim_email:
+        raise ValueError(
+            "Set a real --user-agent and/or NOMINATIM_EMAIL for Nominatim requests."
         )
-        places_df = (
-            spatial_mentions_df.assign(group_key=group_key)
-            .groupby("group_key", dropna=False)
-            .agg(
-                normalized_place=("normalized_place", "first"),
-                mention_sentence=("mention_sentence", first_non_empty),
-                geocode_name=("geocode_name", "first"),
-                geocode_lat=("geocode_lat", "first"),
-                geocode_lon=("geocode_lon", "first"),
-                geocode_precision=("geocode_precision", "first"),
-                geocode_addresstype=("geocode_addresstype", "first"),
-                geocode_class=("geocode_class", "first"),
-                geocode_id=("geocode_id", "first"),
-                mention_count=("mention_text", "count"),
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    checkpoint_dir = Path(args.checkpoint_dir) if args.checkpoint_dir else output_dir / ".checkpoints"
+    reuse = reusable_stages(args.resume, args.from_stage)
+    if args.refresh_source:
+        reuse.discard("load")
+    if args.refilter:
+        # Re-apply the filters to stored extractions and cached geocodes:
+        # no LLM, no network, and everything from filter onwards reruns.
+        reuse = {"load", "index", "extract", "geocode"}
+    store = CheckpointStore(checkpoint_dir / args.play_id, reuse=reuse)
+
+    # Each stage's key hashes the content it consumes (not just upstream
+    # keys), so an upstream rerun that produces the same output leaves
+    # downstream checkpoints valid.
+    play_path = Path(args.plays_dir) / f"{args.play_id}.txt"
+    text = store.run(
+        "load",
+        content_hash("load", args.play_id, str(play_path), args.gutenberg_url),
+        lambda: load_play_text(args),
+        encode=lambda text: {"path": str(play_path), "sha256": content_hash(text)},
+        decode=lambda data: play_path.read_text(),
+        valid=lambda data: play_path.exists() and content_hash(play_path.read_text()) == data["sha256"],
+    )
+    text_hash = content_hash(text)
+
+    contexts = store.run(
+        "index",
+        content_hash("index", text_hash, file_hash(parser_module.__file__)),
+        lambda: index_text_lines(text),
+        encode=lambda contexts: [asdict(ctx) for ctx in contexts],
+        decode=lambda data: [LineContext(**ctx) for ctx in data],
+    )
+
+    def extract() -> list[dict]:
+        if args.refilter:
+            raise ValueError(
+                f"No cached extractions for {args.play_id} in {store.root}; "
+                "run once without --refilter first."
             )
-            .reset_index(drop=True)
+        with limited(llm_limit):
+            extractions = extract_places(text=text, model_id=args.model)
+        return [extraction_record(extraction) for extraction in extractions]
+
+    def filter_key(records: list[dict]) -> str:
+        return content_hash(
+            "filter",
+            text_hash,
+            records,
+            args.play_id,
+            args.title,
+            args.gutenberg_url,
+            args.model,
+            file_hash(filtering_module.__file__),
+            file_hash(__file__),
         )
 
-    places_csv = output_dir / f"{args.play_id}_places.csv"
-    places_df.to_csv(places_csv, index=False)
+    def extract_key_for(chunk_chars: int | None) -> str:
+        # Chunked extraction sees different context than one whole-play
+        # call, so its results are keyed separately.
+        return content_hash(
+            "extract",
+            text_hash,
+            args.model,
+            EXTRACTION_PROMPT,
+            *((chunk_chars,) if chunk_chars else ()),
+        )
+
+    pipelined = args.pipeline and not args.refilter
+    extract_key = extract_key_for(args.extract_chunk_chars if pipelined else None)
+    if args.refilter:
+        # Accept extractions from a --pipeline run too, keyed by the chunk
+        # size saved with them.
+        stored = store.stored("extract") or {}
+        chunk_chars = stored.get("meta", {}).get("extract_chunk_chars")
+        if chunk_chars and stored["key"] == extract_key_for(chunk_chars):
+            extract_key = stored["key"]
+    geocode_results = None
+    if pipelined and store.load("extract", extract_key) is None:
+        with trace.span("stage:pipeline"), memory.stage("pipeline"), profiling.stage("pipeline"):
+            records, mentions, geocode_results = pipelined_extract_geocode(
+                text, contexts, args, geocode_cache, llm_limit, geocode_limit
+            )
+        store.record(
+            "extract", extract_key, records, meta={"extract_chunk_chars": args.extract_chunk_chars}
+        )
+        store.record("filter", filter_key(records), mention_columns(mentions))
+        store.record(
+            "geocode", content_hash("geocode", geocode_candidates(mentions)), geocode_results
+        )
+    else:
+        records = store.run("extract", extract_key, extract)
+        mentions = store.run(
+            "filter",
+            filter_key(records),
+            lambda: build_mentions(text, contexts, records, args),
+            encode=mention_columns,
+            decode=mention_frame,
+        )
+
+    queries = geocode_candidates(mentions)
+    networked_key = content_hash("geocode", queries)
+    networked = store.load("geocode", networked_key) if args.refilter else None
+    if networked is not None:
+        geocode_results = networked["data"]
+        store.reused.append("geocode")
+    elif args.refilter:
+        # Keyed apart from networked results, so a later normal --resume
+        # run does not mistake cache-only gaps for real lookups.
+        geocode_results = store.run(
+            "geocode",
+            content_hash("geocode_cached", queries),
+            lambda: cached_geocodes(queries, args),
+        )
+    elif geocode_results is None:
+        geocode_results = store.run(
+            "geocode",
+            content_hash("geocode", queries),
+            lambda: geocode_queries(queries, args, geocode_cache, geocode_limit),
+        )
+
+    previous_mentions = None
+    if args.refilter:
+        mentions_csv = output_dir / f"{args.play_id}_mentions.csv"
+        previous_mentions = (
+            pd.read_csv(mentions_csv)
+            if mentions_csv.exists()
+            else pd.DataFrame(columns=MENTION_COLUMNS)
+        )
+
+    aggregate_params = {
+        name: getattr(args, name)
+        for name in (
+            "output_dir",
+            "cog_method",
+            "median_tol_km",
+            "median_max_iter",
+            "bootstrap_resamples",
+            "confidence",
+            "bootstrap_seed",
+            "merge_radius_km",
+            "parquet",
+        )
+    }
+    aggregate = store.run(
+        "aggregate",
+        content_hash(
+            "aggregate",
+            mention_columns(mentions),
+            geocode_results,
+            aggregate_params,
+            file_hash(aggregate_module.__file__),
+        ),
+        lambda: aggregate_outputs(mentions, geocode_results, args, run_id),
+        valid=lambda data: outputs_exist(
+            data["mentions_csv"],
+            data["rejections_csv"],
+            data["places_csv"],
+            data["trajectory_csv"],
+            data["confidence_csv"],
+            data["cog_json"],
+            *(data[key] for key in ("mentions_parquet", "places_parquet") if key in data),
+        ),
+    )
 
-    cog_lat, cog_lon = center_of_gravity(
-        spatial_mentions_df.assign(weight=1.0).to_dict(orient="records")
+    render_params = (args.map_mode, args.offline_map)
+    map_html = store.run(
+        "render",
+        content_hash(
+            "render",
+            aggregate["cog_lat"],
+            aggregate["cog_lon"],
+            aggregate["place_records"],
+            aggregate["play_region"],
+            render_params,
+        ),
+        lambda: render_map(aggregate, args),
+        valid=outputs_exist,
     )
 
-    map_path = output_dir / f"{args.play_id}_map.html"
-    build_map(cog_lat, cog_lon, places_df.to_dict(orient="records"), str(map_path))
+    summary = {
+        key: value
+        for key, value in aggregate.items()
+        if key not in ("place_records", "play_region")
+    }
+    summary["map_html"] = map_html
+    trace.count("mentions_kept", summary["kept"])
+    trace.count("mentions_rejected", summary["rejected"])
+    summary["stages_ran"] = list(store.ran)
+    summary["stages_reused"] = list(store.reused)
+
+    if previous_mentions is not None:
+        diff_df = mention_outcome_diff(previous_mentions, pd.read_csv(aggregate["mentions_csv"]))
+        diff_csv = output_dir / f"{args.play_id}_refilter_diff.csv"
+        diff_df.to_csv(diff_csv, index=False)
+        trace.count_bytes(diff_csv)
+        summary["refilter_diff_csv"] = str(diff_csv)
+        summary["refilter_changes"] = diff_df["change"].value_counts().to_dict()
+    return summary
+
+
+def run_with_reports(args: argparse.Namespace, **run_kwargs) -> tuple[dict, list[str]]:
+    # run() under whichever of --trace, --profile and --trace-memory are set.
+    # Their per-play files land in the output dir and their paths in the
+    # summary; the printable tables are returned alongside.
+    output_dir = Path(args.output_dir)
+    profile_dir = output_dir / "profile" / args.play_id
+    tracing = trace.tracing() if args.trace else nullcontext()
+    profiler = profiling.profiling(profile_dir) if args.profile else nullcontext()
+    tracking = memory.tracking(args.memory_top) if args.trace_memory else nullcontext()
+    with tracing as tracer, profiler, tracking as tracker:
+        with trace.span("run_play"):
+            summary = run(args, **run_kwargs)
+
+    tables = []
+    if args.profile:
+        summary["profile_dir"] = str(profile_dir)
+    if tracker is not None:
+        summary["memory_json"] = str(tracker.write(output_dir / f"{args.play_id}_memory.json"))
+        tables.append(tracker.summary_table())
+    if tracer is not None:
+        summary["trace_json"] = str(tracer.write(output_dir / f"{args.play_id}_trace.json"))
+        tables.append(tracer.summary_table())
+    return summary, tables
+
+
+def main() -> None:
+    args = parse_args()
+    summary, tables = run_with_reports(args)
 
-    print(f"Mentions:   {mentions_csv}")
-    print(f"Rejections: {rejections_csv}")
-    print(f"Places:     {places_csv}")
-    print(f"Map:        {map_path}")
-    print(f"Kept (semantic):       {len(kept_mentions_df)}")
-    print(f"Rejected (semantic):   {len(rejected_mentions_df)}")
-    print(f"Spatial usable (settlement): {len(spatial_mentions_df)}")
-    print(f"CoG:        {cog_lat:.4f}, {cog_lon:.4f}")
+    print(f"Mentions:   {summary['mentions_csv']}")
+    print(f"Rejections: {summary['rejections_csv']}")
+    print(f"Places:     {summary['places_csv']}")
+    print(f"Trajectory: {summary['trajectory_csv']}")
+    print(f"CoG CI:     {summary['confidence_csv']}")
+    print(f"CoG sums:   {summary['cog_json']}")
+    if "mentions_parquet" in summary:
+        print(f"Parquet:    {Path(summary['mentions_parquet']).parents[2]}")
+    print(f"Map:        {summary['map_html']}")
+    print(f"Kept (semantic):       {summary['kept']}")
+    print(f"Rejected (semantic):   {summary['rejected']}")
+    print(f"Spatial usable (settlement): {summary['spatial']}")
+    print(f"CoG:        {summary['cog_lat']:.4f}, {summary['cog_lon']:.4f}")
+    if summary["stages_reused"]:
+        print(f"Stages reused from checkpoints: {', '.join(summary['stages_reused'])}")
+    if "refilter_diff_csv" in summary:
+        changes = ", ".join(f"{k}={v}" for k, v in summary["refilter_changes"].items())
+        print(f"Refilter diff: {summary['refilter_diff_csv']} ({changes or 'no changes'})")
+    if "profile_dir" in summary:
+        print(f"Profile:    {summary['profile_dir']} (per-stage .pstats, stacks.collapsed)")
+    if "memory_json" in summary:
+        print(f"Memory:     {summary['memory_json']}")
+    if "trace_json" in summary:
+        print(f"Trace:      {summary['trace_json']}")
+    for table in tables:
+        print(table)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+from shakespeare_geo.gutenberg import (
+    COMPLETE_WORKS_URL,
+    DEFAULT_MIRROR_DIR,
+    mirror_gutenberg_source,
+    split_complete_works,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Split the Gutenberg Complete Works into one text file per play."
+    )
+    parser.add_argument(
+        "--source",
+        default=None,
+        help="Local Complete Works file (default: mirror --url into --mirror-dir)",
+    )
+    parser.add_argument("--url", default=COMPLETE_WORKS_URL)
+    parser.add_argument("--mirror-dir", default=str(DEFAULT_MIRROR_DIR))
+    parser.add_argument("--plays-dir", default="data/plays")
+    parser.add_argument(
+        "--manifest",
+        default=None,
+        help="Manifest path (default: <plays-dir>/manifest.json)",
+    )
+    parser.add_argument(
+        "--include-poems",
+        action="store_true",
+        help="Also write works without acts (sonnets, narrative poems)",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.source:
+        source_path = Path(args.source)
+    else:
+        source_path, _ = mirror_gutenberg_source(args.url, mirror_dir=Path(args.mirror_dir))
+
+    plays_dir = Path(args.plays_dir)
+    manifest_path = Path(args.manifest) if args.manifest else plays_dir / "manifest.json"
+    manifest = split_complete_works(
+        source_path,
+        plays_dir,
+        manifest_path=manifest_path,
+        include_poems=args.include_poems,
+    )
+    for entry in manifest["plays"]:
+        print(f"{entry['play_id']:<40} {entry['bytes']:>9} bytes  {entry['title']}")
+    print(f"Works:    {len(manifest['plays'])}")
+    print(f"Manifest: {manifest_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,51 @@
 from __future__ import annotations
 
+import json
 import math
+from dataclasses import asdict, dataclass, fields
 from typing import Iterable, Tuple
 
+import numpy as np
+import pandas as pd
+
+
+EARTH_RADIUS_KM = 6371.0088
+COG_METHODS = ("arithmetic", "spherical", "geometric_median")
+DEFAULT_MEDIAN_TOL_KM = 0.01
+DEFAULT_MEDIAN_MAX_ITER = 100
+DEFAULT_BOOTSTRAP_RESAMPLES = 1000
+DEFAULT_CONFIDENCE = 0.95
+# Upper bound on resample-by-point matrix entries held at once.
+_BOOTSTRAP_BLOCK_CELLS = 2_000_000
+TRAJECTORY_LEVELS = (
+    ("act", ("act",)),
+    ("scene", ("act", "scene")),
+    ("speaker", ("speaker",)),
+)
+PLACE_COLUMNS = [
+    "normalized_place",
+    "mention_sentence",
+    "geocode_name",
+    "geocode_lat",
+    "geocode_lon",
+    "geocode_precision",
+    "geocode_addresstype",
+    "geocode_class",
+    "geocode_id",
+    "mention_count",
+]
+TRAJECTORY_COLUMNS = [
+    "level",
+    "act",
+    "scene",
+    "speaker",
+    "first_line",
+    "mention_count",
+    "total_weight",
+    "cog_lat",
+    "cog_lon",
+]
+
 
 def center_of_gravity(rows: Iterable[dict]) -> Tuple[float, float]:
     weighted = []
@@ -27,3 +70,547 @@ def center_of_gravity(rows: Iterable[dict]) -> Tuple[float, float]:
     lat = sum(lat * w for lat, _, w in weighted) / total_weight
     lon = sum(lon * w for _, lon, w in weighted) / total_weight
     return (lat, lon)
+
+
+def _as_float_array(values: object) -> np.ndarray:
+    if isinstance(values, pd.Series):
+        return pd.to_numeric(values, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    return np.asarray(values, dtype=float)
+
+
+def weighted_points(
+    lat: object,
+    lon: object,
+    weight: object | None = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    lat_arr = _as_float_array(lat)
+    lon_arr = _as_float_array(lon)
+    if lat_arr.shape != lon_arr.shape:
+        raise ValueError("lat and lon must have the same shape")
+
+    if weight is None:
+        weight_arr = np.ones_like(lat_arr)
+    else:
+        weight_arr = np.broadcast_to(_as_float_array(weight), lat_arr.shape)
+
+    # Same rules as center_of_gravity: drop missing/non-finite coordinates and
+    # non-finite or non-positive weights.
+    mask = np.isfinite(lat_arr) & np.isfinite(lon_arr) & np.isfinite(weight_arr)
+    mask &= weight_arr > 0
+    return lat_arr[mask], lon_arr[mask], weight_arr[mask]
+
+
+def center_of_gravity_arrays(
+    lat: object,
+    lon: object,
+    weight: object | None = None,
+) -> Tuple[float, float]:
+    lat_arr, lon_arr, weight_arr = weighted_points(lat, lon, weight)
+    if lat_arr.size == 0:
+        return (0.0, 0.0)
+
+    total_weight = weight_arr.sum()
+    return (
+        float(np.dot(lat_arr, weight_arr) / total_weight),
+        float(np.dot(lon_arr, weight_arr) / total_weight),
+    )
+
+
+def to_unit_vectors(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    lat_rad = np.radians(lat)
+    lon_rad = np.radians(lon)
+    cos_lat = np.cos(lat_rad)
+    return np.column_stack(
+        (cos_lat * np.cos(lon_rad), cos_lat * np.sin(lon_rad), np.sin(lat_rad))
+    )
+
+
+def from_unit_vector(vector: np.ndarray) -> Tuple[float, float]:
+    x, y, z = (float(v) for v in vector)
+    lat = math.degrees(math.atan2(z, math.hypot(x, y)))
+    lon = math.degrees(math.atan2(y, x))
+    return (lat, lon)
+
+
+def spherical_centroid(
+    lat: object,
+    lon: object,
+    weight: object | None = None,
+) -> Tuple[float, float]:
+    lat_arr, lon_arr, weight_arr = weighted_points(lat, lon, weight)
+    if lat_arr.size == 0:
+        return (0.0, 0.0)
+
+    resultant = weight_arr @ to_unit_vectors(lat_arr, lon_arr)
+    norm = np.linalg.norm(resultant)
+    # Points spread evenly around the globe have no meaningful centroid.
+    if norm <= 1e-12 * weight_arr.sum():
+        return (0.0, 0.0)
+    return from_unit_vector(resultant / norm)
+
+
+def geometric_median(
+    lat: object,
+    lon: object,
+    weight: object | None = None,
+    tol_km: float = DEFAULT_MEDIAN_TOL_KM,
+    max_iter: int = DEFAULT_MEDIAN_MAX_ITER,
+) -> Tuple[float, float]:
+    lat_arr, lon_arr, weight_arr = weighted_points(lat, lon, weight)
+    if lat_arr.size == 0:
+        return (0.0, 0.0)
+
+    points = to_unit_vectors(lat_arr, lon_arr)
+    resultant = weight_arr @ points
+    norm = np.linalg.norm(resultant)
+    estimate = resultant / norm if norm > 0 else points[np.argmax(weight_arr)]
+    tol_rad = tol_km / EARTH_RADIUS_KM
+
+    # Weiszfeld iteration on the sphere: average the great-circle directions
+    # to every point in the tangent plane at the current estimate, weighted by
+    # w / distance, then step along the geodesic.
+    for _ in range(max_iter):
+        cos_theta = np.clip(points @ estimate, -1.0, 1.0)
+        theta = np.arccos(cos_theta)
+        away = theta > 1e-12
+        if not away.any():
+            break
+
+        sin_theta = np.sin(theta[away])
+        log_map = (points[away] - np.outer(cos_theta[away], estimate)) * (
+            theta[away] / np.maximum(sin_theta, 1e-12)
+        )[:, None]
+        inv_dist_weight = weight_arr[away] / theta[away]
+        step = inv_dist_weight @ log_map / inv_dist_weight.sum()
+
+        step_len = np.linalg.norm(step)
+        if step_len < tol_rad:
+            break
+        estimate = math.cos(step_len) * estimate + math.sin(step_len) * step / step_len
+        estimate /= np.linalg.norm(estimate)
+
+    return from_unit_vector(estimate)
+
+
+def center_of_gravity_frame(
+    frame: pd.DataFrame,
+    lat_column: str = "geocode_lat",
+    lon_column: str = "geocode_lon",
+    weight_column: str = "weight",
+    method: str = "arithmetic",
+    tol_km: float = DEFAULT_MEDIAN_TOL_KM,
+    max_iter: int = DEFAULT_MEDIAN_MAX_ITER,
+) -> Tuple[float, float]:
+    weight = frame[weight_column] if weight_column in frame.columns else None
+    lat = frame[lat_column]
+    lon = frame[lon_column]
+
+    if method == "arithmetic":
+        return center_of_gravity_arrays(lat, lon, weight)
+    if method == "spherical":
+        return spherical_centroid(lat, lon, weight)
+    if method == "geometric_median":
+        return geometric_median(lat, lon, weight, tol_km=tol_km, max_iter=max_iter)
+    raise ValueError(f"Unknown center of gravity method: {method}")
+
+
+def _unit_vectors_to_lat_lon(vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    x, y, z = vectors[:, 0], vectors[:, 1], vectors[:, 2]
+    lat = np.degrees(np.arctan2(z, np.hypot(x, y)))
+    lon = np.degrees(np.arctan2(y, x))
+    degenerate = np.linalg.norm(vectors, axis=1) <= 1e-12
+    lat[degenerate] = 0.0
+    lon[degenerate] = 0.0
+    return lat, lon
+
+
+def grouped_center_of_gravity(
+    frame: pd.DataFrame,
+    by: Iterable[str],
+    lat_column: str = "geocode_lat",
+    lon_column: str = "geocode_lon",
+    weight_column: str = "weight",
+    line_column: str = "line",
+    method: str = "arithmetic",
+    tol_km: float = DEFAULT_MEDIAN_TOL_KM,
+    max_iter: int = DEFAULT_MEDIAN_MAX_ITER,
+) -> pd.DataFrame:
+    by = list(by)
+    if method not in COG_METHODS:
+        raise ValueError(f"Unknown center of gravity method: {method}")
+
+    lat = _as_float_array(frame[lat_column])
+    lon = _as_float_array(frame[lon_column])
+    if weight_column in frame.columns:
+        weight = _as_float_array(frame[weight_column])
+    else:
+        weight = np.ones_like(lat)
+    mask = np.isfinite(lat) & np.isfinite(lon) & np.isfinite(weight) & (weight > 0)
+    lat, lon, weight = lat[mask], lon[mask], weight[mask]
+
+    # Every per-group quantity is a weighted sum, so one groupby.sum() pass
+    # yields all groups' centers at once.
+    sums = frame.loc[mask, by].reset_index(drop=True)
+    sums["mention_count"] = 1
+    sums["total_weight"] = weight
+    sums["first_line"] = (
+        _as_float_array(frame.loc[mask, line_column])
+        if line_column in frame.columns
+        else np.nan
+    )
+    if method == "arithmetic":
+        sums["w_lat"] = weight * lat
+        sums["w_lon"] = weight * lon
+    else:
+        vectors = to_unit_vectors(lat, lon) * weight[:, None]
+        sums["w_x"], sums["w_y"], sums["w_z"] = vectors[:, 0], vectors[:, 1], vectors[:, 2]
+
+    grouped = sums.groupby(by, sort=False, dropna=False)
+    result = grouped.sum(numeric_only=True).drop(columns="first_line")
+    result["first_line"] = grouped["first_line"].min()
+    result = result.reset_index()
+
+    if method == "arithmetic":
+        result["cog_lat"] = result["w_lat"] / result["total_weight"]
+        result["cog_lon"] = result["w_lon"] / result["total_weight"]
+    elif method == "spherical":
+        cog_lat, cog_lon = _unit_vectors_to_lat_lon(result[["w_x", "w_y", "w_z"]].to_numpy())
+        result["cog_lat"] = cog_lat
+        result["cog_lon"] = cog_lon
+    else:
+        # No closed form: iterate per group, reusing the groupby codes to
+        # slice each group's rows in result order.
+        codes = grouped.ngroup().to_numpy()
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(result) + 1))
+        medians = [
+            geometric_median(
+                lat[rows], lon[rows], weight[rows], tol_km=tol_km, max_iter=max_iter
+            )
+            for rows in (order[a:b] for a, b in zip(bounds[:-1], bounds[1:]))
+        ]
+        result["cog_lat"] = [m[0] for m in medians]
+        result["cog_lon"] = [m[1] for m in medians]
+
+    columns = by + ["first_line", "mention_count", "total_weight", "cog_lat", "cog_lon"]
+    result = result[columns].sort_values("first_line", kind="stable").reset_index(drop=True)
+    result["first_line"] = result["first_line"].astype("Int64")
+    return result
+
+
+def center_of_gravity_trajectory(
+    frame: pd.DataFrame,
+    method: str = "arithmetic",
+    tol_km: float = DEFAULT_MEDIAN_TOL_KM,
+    max_iter: int = DEFAULT_MEDIAN_MAX_ITER,
+) -> pd.DataFrame:
+    levels = []
+    for level, by in TRAJECTORY_LEVELS:
+        grouped = grouped_center_of_gravity(
+            frame, by, method=method, tol_km=tol_km, max_iter=max_iter
+        )
+        levels.append(grouped.assign(level=level))
+
+    trajectory = pd.concat(levels, ignore_index=True)
+    return trajectory.reindex(columns=TRAJECTORY_COLUMNS)
+
+
+@dataclass
+class CenterOfGravityAccumulator:
+    count: int = 0
+    weight_sum: float = 0.0
+    lat_sum: float = 0.0
+    lon_sum: float = 0.0
+    x_sum: float = 0.0
+    y_sum: float = 0.0
+    z_sum: float = 0.0
+
+    def update_arrays(
+        self,
+        lat: object,
+        lon: object,
+        weight: object | None = None,
+    ) -> CenterOfGravityAccumulator:
+        lat_arr, lon_arr, weight_arr = weighted_points(lat, lon, weight)
+        if lat_arr.size == 0:
+            return self
+
+        vector = weight_arr @ to_unit_vectors(lat_arr, lon_arr)
+        self.count += int(lat_arr.size)
+        self.weight_sum += float(weight_arr.sum())
+        self.lat_sum += float(np.dot(lat_arr, weight_arr))
+        self.lon_sum += float(np.dot(lon_arr, weight_arr))
+        self.x_sum += float(vector[0])
+        self.y_sum += float(vector[1])
+        self.z_sum += float(vector[2])
+        return self
+
+    def update(
+        self,
+        batch: pd.DataFrame,
+        lat_column: str = "geocode_lat",
+        lon_column: str = "geocode_lon",
+        weight_column: str = "weight",
+    ) -> CenterOfGravityAccumulator:
+        weight = batch[weight_column] if weight_column in batch.columns else None
+        return self.update_arrays(batch[lat_column], batch[lon_column], weight)
+
+    def merge(self, other: CenterOfGravityAccumulator) -> CenterOfGravityAccumulator:
+        for field in fields(self):
+            setattr(self, field.name, getattr(self, field.name) + getattr(other, field.name))
+        return self
+
+    def center(self, method: str = "arithmetic") -> Tuple[float, float]:
+        if method not in ("arithmetic", "spherical"):
+            # The geometric median is not a function of running sums.
+            raise ValueError(f"Accumulator cannot compute method: {method}")
+        if self.weight_sum <= 0:
+            return (0.0, 0.0)
+        if method == "arithmetic":
+            return (self.lat_sum / self.weight_sum, self.lon_sum / self.weight_sum)
+
+        vector = np.array([self.x_sum, self.y_sum, self.z_sum])
+        if np.linalg.norm(vector) <= 1e-12 * self.weight_sum:
+            return (0.0, 0.0)
+        return from_unit_vector(vector)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> CenterOfGravityAccumulator:
+        known = {field.name for field in fields(cls)}
+        unknown = set(data) - known
+        if unknown:
+            raise ValueError(f"Unknown accumulator fields: {sorted(unknown)}")
+        return cls(**{key: data[key] for key in known if key in data})
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), sort_keys=True)
+
+    @classmethod
+    def from_json(cls, text: str) -> CenterOfGravityAccumulator:
+        return cls.from_dict(json.loads(text))
+
+
+def merge_accumulators(
+    parts: Iterable[CenterOfGravityAccumulator],
+) -> CenterOfGravityAccumulator:
+    merged = CenterOfGravityAccumulator()
+    for part in parts:
+        merged.merge(part)
+    return merged
+
+
+def first_non_empty(values: pd.Series) -> str | None:
+    for value in values:
+        if pd.isna(value):
+            continue
+        text = str(value).strip()
+        if text:
+            return text
+    return None
+
+
+class PlaceAccumulator:
+    # Running per-place mention counts: spatial mentions grouped by
+    # geocode_id (or the place name when there is none), fed one batch at a
+    # time. Memory grows with distinct places, not mentions.
+
+    def __init__(self):
+        self.places: dict[str, dict] = {}
+
+    def update(self, batch: pd.DataFrame) -> PlaceAccumulator:
+        if batch.empty:
+            return self
+        group_key = batch["geocode_id"].fillna(batch["normalized_place"])
+        grouped = (
+            batch.assign(group_key=group_key)
+            .groupby("group_key", dropna=False, sort=False)
+            .agg(
+                normalized_place=("normalized_place", "first"),
+                mention_sentence=("mention_sentence", first_non_empty),
+                geocode_name=("geocode_name", "first"),
+                geocode_lat=("geocode_lat", "first"),
+                geocode_lon=("geocode_lon", "first"),
+                geocode_precision=("geocode_precision", "first"),
+                geocode_addresstype=("geocode_addresstype", "first"),
+                geocode_class=("geocode_class", "first"),
+                geocode_id=("geocode_id", "first"),
+                mention_count=("mention_text", "count"),
+            )
+        )
+        for key, row in zip(grouped.index, grouped.to_dict(orient="records")):
+            place = self.places.get(key)
+            if place is None:
+                self.places[key] = row
+                continue
+            place["mention_count"] += row["mention_count"]
+            for column, value in row.items():
+                if pd.isna(place[column]) and not pd.isna(value):
+                    place[column] = value
+        return self
+
+    def frame(self) -> pd.DataFrame:
+        # Sorted by group key, matching a one-shot groupby.
+        return pd.DataFrame(
+            [self.places[key] for key in sorted(self.places)], columns=PLACE_COLUMNS
+        )
+
+
+@dataclass
+class ConfidenceRegion:
+    center_lat: float
+    center_lon: float
+    confidence: float
+    n_resamples: int
+    lat_low: float
+    lat_high: float
+    lon_low: float
+    lon_high: float
+    cov_lat: float
+    cov_lon: float
+    cov_lat_lon: float
+
+    def ellipse_points(self, n_points: int = 72) -> list[list[float]]:
+        cov = np.array([[self.cov_lat, self.cov_lat_lon], [self.cov_lat_lon, self.cov_lon]])
+        eigvals, eigvecs = np.linalg.eigh(cov)
+        # Chi-square quantile with two degrees of freedom, in closed form.
+        scale = math.sqrt(-2.0 * math.log(1.0 - self.confidence))
+        radii = scale * np.sqrt(np.clip(eigvals, 0.0, None))
+        t = np.linspace(0.0, 2.0 * math.pi, n_points, endpoint=False)
+        offsets = (eigvecs * radii) @ np.vstack((np.cos(t), np.sin(t)))
+        return [
+            [self.center_lat + float(d_lat), self.center_lon + float(d_lon)]
+            for d_lat, d_lon in zip(offsets[0], offsets[1])
+        ]
+
+
+def _resample_counts(
+    n_points: int,
+    n_resamples: int,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    # Row b holds how often each point was drawn in resample b; built with a
+    # single bincount instead of one draw loop per resample.
+    draws = rng.integers(0, n_points, size=(n_resamples, n_points))
+    draws += (np.arange(n_resamples) * n_points)[:, None]
+    counts = np.bincount(draws.ravel(), minlength=n_resamples * n_points)
+    return counts.reshape(n_resamples, n_points).astype(float)
+
+
+def _batch_centers(
+    resample_weights: np.ndarray,
+    lat: np.ndarray,
+    lon: np.ndarray,
+    method: str,
+    tol_km: float,
+    max_iter: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    totals = resample_weights.sum(axis=1)
+    if method == "arithmetic":
+        return resample_weights @ lat / totals, resample_weights @ lon / totals
+
+    points = to_unit_vectors(lat, lon)
+    estimates = resample_weights @ points
+    if method == "spherical":
+        return _unit_vectors_to_lat_lon(estimates)
+
+    # Weiszfeld on the sphere for every resample at once (see geometric_median).
+    norms = np.linalg.norm(estimates, axis=1, keepdims=True)
+    estimates = np.divide(estimates, norms, out=np.zeros_like(estimates), where=norms > 0)
+    tol_rad = tol_km / EARTH_RADIUS_KM
+    for _ in range(max_iter):
+        cos_theta = np.clip(estimates @ points.T, -1.0, 1.0)
+        theta = np.arccos(cos_theta)
+        away = theta > 1e-12
+        safe_theta = np.where(away, theta, 1.0)
+        inv_sin = np.where(away, resample_weights / np.maximum(np.sin(safe_theta), 1e-12), 0.0)
+        inv_dist = np.where(away, resample_weights / safe_theta, 0.0)
+        denom = inv_dist.sum(axis=1, keepdims=True)
+        steps = inv_sin @ points - (inv_sin * cos_theta).sum(axis=1, keepdims=True) * estimates
+        steps = np.divide(steps, denom, out=np.zeros_like(steps), where=denom > 0)
+
+        step_len = np.linalg.norm(steps, axis=1, keepdims=True)
+        if step_len.max() < tol_rad:
+            break
+        direction = np.divide(steps, step_len, out=np.zeros_like(steps), where=step_len > 0)
+        estimates = np.cos(step_len) * estimates + np.sin(step_len) * direction
+        estimates /= np.linalg.norm(estimates, axis=1, keepdims=True)
+    return _unit_vectors_to_lat_lon(estimates)
+
+
+def bootstrap_center_of_gravity(
+    lat: object,
+    lon: object,
+    weight: object | None = None,
+    n_resamples: int = DEFAULT_BOOTSTRAP_RESAMPLES,
+    confidence: float = DEFAULT_CONFIDENCE,
+    method: str = "arithmetic",
+    tol_km: float = DEFAULT_MEDIAN_TOL_KM,
+    max_iter: int = DEFAULT_MEDIAN_MAX_ITER,
+    seed: int | None = None,
+) -> ConfidenceRegion | None:
+    if method not in COG_METHODS:
+        raise ValueError(f"Unknown center of gravity method: {method}")
+    if not 0.0 < confidence < 1.0:
+        raise ValueError("confidence must be between 0 and 1")
+
+    lat_arr, lon_arr, weight_arr = weighted_points(lat, lon, weight)
+    if lat_arr.size == 0 or n_resamples <= 0:
+        return None
+
+    if method == "arithmetic":
+        center_lat, center_lon = center_of_gravity_arrays(lat_arr, lon_arr, weight_arr)
+    elif method == "spherical":
+        center_lat, center_lon = spherical_centroid(lat_arr, lon_arr, weight_arr)
+    else:
+        center_lat, center_lon = geometric_median(
+            lat_arr, lon_arr, weight_arr, tol_km=tol_km, max_iter=max_iter
+        )
+
+    rng = np.random.default_rng(seed)
+    n_points = lat_arr.size
+    block = max(1, _BOOTSTRAP_BLOCK_CELLS // n_points)
+    boot_lat = np.empty(n_resamples)
+    boot_lon = np.empty(n_resamples)
+    for start in range(0, n_resamples, block):
+        stop = min(start + block, n_resamples)
+        resample_weights = _resample_counts(n_points, stop - start, rng) * weight_arr
+        boot_lat[start:stop], boot_lon[start:stop] = _batch_centers(
+            resample_weights, lat_arr, lon_arr, method, tol_km, max_iter
+        )
+
+    # Longitudes relative to the point estimate, wrapped so regions that
+    # straddle the antimeridian stay contiguous.
+    d_lat = boot_lat - center_lat
+    d_lon = (boot_lon - center_lon + 180.0) % 360.0 - 180.0
+    alpha = (1.0 - confidence) / 2.0
+    lat_low, lat_high = np.quantile(d_lat, [alpha, 1.0 - alpha])
+    lon_low, lon_high = np.quantile(d_lon, [alpha, 1.0 - alpha])
+    cov = np.cov(np.vstack((d_lat, d_lon))) if n_resamples > 1 else np.zeros((2, 2))
+
+    return ConfidenceRegion(
+        center_lat=center_lat,
+        center_lon=center_lon,
+        confidence=confidence,
+        n_resamples=n_resamples,
+        lat_low=center_lat + float(lat_low),
+        lat_high=center_lat + float(lat_high),
+        lon_low=center_lon + float(lon_low),
+        lon_high=center_lon + float(lon_high),
+        cov_lat=float(cov[0, 0]),
+        cov_lon=float(cov[1, 1]),
+        cov_lat_lon=float(cov[0, 1]),
+    )
+
+
+def bootstrap_center_of_gravity_frame(
+    frame: pd.DataFrame,
+    lat_column: str = "geocode_lat",
+    lon_column: str = "geocode_lon",
+    weight_column: str = "weight",
+    **kwargs,
+) -> ConfidenceRegion | None:
+    weight = frame[weight_column] if weight_column in frame.columns else None
+    return bootstrap_center_of_gravity(frame[lat_column], frame[lon_column], weight, **kwargs)
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Callable, Iterable
+
+from shakespeare_geo import memory, profiling, trace
+
+
+STAGES = ("load", "index", "extract", "filter", "geocode", "aggregate", "render")
+CHECKPOINT_VERSION = 1
+
+
+def _json_default(value: object) -> object:
+    # numpy scalars from pandas/numpy results.
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def content_hash(*parts: object) -> str:
+    payload = json.dumps(parts, sort_keys=True, default=_json_default, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def file_hash(path: Path) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def reusable_stages(resume: bool, from_stage: str | None) -> set[str]:
+    # --from-stage reruns that stage and everything after it, reusing
+    # earlier checkpoints; --resume alone reuses every stage whose key
+    # still matches.
+    if from_stage is not None:
+        if from_stage not in STAGES:
+            raise ValueError(f"Unknown stage: {from_stage}")
+        return set(STAGES[: STAGES.index(from_stage)])
+    return set(STAGES) if resume else set()
+
+
+class CheckpointStore:
+    # One JSON file per stage holding the stage's output and the hash of
+    # everything that went into it. A stage is skipped only when it is
+    # reusable, its stored key matches and the caller's validity check
+    # (e.g. "the output files still exist") passes.
+
+    def __init__(self, root: Path, reuse: Iterable[str] = ()):
+        self.root = Path(root)
+        self.reuse = set(reuse)
+        self.ran: list[str] = []
+        self.reused: list[str] = []
+
+    def path(self, stage: str) -> Path:
+        return self.root / f"{stage}.json"
+
+    def stored(self, stage: str) -> dict | None:
+        # The reusable payload for a stage whatever its key, e.g. to read
+        # the meta it was saved with.
+        path = self.path(stage)
+        if stage not in self.reuse or not path.exists():
+            return None
+        payload = json.loads(path.read_text())
+        if payload.get("version") != CHECKPOINT_VERSION:
+            return None
+        return payload
+
+    def load(self, stage: str, key: str) -> object | None:
+        payload = self.stored(stage)
+        if payload is None or payload.get("key") != key:
+            return None
+        return payload
+
+    def save(self, stage: str, key: str, data: object, meta: dict | None = None) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.path(stage)
+        partial = path.with_name(path.name + ".part")
+        payload = {"version": CHECKPOINT_VERSION, "stage": stage, "key": key, "data": data}
+        if meta:
+            payload["meta"] = meta
+        partial.write_text(json.dumps(payload, default=_json_default))
+        os.replace(partial, path)
+        trace.count_bytes(path, name="checkpoint_bytes_written")
+
+    def record(self, stage: str, key: str, data: object, meta: dict | None = None) -> None:
+        # For stages computed outside run(), e.g. several at once.
+        self.save(stage, key, data, meta)
+        self.ran.append(stage)
+
+    def run(
+        self,
+        stage: str,
+        key: str,
+        compute: Callable[[], object],
+        encode: Callable[[object], object] = lambda value: value,
+        decode: Callable[[object], object] = lambda data: data,
+        valid: Callable[[object], bool] = lambda data: True,
+    ) -> object:
+        # tracemalloc snapshots are taken outside the profiler so their cost
+        # does not show up in the stage's profile.
+        with trace.span(f"stage:{stage}"), memory.stage(stage), profiling.stage(stage):
+            payload = self.load(stage, key)
+            if payload is not None and valid(payload["data"]):
+                self.reused.append(stage)
+                return decode(payload["data"])
+
+            value = compute()
+            self.save(stage, key, encode(value))
+            self.ran.append(stage)
+            return value
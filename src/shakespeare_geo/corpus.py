@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from shakespeare_geo.aggregate import EARTH_RADIUS_KM, to_unit_vectors
+
+
+PLACES_SUFFIX = "_places.csv"
+DISTANCE_METRICS = ("mean_haversine", "energy")
+# Upper bound on place-by-place distance cells materialized per block.
+DEFAULT_BLOCK_CELLS = 4_000_000
+
+
+def load_places_by_play(output_dir: Path) -> dict[str, pd.DataFrame]:
+    places_by_play = {}
+    for path in sorted(Path(output_dir).glob(f"*{PLACES_SUFFIX}")):
+        play_id = path.name[: -len(PLACES_SUFFIX)]
+        places_by_play[play_id] = pd.read_csv(path)
+    return places_by_play
+
+
+def _stack_places(
+    places_by_play: dict[str, pd.DataFrame],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    lats, lons, weights = [], [], []
+    n_plays = len(places_by_play)
+    for column, places in enumerate(places_by_play.values()):
+        if "geocode_lat" not in places.columns or "geocode_lon" not in places.columns:
+            continue
+        lat = pd.to_numeric(places["geocode_lat"], errors="coerce")
+        lon = pd.to_numeric(places["geocode_lon"], errors="coerce")
+        if "mention_count" in places.columns:
+            count = pd.to_numeric(places["mention_count"], errors="coerce")
+        else:
+            count = pd.Series(1.0, index=places.index)
+
+        lat, lon, count = (v.to_numpy(dtype=float, na_value=np.nan) for v in (lat, lon, count))
+        mask = np.isfinite(lat) & np.isfinite(lon) & np.isfinite(count) & (count > 0)
+        if not mask.any():
+            continue
+
+        membership = np.zeros((int(mask.sum()), n_plays))
+        membership[:, column] = count[mask] / count[mask].sum()
+        lats.append(lat[mask])
+        lons.append(lon[mask])
+        weights.append(membership)
+
+    if not lats:
+        return np.empty(0), np.empty(0), np.empty((0, n_plays))
+    return np.concatenate(lats), np.concatenate(lons), np.vstack(weights)
+
+
+def expected_distance_matrix(
+    places_by_play: dict[str, pd.DataFrame],
+    block_cells: int = DEFAULT_BLOCK_CELLS,
+) -> pd.DataFrame:
+    # M[a, b] = sum_i sum_j w_a(i) w_b(j) haversine(i, j), where w_p is play
+    # p's mention distribution over places. With W the places-by-plays
+    # weight matrix this is W.T @ D @ W; D is built one row block at a time
+    # so memory stays bounded by block_cells.
+    play_ids = list(places_by_play)
+    lat, lon, weights = _stack_places(places_by_play)
+    expected = np.zeros((len(play_ids), len(play_ids)))
+
+    # The same town shows up in many plays; collapse identical coordinates
+    # into one row of W before building D.
+    coords, inverse = np.unique(np.column_stack((lat, lon)), axis=0, return_inverse=True)
+    unique_weights = np.zeros((len(coords), len(play_ids)))
+    np.add.at(unique_weights, inverse.ravel(), weights)
+    points = to_unit_vectors(coords[:, 0], coords[:, 1]).reshape(-1, 3)
+
+    n_places = len(points)
+    if n_places:
+        block = max(1, block_cells // n_places)
+        for start in range(0, n_places, block):
+            stop = min(start + block, n_places)
+            # Great-circle distances from one BLAS product of unit vectors.
+            distances = EARTH_RADIUS_KM * np.arccos(
+                np.clip(points[start:stop] @ points.T, -1.0, 1.0)
+            )
+            expected += unique_weights[start:stop].T @ (distances @ unique_weights)
+
+    has_places = weights.sum(axis=0) > 0
+    expected[~has_places, :] = np.nan
+    expected[:, ~has_places] = np.nan
+    return pd.DataFrame(expected, index=play_ids, columns=play_ids)
+
+
+def play_distance_matrix(
+    places_by_play: dict[str, pd.DataFrame],
+    metric: str = "energy",
+    block_cells: int = DEFAULT_BLOCK_CELLS,
+) -> pd.DataFrame:
+    if metric not in DISTANCE_METRICS:
+        raise ValueError(f"Unknown distance metric: {metric}")
+
+    expected = expected_distance_matrix(places_by_play, block_cells=block_cells)
+    if metric == "mean_haversine":
+        return expected
+
+    # Energy distance: 2 E|X - Y| - E|X - X'| - E|Y - Y'|. Zero for identical
+    # place distributions, and a cheap stand-in for Earth mover's distance
+    # that falls out of the same expected-distance matrix.
+    values = expected.to_numpy()
+    self_terms = np.diag(values)
+    energy = 2.0 * values - self_terms[:, None] - self_terms[None, :]
+    energy = np.clip(energy, 0.0, None)
+    np.fill_diagonal(energy, np.where(np.isfinite(self_terms), 0.0, np.nan))
+    return pd.DataFrame(energy, index=expected.index, columns=expected.columns)
@@ -5,6 +5,12 @@ from typing import List
 
 import langextract as lx
 
+from shakespeare_geo import trace
+
+
+# Size of the text slices the pipelined runner sends to the LLM one at a
+# time; langextract still does its own finer chunking inside each call.
+DEFAULT_CHUNK_CHARS = 20_000
 
 PROMPT = """
 Extract only real-world settlement placenames from the play.
@@ -122,6 +128,7 @@ def build_examples() -> List[lx.data.ExampleData]:
     ]
 
 
+@trace.traced("extract_places")
 def extract_places(text: str, model_id: str) -> list[lx.data.Extraction]:
     api_key = os.environ.get("OPENAI_API_KEY") or os.environ.get("LANGEXTRACT_API_KEY")
 
@@ -135,4 +142,27 @@ def extract_places(text: str, model_id: str) -> list[lx.data.Extraction]:
         use_schema_constraints=False,
     )
 
-    return list(result.extractions)
+    trace.count("llm_calls")
+    extractions = list(result.extractions)
+    trace.count("extractions", len(extractions))
+    return extractions
+
+
+def split_text_chunks(text: str, max_chars: int = DEFAULT_CHUNK_CHARS) -> list[tuple[int, str]]:
+    # (offset, chunk) pairs covering text exactly, cut at a blank line (or
+    # failing that a line break) so speeches are not split mid-line.
+    if max_chars <= 0:
+        raise ValueError("max_chars must be positive")
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + max_chars, len(text))
+        if end < len(text):
+            cut = text.rfind("\n\n", start, end)
+            if cut <= start:
+                cut = text.rfind("\n", start, end)
+            if cut > start:
+                end = cut + 1
+        chunks.append((start, text[start:end]))
+        start = end
+    return chunks
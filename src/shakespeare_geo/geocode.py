@@ -8,6 +8,8 @@ from typing import Dict, Optional
 import requests
 from requests import HTTPError
 
+from shakespeare_geo import trace
+
 
 NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
 STALE_ADMIN_ADDRESSTYPES = {
@@ -78,6 +80,11 @@ def normalize_cached_result(value: object) -> tuple[dict | None, bool]:
     return normalized, is_stale
 
 
+def _rate_limit_sleep(sleep_s: float) -> None:
+    trace.count("nominatim_sleep_s", float(sleep_s))
+    time.sleep(sleep_s)
+
+
 def _query_nominatim(
     query: str,
     session: requests.Session,
@@ -98,15 +105,17 @@ def _query_nominatim(
         params["email"] = email
     headers = {"User-Agent": user_agent}
 
+    trace.count("nominatim_requests")
     resp = session.get(NOMINATIM_URL, params=params, headers=headers, timeout=30)
     try:
         resp.raise_for_status()
     except HTTPError:
-        time.sleep(sleep_s)
+        trace.count("nominatim_http_errors")
+        _rate_limit_sleep(sleep_s)
         return None, True
 
     data = resp.json()
-    time.sleep(sleep_s)
+    _rate_limit_sleep(sleep_s)
     if not data:
         return None, False
 
@@ -142,8 +151,10 @@ def load_cache(path: Path) -> Dict[str, dict | None]:
 def save_cache(path: Path, cache: Dict[str, dict | None]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     path.write_text(json.dumps(cache, indent=2, sort_keys=True))
+    trace.count_bytes(path)
 
 
+@trace.traced("geocode_place")
 def geocode_place(
     query: str,
     session: requests.Session,
@@ -156,8 +167,11 @@ def geocode_place(
         normalized, is_stale = normalize_cached_result(cache.get(query))
         cache[query] = normalized
         if not is_stale:
+            trace.count("geocode_cache_hits")
             return normalized
 
+    trace.count("geocode_cache_misses")
+
     # Try settlement-focused query first to avoid broad administrative matches.
     for featuretype in ("settlement", None):
         result, had_http_error = _query_nominatim(
@@ -1,76 +1,422 @@
 from __future__ import annotations
 
+import hashlib
+import io
+import json
+import mmap
+import os
 import re
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Iterable, Iterator
+
 import requests
 
+from shakespeare_geo import trace
 
-_DRAMATIS_RE = re.compile(r"^dramatis person", re.IGNORECASE)
-_PROLOGUE_RE = re.compile(r"^(?:the\s+)?prologue\b", re.IGNORECASE)
-_ACT_I_RE = re.compile(r"^act\s+i\b", re.IGNORECASE)
 
+# "Dramatis Personae", a prologue heading, or ACT I, matched once per line.
+_PLAY_MARKER_RE = re.compile(
+    r"(?P<dramatis>dramatis person)|(?:the\s+)?(?P<prologue>prologue)\b|(?P<act_i>act\s+i)\b",
+    re.IGNORECASE,
+)
+_CONTENTS_RE = re.compile(r"^contents$", re.IGNORECASE)
+_TITLE_PREFIX_RE = re.compile(
+    r"^(?:the\s+)?(?:(?:tragedy|comedy|history|life(?:\s+and\s+death)?)\s+of\s+)?",
+    re.IGNORECASE,
+)
+DEFAULT_MIRROR_DIR = Path("data/raw")
+DOWNLOAD_CHUNK_BYTES = 1 << 16
+COMPLETE_WORKS_URL = "https://www.gutenberg.org/cache/epub/100/pg100.txt"
+MANIFEST_VERSION = 1
 
-def fetch_gutenberg_text(url: str, timeout_s: int = 30) -> str:
-    response = requests.get(url, timeout=timeout_s)
-    response.raise_for_status()
-    return response.text
 
+def mirror_paths(url: str, mirror_dir: Path) -> tuple[Path, Path]:
+    digest = hashlib.sha256(url.encode()).hexdigest()[:16]
+    name = url.rstrip("/").rsplit("/", 1)[-1] or "source"
+    body_path = Path(mirror_dir) / f"{digest}-{name}"
+    return body_path, body_path.with_name(body_path.name + ".meta.json")
 
-def trim_play_front_matter(text: str) -> str:
-    lines = text.splitlines()
-    if not lines:
-        return text
 
-    start_candidates = []
-    prologue_indices = []
-    act_i_indices = []
+def mirror_gutenberg_source(
+    url: str,
+    mirror_dir: Path = DEFAULT_MIRROR_DIR,
+    session: requests.Session | None = None,
+    timeout_s: int = 30,
+) -> tuple[Path, dict]:
+    # Keeps the raw bytes plus ETag/Last-Modified so later refreshes are
+    # conditional requests that usually come back 304 with no body.
+    body_path, meta_path = mirror_paths(url, mirror_dir)
+    meta = {}
+    if body_path.exists() and meta_path.exists():
+        meta = json.loads(meta_path.read_text())
 
-    for i, line in enumerate(lines):
-        stripped = line.strip()
-        if _PROLOGUE_RE.match(stripped):
-            prologue_indices.append(i)
-            start_candidates.append(i)
-        elif _ACT_I_RE.match(stripped):
-            act_i_indices.append(i)
-            start_candidates.append(i)
-
-    if not start_candidates:
-        return text.strip()
-
-    dramatis_idx = next(
-        (i for i, line in enumerate(lines) if _DRAMATIS_RE.match(line.strip())),
-        None,
-    )
-    if dramatis_idx is not None:
-        after_dramatis = [i for i in start_candidates if i > dramatis_idx]
-        if after_dramatis:
-            return "\n".join(lines[min(after_dramatis) :]).strip()
-
-    if len(act_i_indices) >= 2:
-        second_act_i = act_i_indices[1]
-        prologues_before = [i for i in prologue_indices if i < second_act_i]
-        start_idx = max(prologues_before) if prologues_before else second_act_i
-        return "\n".join(lines[start_idx:]).strip()
-
-    return "\n".join(lines[start_candidates[0] :]).strip()
-
-
-def strip_gutenberg_header_footer(text: str) -> str:
-    lines = text.splitlines()
-    start_idx = None
-    end_idx = None
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
 
-    for i, line in enumerate(lines):
-        if line.startswith("*** START OF"):
-            start_idx = i + 1
-            break
+    http = session or requests
+    trace.count("gutenberg_requests")
+    with http.get(url, headers=headers, stream=True, timeout=timeout_s) as response:
+        checked_at = datetime.now(UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
+        if response.status_code == 304 and meta:
+            meta["checked_at"] = checked_at
+            meta_path.write_text(json.dumps(meta, indent=2))
+            return body_path, {**meta, "status": 304}
+        response.raise_for_status()
+
+        body_path.parent.mkdir(parents=True, exist_ok=True)
+        partial_path = body_path.with_name(body_path.name + ".part")
+        digest = hashlib.sha256()
+        size = 0
+        with partial_path.open("wb") as handle:
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_BYTES):
+                handle.write(chunk)
+                digest.update(chunk)
+                size += len(chunk)
+        os.replace(partial_path, body_path)
+
+        meta = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "encoding": response.encoding,
+            "sha256": digest.hexdigest(),
+            "bytes": size,
+            "checked_at": checked_at,
+        }
+        meta_path.write_text(json.dumps(meta, indent=2))
+        return body_path, {**meta, "status": response.status_code}
+
+
+def fetch_gutenberg_text(
+    url: str,
+    timeout_s: int = 30,
+    mirror_dir: Path | None = None,
+) -> str:
+    if mirror_dir is None:
+        trace.count("gutenberg_requests")
+        response = requests.get(url, timeout=timeout_s)
+        response.raise_for_status()
+        return response.text
+
+    body_path, meta = mirror_gutenberg_source(url, mirror_dir=mirror_dir, timeout_s=timeout_s)
+    return body_path.read_bytes().decode(meta.get("encoding") or "utf-8", errors="replace")
+
+
+class _PlayStartTracker:
+    # Running state for picking where the play proper begins, so the choice
+    # can be made in one forward pass. Positions are whatever the caller
+    # feeds in (line numbers or character offsets). Rules, in order: the
+    # first prologue/ACT I after "Dramatis Personae"; else, when a contents
+    # list repeats ACT I, the last prologue before the second ACT I (or that
+    # ACT I itself); else the first prologue/ACT I.
+
+    def __init__(self):
+        self.first_candidate: int | None = None
+        self.seen_dramatis = False
+        self.after_dramatis: int | None = None
+        self.act_i_count = 0
+        self.second_act_i: int | None = None
+        self.last_prologue: int | None = None
+
+    def feed(self, position: int, stripped: str) -> None:
+        match = _PLAY_MARKER_RE.match(stripped)
+        if match is None:
+            return
+        if match.group("dramatis"):
+            self.seen_dramatis = True
+            return
 
+        is_prologue = match.group("prologue") is not None
+
+        if self.first_candidate is None:
+            self.first_candidate = position
+        if self.seen_dramatis and self.after_dramatis is None:
+            self.after_dramatis = position
+        if is_prologue:
+            if self.second_act_i is None:
+                self.last_prologue = position
+        else:
+            self.act_i_count += 1
+            if self.act_i_count == 2:
+                self.second_act_i = position
+
+    def start(self) -> int | None:
+        if self.first_candidate is None:
+            return None
+        if self.after_dramatis is not None:
+            return self.after_dramatis
+        if self.second_act_i is not None:
+            return self.last_prologue if self.last_prologue is not None else self.second_act_i
+        return self.first_candidate
+
+
+def play_start_index(lines: Iterable[str]) -> int | None:
+    tracker = _PlayStartTracker()
     for i, line in enumerate(lines):
+        tracker.feed(i, line.strip())
+    return tracker.start()
+
+
+def _iter_chunks(source: str | Iterable[str]) -> Iterator[str]:
+    if not isinstance(source, str):
+        yield from source
+        return
+    start = 0
+    while start < len(source):
+        end = source.find("\n", start)
+        if end < 0:
+            yield source[start:]
+            return
+        yield source[start : end + 1]
+        start = end + 1
+
+
+def iter_text_lines(source: str | Iterable[str], raw: io.StringIO | None = None) -> Iterator[str]:
+    # Lazily yields exactly what source.splitlines() would, from a string or
+    # any iterable of newline-terminated chunks (e.g. an open text file).
+    # When raw is given, the untouched input is copied into it as it is read.
+    for chunk in _iter_chunks(source):
+        if raw is not None:
+            raw.write(chunk)
+        yield from chunk.splitlines()
+
+
+class _TrimmedBody:
+    # Joins lines with "\n" into one buffer while tracking where the play
+    # starts, so trimming never needs a list of lines.
+
+    def __init__(self):
+        self.buffer = io.StringIO()
+        self.tracker = _PlayStartTracker()
+        self.offset = 0
+        self.line_count = 0
+
+    def add(self, line: str) -> None:
+        self.tracker.feed(self.offset, line.strip())
+        self.buffer.write(line)
+        self.buffer.write("\n")
+        self.offset += len(line) + 1
+        self.line_count += 1
+
+    def text(self) -> str:
+        start = self.tracker.start()
+        return self.buffer.getvalue()[start or 0 :].strip()
+
+
+def trim_play_front_matter(text: str | Iterable[str]) -> str:
+    body = _TrimmedBody()
+    for line in iter_text_lines(text):
+        body.add(line)
+
+    if isinstance(text, str):
+        if not body.line_count:
+            return text
+        if body.tracker.start() is None:
+            return text.strip()
+    return body.text()
+
+
+def _is_seekable(source: object) -> bool:
+    seekable = getattr(source, "seekable", None)
+    return bool(seekable and seekable())
+
+
+def strip_gutenberg_header_footer(text: str | Iterable[str]) -> str:
+    # One forward pass: skip to the START marker, buffer the body up to the
+    # first END marker while tracking the play start, then trim. Without
+    # valid markers the input comes back unchanged; for non-seekable
+    # iterables that means keeping a raw copy as we read.
+    seekable = _is_seekable(text)
+    origin = text.tell() if seekable else 0
+    raw = None if isinstance(text, str) or seekable else io.StringIO()
+    lines = iter_text_lines(text, raw=raw)
+
+    started = False
+    ended = False
+    body = _TrimmedBody()
+    for line in lines:
         if line.startswith("*** END OF"):
-            end_idx = i
+            ended = True
             break
+        if started:
+            body.add(line)
+        elif line.startswith("*** START OF"):
+            started = True
 
-    if start_idx is None or end_idx is None or start_idx >= end_idx:
+    if started and ended and body.line_count:
+        return body.text()
+
+    if isinstance(text, str):
         return text
+    if seekable:
+        text.seek(origin)
+        return text.read()
+    for _ in lines:
+        pass
+    return raw.getvalue()
+
+
+def play_id_from_title(title: str) -> str:
+    # "THE TRAGEDY OF ROMEO AND JULIET" -> "romeo_juliet"
+    title = re.sub(r"[\u2019']", "", title)
+    title = _TITLE_PREFIX_RE.sub("", title.strip())
+    words = re.findall(r"[a-z0-9]+", title.lower())
+    return "_".join(word for word in words if word not in {"the", "and"})
+
+
+def _finish_work(
+    title: str,
+    lines: list[str],
+    offsets: list[int],
+    include_poems: bool,
+) -> dict | None:
+    start_idx = play_start_index(lines)
+    kind = "play" if start_idx is not None else "poem"
+    if kind == "poem" and not include_poems:
+        return None
+
+    start_idx = start_idx or 0
+    nonblank = [i for i in range(start_idx, len(lines)) if lines[i].strip()]
+    if not nonblank:
+        return None
+    first, last = nonblank[0], nonblank[-1]
+    text = "\n".join(lines[first : last + 1]).strip()
+
+    first_line = lines[first]
+    leading = first_line[: len(first_line) - len(first_line.lstrip())]
+    return {
+        "play_id": play_id_from_title(title),
+        "title": title,
+        "kind": kind,
+        # Byte range of the trimmed body in the raw source; decode the slice
+        # and normalize line endings to get the emitted text back.
+        "source_start": offsets[first] + len(leading.encode("utf-8")),
+        "source_end": offsets[last] + len(lines[last].rstrip().encode("utf-8")),
+        "text": text,
+    }
+
+
+def iter_complete_works(
+    handle: Iterable[bytes],
+    titles: Iterable[str] | None = None,
+    include_poems: bool = False,
+) -> Iterable[dict]:
+    # One forward pass over the raw bytes: skip the Gutenberg header, read
+    # the table of contents (unless titles are given), then cut a new work
+    # whenever a contents title appears on its own line after a blank one.
+    # Only the current work is held in memory.
+    known_titles = set(titles or ())
+    reading_contents = False
+    in_body = False
+    offset = 0
+    previous_blank = True
+    title = None
+    lines: list[str] = []
+    offsets: list[int] = []
+
+    for raw in handle:
+        line_offset = offset
+        offset += len(raw)
+        line = raw.rstrip(b"\r\n").decode("utf-8")
+        if line_offset == 0:
+            line = line.lstrip("\ufeff")
+            line_offset += len(raw) - len(raw.lstrip(b"\xef\xbb\xbf"))
+
+        if not in_body:
+            in_body = line.startswith("*** START OF")
+            continue
+        if line.startswith("*** END OF"):
+            break
+
+        stripped = line.strip()
+        if title is None and not known_titles and _CONTENTS_RE.match(stripped):
+            reading_contents = True
+        elif reading_contents and stripped:
+            if stripped not in known_titles:
+                known_titles.add(stripped)
+                previous_blank = False
+                continue
+            reading_contents = False
+
+        if not reading_contents and previous_blank and stripped in known_titles:
+            if title is not None:
+                work = _finish_work(title, lines, offsets, include_poems)
+                if work is not None:
+                    yield work
+            title, lines, offsets = stripped, [], []
+        elif title is not None:
+            lines.append(line)
+            offsets.append(line_offset)
+        previous_blank = not stripped
+
+    if title is not None:
+        work = _finish_work(title, lines, offsets, include_poems)
+        if work is not None:
+            yield work
+
+
+def _hashed_lines(handle: Iterable[bytes], digest) -> Iterable[bytes]:
+    for raw in handle:
+        digest.update(raw)
+        yield raw
+
+
+def split_complete_works(
+    source_path: Path,
+    plays_dir: Path,
+    manifest_path: Path | None = None,
+    titles: Iterable[str] | None = None,
+    include_poems: bool = False,
+) -> dict:
+    source_path = Path(source_path)
+    plays_dir = Path(plays_dir)
+    manifest_path = Path(manifest_path) if manifest_path else plays_dir / "manifest.json"
+    plays_dir.mkdir(parents=True, exist_ok=True)
+
+    source_digest = hashlib.sha256()
+    entries = []
+    with source_path.open("rb") as handle:
+        for work in iter_complete_works(
+            _hashed_lines(handle, source_digest),
+            titles=titles,
+            include_poems=include_poems,
+        ):
+            text = work.pop("text")
+            encoded = text.encode("utf-8")
+            play_path = plays_dir / f"{work['play_id']}.txt"
+            play_path.write_bytes(encoded)
+            entries.append(
+                {
+                    **work,
+                    "path": str(play_path),
+                    "bytes": len(encoded),
+                    "sha256": hashlib.sha256(encoded).hexdigest(),
+                }
+            )
+        # The footer after the END marker still belongs to the source hash.
+        for raw in handle:
+            source_digest.update(raw)
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "source": str(source_path),
+        "source_sha256": source_digest.hexdigest(),
+        "plays": entries,
+    }
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    manifest_path.write_text(json.dumps(manifest, indent=2, ensure_ascii=False))
+    return manifest
+
 
-    body = "\n".join(lines[start_idx:end_idx]).strip()
-    return trim_play_front_matter(body)
+def read_source_slice(source_path: Path, entry: dict) -> str:
+    # Reads one work straight out of the memory-mapped source using its
+    # manifest byte range.
+    with Path(source_path).open("rb") as handle, mmap.mmap(
+        handle.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mapped:
+        raw = mapped[entry["source_start"] : entry["source_end"]]
+    return "\n".join(raw.decode("utf-8").splitlines())
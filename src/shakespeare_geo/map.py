@@ -1,40 +1,361 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import math
+import re
+from pathlib import Path
 from typing import Iterable
 
 import folium
+import pandas as pd
+import requests
+from folium.plugins import MarkerCluster
+from folium.template import Template
 
+from shakespeare_geo import trace
+from shakespeare_geo.aggregate import CenterOfGravityAccumulator, ConfidenceRegion
 
+
+MAP_MODES = ("markers", "geojson")
+MARKER_COLOR = "#1f77b4"
+# ~1 m at the equator; plenty for place markers and keeps the payload small.
+COORD_DECIMALS = 5
+PLAY_COLORS = (
+    "#1f77b4",
+    "#ff7f0e",
+    "#2ca02c",
+    "#d62728",
+    "#9467bd",
+    "#8c564b",
+    "#e377c2",
+    "#7f7f7f",
+    "#bcbd22",
+    "#17becf",
+)
+LAYER_CACHE_VERSION = 1
+# Natural Earth 1:110m land, dissolved and simplified to ~60 KB.
+LAND_GEOJSON_PATH = Path(__file__).parent / "assets" / "land_110m.geojson"
+DEFAULT_ASSET_CACHE_DIR = Path("data/map_assets")
+# folium.Map also pulls in jQuery, Bootstrap and Font Awesome for features we
+# never use; offline maps only inline Leaflet itself (plus plugin assets).
+_OFFLINE_MAP_ASSETS = {"leaflet", "leaflet_css"}
+_SCRIPT_SRC_RE = re.compile(r'<script src="(?P<url>[^"]+)"></script>')
+_STYLESHEET_RE = re.compile(r'<link rel="stylesheet" href="(?P<url>[^"]+)"\s*/>')
+# Leaflet's CSS points its default marker and layer-toggle images at
+# images/ next to the stylesheet, which an inlined copy cannot resolve.
+_RELATIVE_CSS_URL_RE = re.compile(r"""url\((?!['"]?(?:data:|https?:|/))[^)]*\)""")
+
+
+def _place_location(place: dict) -> tuple[float, float] | None:
+    lat = place.get("geocode_lat")
+    lon = place.get("geocode_lon")
+    if lat is None or lon is None:
+        return None
+    if not math.isfinite(lat) or not math.isfinite(lon):
+        return None
+    return lat, lon
+
+
+def _place_name(place: dict) -> str:
+    # Rows read back from CSV carry NaN rather than None for missing names.
+    for key in ("geocode_name", "normalized_place"):
+        value = place.get(key)
+        if isinstance(value, str) and value:
+            return value
+    return ""
+
+
+def places_to_feature_collection(places: Iterable[dict]) -> dict:
+    features = []
+    for place in places:
+        location = _place_location(place)
+        if location is None:
+            continue
+        lat, lon = location
+        features.append(
+            {
+                "type": "Feature",
+                "geometry": {
+                    "type": "Point",
+                    "coordinates": [round(lon, COORD_DECIMALS), round(lat, COORD_DECIMALS)],
+                },
+                "properties": {
+                    "name": _place_name(place),
+                    "mention_count": int(place.get("mention_count", 1)),
+                },
+            }
+        )
+    return {"type": "FeatureCollection", "features": features}
+
+
+class GeoJsonClusterLayer(MarkerCluster):
+    # One FeatureCollection literal plus a single pointToLayer/onEachFeature
+    # pair, instead of a generated JS block per marker. Marker size and popup
+    # text are derived from feature properties in the browser.
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+            var {{ this.get_name() }} = (function(){
+                var data = {{ this.data|tojson }};
+                var cluster = L.markerClusterGroup({{ this.options|tojavascript }});
+                var layer = L.geoJSON(data, {
+                    pointToLayer: function (feature, latlng) {
+                        var count = feature.properties.mention_count || 1;
+                        return L.circleMarker(latlng, {
+                            radius: 4 + Math.min(count, 10),
+                            color: {{ this.color|tojson }},
+                            fillColor: {{ this.color|tojson }},
+                            fill: true,
+                            fillOpacity: 0.7
+                        });
+                    },
+                    onEachFeature: function (feature, marker) {
+                        var label = document.createElement("span");
+                        label.textContent = feature.properties.name +
+                            " (mentions: " + feature.properties.mention_count + ")";
+                        marker.bindPopup(label);
+                    }
+                });
+                cluster.addLayer(layer);
+                cluster.addTo({{ this._parent.get_name() }});
+                return cluster;
+            })();
+        {% endmacro %}"""
+    )
+
+    def __init__(
+        self,
+        data: dict,
+        name: str | None = None,
+        color: str = MARKER_COLOR,
+        overlay: bool = True,
+        control: bool = True,
+        show: bool = True,
+        **kwargs,
+    ):
+        super().__init__(name=name, overlay=overlay, control=control, show=show, **kwargs)
+        self._name = "GeoJsonClusterLayer"
+        self.data = data
+        self.color = color
+
+
+def fetch_map_asset(url: str, cache_dir: Path, timeout_s: int = 30) -> str:
+    # Fetched once at build time and reused for every later map.
+    cache_dir = Path(cache_dir)
+    digest = hashlib.sha256(url.encode()).hexdigest()[:16]
+    cache_path = cache_dir / f"{digest}-{url.rsplit('/', 1)[-1]}"
+    if cache_path.exists():
+        return cache_path.read_text(encoding="utf-8")
+
+    response = requests.get(url, timeout=timeout_s)
+    response.raise_for_status()
+    response.encoding = response.encoding or "utf-8"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    cache_path.write_text(response.text, encoding="utf-8")
+    return response.text
+
+
+def inline_map_assets(html: str, cache_dir: Path) -> str:
+    def inline_script(match: re.Match) -> str:
+        source = fetch_map_asset(match.group("url"), cache_dir)
+        return "<script>" + source.replace("</script", "<\\/script") + "</script>"
+
+    def inline_stylesheet(match: re.Match) -> str:
+        source = _RELATIVE_CSS_URL_RE.sub("none", fetch_map_asset(match.group("url"), cache_dir))
+        return "<style>" + source.replace("</style", "<\\/style") + "</style>"
+
+    html = _SCRIPT_SRC_RE.sub(inline_script, html)
+    return _STYLESHEET_RE.sub(inline_stylesheet, html)
+
+
+def _new_map(center_lat: float, center_lon: float, zoom_start: int, offline: bool) -> folium.Map:
+    if not offline:
+        return folium.Map(location=[center_lat, center_lon], zoom_start=zoom_start)
+
+    m = folium.Map(location=[center_lat, center_lon], zoom_start=zoom_start, tiles=None)
+    m.default_js = [asset for asset in m.default_js if asset[0] in _OFFLINE_MAP_ASSETS]
+    m.default_css = [asset for asset in m.default_css if asset[0] in _OFFLINE_MAP_ASSETS]
+    m.get_root().header.add_child(
+        folium.Element("<style>.leaflet-container { background: #dbe9f4; }</style>")
+    )
+    folium.GeoJson(
+        json.loads(LAND_GEOJSON_PATH.read_text()),
+        name="Land",
+        style_function=lambda feature: {
+            "color": "#9aa7b1",
+            "weight": 0.6,
+            "fillColor": "#f4f1ea",
+            "fillOpacity": 1.0,
+        },
+        control=False,
+        interactive=False,
+    ).add_to(m)
+    return m
+
+
+def _save_map(
+    m: folium.Map,
+    output_path: str,
+    offline: bool,
+    asset_cache_dir: Path,
+) -> None:
+    if not offline:
+        m.save(output_path)
+        return
+    html = inline_map_assets(m.get_root().render(), asset_cache_dir)
+    Path(output_path).write_text(html, encoding="utf-8")
+
+
+@trace.traced("build_map")
 def build_map(
     center_lat: float,
     center_lon: float,
     places: Iterable[dict],
     output_path: str,
+    confidence_region: ConfidenceRegion | None = None,
+    mode: str = "markers",
+    offline: bool = False,
+    asset_cache_dir: Path = DEFAULT_ASSET_CACHE_DIR,
 ) -> None:
+    if mode not in MAP_MODES:
+        raise ValueError(f"Unknown map mode: {mode}")
     if not math.isfinite(center_lat) or not math.isfinite(center_lon):
         center_lat, center_lon = 0.0, 0.0
 
-    m = folium.Map(location=[center_lat, center_lon], zoom_start=5)
+    m = _new_map(center_lat, center_lon, zoom_start=5, offline=offline)
 
-    for place in places:
-        lat = place.get("geocode_lat")
-        lon = place.get("geocode_lon")
-        if lat is None or lon is None:
-            continue
-        if not math.isfinite(lat) or not math.isfinite(lon):
-            continue
+    # Offline maps store places as one compact FeatureCollection rather than
+    # per-marker code.
+    if mode == "geojson" or offline:
+        GeoJsonClusterLayer(places_to_feature_collection(places), name="Places").add_to(m)
+    else:
+        for place in places:
+            location = _place_location(place)
+            if location is None:
+                continue
 
-        name = place.get("geocode_name") or place.get("normalized_place")
-        count = place.get("mention_count", 1)
-        popup = f"{name} (mentions: {count})"
-        folium.CircleMarker(
-            location=[lat, lon],
-            radius=4 + min(count, 10),
-            popup=popup,
-            color="#1f77b4",
+            name = _place_name(place)
+            count = place.get("mention_count", 1)
+            popup = f"{name} (mentions: {count})"
+            folium.CircleMarker(
+                location=list(location),
+                radius=4 + min(count, 10),
+                popup=popup,
+                color=MARKER_COLOR,
+                fill=True,
+                fill_opacity=0.7,
+            ).add_to(m)
+
+    if confidence_region is not None:
+        label = f"{confidence_region.confidence:.0%} CoG confidence"
+        folium.Rectangle(
+            bounds=[
+                [confidence_region.lat_low, confidence_region.lon_low],
+                [confidence_region.lat_high, confidence_region.lon_high],
+            ],
+            tooltip=f"{label} (percentile box)",
+            color="#d62728",
+            weight=1,
+            dash_array="4",
+            fill=False,
+        ).add_to(m)
+        folium.Polygon(
+            locations=confidence_region.ellipse_points(),
+            tooltip=f"{label} (ellipse)",
+            color="#d62728",
+            weight=2,
             fill=True,
-            fill_opacity=0.7,
+            fill_opacity=0.15,
         ).add_to(m)
 
-    m.save(output_path)
+    _save_map(m, output_path, offline=offline, asset_cache_dir=asset_cache_dir)
+    trace.count_bytes(output_path)
+
+
+def load_play_layer(places_csv: Path, cache_dir: Path) -> dict:
+    # Per-play layer payloads are keyed by a hash of the places CSV, so adding
+    # or rerunning one play only rebuilds that play's layer.
+    places_csv = Path(places_csv)
+    source_hash = hashlib.sha256(places_csv.read_bytes()).hexdigest()
+    cache_path = Path(cache_dir) / f"{places_csv.stem}.layer.json"
+    if cache_path.exists():
+        cached = json.loads(cache_path.read_text())
+        if (
+            cached.get("source_sha256") == source_hash
+            and cached.get("version") == LAYER_CACHE_VERSION
+        ):
+            return cached
+
+    places_df = pd.read_csv(places_csv)
+    records = places_df.to_dict(orient="records")
+    accumulator = CenterOfGravityAccumulator()
+    if not places_df.empty:
+        accumulator.update(places_df, weight_column="mention_count")
+
+    layer = {
+        "version": LAYER_CACHE_VERSION,
+        "source_sha256": source_hash,
+        "features": places_to_feature_collection(records),
+        "accumulator": accumulator.to_dict(),
+    }
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    cache_path.write_text(json.dumps(layer, separators=(",", ":")))
+    return layer
+
+
+def build_corpus_map(
+    places_csvs: dict[str, Path],
+    output_path: str,
+    cache_dir: Path,
+    titles: dict[str, str] | None = None,
+    cog_method: str = "spherical",
+    offline: bool = False,
+    asset_cache_dir: Path = DEFAULT_ASSET_CACHE_DIR,
+) -> None:
+    titles = titles or {}
+    layers = {
+        play_id: load_play_layer(path, cache_dir) for play_id, path in places_csvs.items()
+    }
+
+    corpus = CenterOfGravityAccumulator()
+    for layer in layers.values():
+        corpus.merge(CenterOfGravityAccumulator.from_dict(layer["accumulator"]))
+    center_lat, center_lon = corpus.center(cog_method)
+
+    m = _new_map(center_lat, center_lon, zoom_start=4, offline=offline)
+    cog_group = folium.FeatureGroup(name="Centers of gravity")
+
+    for i, (play_id, layer) in enumerate(layers.items()):
+        color = PLAY_COLORS[i % len(PLAY_COLORS)]
+        title = titles.get(play_id, play_id)
+        GeoJsonClusterLayer(layer["features"], name=title, color=color).add_to(m)
+
+        accumulator = CenterOfGravityAccumulator.from_dict(layer["accumulator"])
+        if accumulator.count:
+            play_lat, play_lon = accumulator.center(cog_method)
+            folium.CircleMarker(
+                location=[play_lat, play_lon],
+                radius=6,
+                tooltip=f"{title} CoG",
+                color=color,
+                fill=True,
+                fill_opacity=1.0,
+            ).add_to(cog_group)
+
+    if corpus.count:
+        # A circle rather than Leaflet's default icon, whose image an
+        # offline map does not carry.
+        folium.CircleMarker(
+            location=[center_lat, center_lon],
+            radius=9,
+            tooltip=f"Corpus CoG ({len(layers)} plays)",
+            color="#000000",
+            weight=3,
+            fill=True,
+            fill_color="#ffffff",
+            fill_opacity=1.0,
+        ).add_to(cog_group)
+    cog_group.add_to(m)
+    folium.LayerControl(collapsed=False).add_to(m)
+    _save_map(m, output_path, offline=offline, asset_cache_dir=asset_cache_dir)
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import json
+import linecache
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import ContextManager, Iterator
+
+
+# Installed by run_play --trace-memory; see trace._tracer.
+_tracker: MemoryTracker | None = None
+_NO_STAGE = nullcontext()
+DEFAULT_TOP_SITES = 10
+_IGNORED_FILES = (tracemalloc.__file__, linecache.__file__, "<frozen importlib._bootstrap>")
+
+
+class MemoryTracker:
+    # Python heap use per stage from tracemalloc: the peak above what was
+    # live when the stage started, what the stage left allocated when it
+    # finished, and the source lines holding most of that retained memory.
+    # Those sites come from snapshots at stage entry and exit, so memory a
+    # stage allocates and frees again (what drives its peak) is not listed.
+    # Only Python-level allocations are seen (numpy/pandas buffers are, as
+    # they go through the Python allocator; C libraries' own mallocs are
+    # not), so compare with RSS before sizing workers.
+
+    def __init__(self, top: int = DEFAULT_TOP_SITES):
+        self.top = top
+        self.stages: dict[str, dict] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        before = self._snapshot()
+        start_current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            after = self._snapshot()
+            sites = after.compare_to(before, "lineno")
+            self.stages[name] = {
+                "start_mb": round(start_current / 2**20, 3),
+                "peak_mb": round((peak - start_current) / 2**20, 3),
+                "retained_mb": round((current - start_current) / 2**20, 3),
+                "retained_sites": [
+                    {
+                        "site": f"{site.traceback[0].filename}:{site.traceback[0].lineno}",
+                        "retained_kb": round(site.size_diff / 1024, 1),
+                        "blocks": site.count_diff,
+                    }
+                    for site in sorted(sites, key=lambda site: -site.size_diff)[: self.top]
+                    if site.size_diff > 0
+                ],
+            }
+
+    @staticmethod
+    def _snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, filename) for filename in _IGNORED_FILES]
+        )
+
+    def write(self, path: Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"stages": self.stages}, indent=2))
+        return path
+
+    def summary_table(self) -> str:
+        lines = [f"{'stage':<10} {'peak MB':>9} {'retained MB':>12}  top retained site"]
+        for name, stage in self.stages.items():
+            top = stage["retained_sites"][0] if stage["retained_sites"] else None
+            site = f"{top['site']} ({top['retained_kb']:.0f} KB)" if top else "-"
+            lines.append(
+                f"{name:<10} {stage['peak_mb']:>9.1f} {stage['retained_mb']:>12.1f}  {site}"
+            )
+        return "\n".join(lines)
+
+
+@contextmanager
+def tracking(top: int = DEFAULT_TOP_SITES) -> Iterator[MemoryTracker]:
+    global _tracker
+    previous = _tracker
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    _tracker = MemoryTracker(top)
+    try:
+        yield _tracker
+    finally:
+        _tracker = previous
+        if started:
+            tracemalloc.stop()
+
+
+def stage(name: str) -> ContextManager[None]:
+    tracker = _tracker
+    return _NO_STAGE if tracker is None else tracker.stage(name)
@@ -4,6 +4,10 @@ import re
 from dataclasses import dataclass
 from typing import Iterable, List
 
+import numpy as np
+
+from shakespeare_geo import trace
+
 
 _ACT_RE = re.compile(r"^ACT\s+[IVX]+\b", re.IGNORECASE)
 _SCENE_RE = re.compile(r"^SCENE\s+[IVX]+\b", re.IGNORECASE)
@@ -14,6 +18,7 @@ _STAGE_DIRECTION_RE = re.compile(
     re.IGNORECASE,
 )
 _WS_RE = re.compile(r"\s+")
+_SENTENCE_BOUNDARY_RE = re.compile(r"[.?!\n]")
 
 
 @dataclass
@@ -28,6 +33,7 @@ class LineContext:
     is_dialogue: bool
 
 
+@trace.traced("index_text_lines")
 def index_text_lines(text: str) -> List[LineContext]:
     contexts: List[LineContext] = []
     act = None
@@ -87,6 +93,7 @@ def index_text_lines(text: str) -> List[LineContext]:
         )
         offset = end + 1  # account for newline
 
+    trace.count("lines_indexed", len(contexts))
     return contexts
 
 
@@ -151,3 +158,57 @@ def extract_sentence_for_span(
     raw = text[left:right]
     sentence = _WS_RE.sub(" ", raw).strip()
     return sentence or None
+
+
+def context_indices_for_spans(contexts: List[LineContext], span_starts: np.ndarray) -> np.ndarray:
+    # Batched find_context_for_span: line ranges are sorted and disjoint, so
+    # one binary search per span replaces the linear scan. -1 means no line.
+    starts = np.fromiter((ctx.start for ctx in contexts), dtype=np.int64, count=len(contexts))
+    ends = np.fromiter((ctx.end for ctx in contexts), dtype=np.int64, count=len(contexts))
+    span_starts = np.asarray(span_starts, dtype=np.int64)
+    indices = np.searchsorted(starts, span_starts, side="right") - 1
+    found = indices >= 0
+    found[found] = span_starts[found] <= ends[indices[found]]
+    return np.where(found, indices, -1)
+
+
+def sentences_for_spans(
+    text: str,
+    span_starts: Iterable[int | None],
+    span_ends: Iterable[int | None],
+) -> list[str | None]:
+    # Batched extract_sentence_for_span: sentence boundaries are located
+    # once for the whole text and each span is placed among them by binary
+    # search.
+    span_starts = list(span_starts)
+    span_ends = list(span_ends)
+    if not text:
+        return [None] * len(span_starts)
+
+    # Sentinels at -1 and len(text) stand in for "no boundary found".
+    boundaries = np.fromiter(
+        (match.start() for match in _SENTENCE_BOUNDARY_RE.finditer(text)), dtype=np.int64
+    )
+    boundaries = np.concatenate(([-1], boundaries, [len(text)]))
+    present = np.array([start is not None for start in span_starts], dtype=bool)
+    starts = np.array([start or 0 for start in span_starts], dtype=np.int64)
+    starts = np.clip(starts, 0, max(len(text) - 1, 0))
+    ends = np.array([-1 if end is None else end for end in span_ends], dtype=np.int64)
+    ends = np.where(
+        [end is None for end in span_ends], starts, np.clip(ends, starts, len(text))
+    )
+
+    lefts = boundaries[np.searchsorted(boundaries, starts, side="left") - 1] + 1
+    rights = boundaries[np.searchsorted(boundaries, ends, side="left")]
+
+    sentences: dict[tuple[int, int], str | None] = {}
+    result: list[str | None] = []
+    for is_present, left, right in zip(present, lefts.tolist(), rights.tolist()):
+        if not is_present:
+            result.append(None)
+            continue
+        key = (left, right)
+        if key not in sentences:
+            sentences[key] = _WS_RE.sub(" ", text[left:right]).strip() or None
+        result.append(sentences[key])
+    return result
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import cProfile
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import ContextManager, Iterator
+
+
+# Installed by run_play --profile; see trace._tracer.
+_profiler: StageProfiler | None = None
+_NO_STAGE = nullcontext()
+DEFAULT_SAMPLE_INTERVAL_S = 0.001
+
+
+def _code_label(code: CodeType) -> str:
+    label = f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+    return label.replace(";", ",")
+
+
+def stack_codes(frame: FrameType | None) -> tuple[CodeType, ...]:
+    codes = []
+    while frame is not None:
+        codes.append(frame.f_code)
+        frame = frame.f_back
+    return tuple(reversed(codes))
+
+
+class StageProfiler:
+    # One cProfile dump per stage (<stage>.pstats, for snakeviz or pstats)
+    # plus whole-stack samples of every thread, written as collapsed stacks
+    # (stage;outer;...;inner count) for flamegraph.pl or speedscope. cProfile
+    # only sees the thread that enabled it; the sampler also catches the
+    # pipeline's extraction and geocoding workers.
+
+    def __init__(self, output_dir: Path, sample_interval_s: float = DEFAULT_SAMPLE_INTERVAL_S):
+        self.output_dir = Path(output_dir)
+        self.sample_interval_s = sample_interval_s
+        # Keyed by code objects and only formatted on write, so sampling
+        # stays cheap (and allocates little under --trace-memory).
+        self.stacks: Counter[tuple[str, tuple[CodeType, ...]]] = Counter()
+        self.pstats_paths: dict[str, Path] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        profile = cProfile.Profile()
+        done = threading.Event()
+        sampler = threading.Thread(
+            target=self._sample, args=(name, done), name=f"profile-{name}", daemon=True
+        )
+        sampler.start()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            done.set()
+            sampler.join()
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            path = self.output_dir / f"{name}.pstats"
+            profile.dump_stats(path)
+            self.pstats_paths[name] = path
+
+    def _sample(self, stage: str, done: threading.Event) -> None:
+        own_id = threading.get_ident()
+        while not done.wait(self.sample_interval_s):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                self.stacks[stage, stack_codes(frame)] += 1
+
+    def write_collapsed(self) -> Path:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path = self.output_dir / "stacks.collapsed"
+        collapsed: Counter[str] = Counter()
+        for (stage, codes), count in self.stacks.items():
+            collapsed[";".join([stage, *map(_code_label, codes)])] += count
+        path.write_text(
+            "".join(f"{stack} {count}\n" for stack, count in sorted(collapsed.items()))
+        )
+        return path
+
+
+@contextmanager
+def profiling(
+    output_dir: Path, sample_interval_s: float = DEFAULT_SAMPLE_INTERVAL_S
+) -> Iterator[StageProfiler]:
+    global _profiler
+    previous = _profiler
+    _profiler = StageProfiler(output_dir, sample_interval_s)
+    try:
+        yield _profiler
+    finally:
+        _profiler.write_collapsed()
+        _profiler = previous
+
+
+def stage(name: str) -> ContextManager[None]:
+    profiler = _profiler
+    return _NO_STAGE if profiler is None else profiler.stage(name)
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Iterator
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from shakespeare_geo.aggregate import CenterOfGravityAccumulator, PlaceAccumulator
+from shakespeare_geo.spatial import DEFAULT_MERGE_RADIUS_KM, merge_near_duplicate_places
+from shakespeare_geo.tables import MENTION_SCHEMA, to_arrow
+
+
+SINK_FORMATS = ("csv", "parquet")
+DEFAULT_CHUNK_ROWS = 50_000
+# Kept out of the output directory's top level, where *_places.csv and
+# *_cog.json are read as per-play files.
+CORPUS_DIRNAME = "corpus"
+
+
+def spatial_mask(mentions: pd.DataFrame) -> pd.Series:
+    return (
+        (mentions["keep"] == True)
+        & (mentions["spatial_usable"] == True)
+        & (mentions["settlement_scope"] == True)
+    )
+
+
+def iter_mention_chunks(path: Path, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    path = Path(path)
+    if path.suffix == ".parquet":
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_rows)
+
+
+class MentionSink:
+    # Corpus-wide mention tables written incrementally as plays finish. Each
+    # play's mentions are read back in chunks and appended (CSV rows or one
+    # Parquet row group per chunk); only running place counts and CoG sums
+    # stay in memory, so peak memory does not grow with the number of plays.
+
+    def __init__(
+        self,
+        output_dir: Path,
+        fmt: str = "csv",
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+        merge_radius_km: float = DEFAULT_MERGE_RADIUS_KM,
+    ):
+        if fmt not in SINK_FORMATS:
+            raise ValueError(f"Unknown sink format: {fmt}")
+        self.root = Path(output_dir) / CORPUS_DIRNAME
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.fmt = fmt
+        self.chunk_rows = chunk_rows
+        self.merge_radius_km = merge_radius_km
+        self.mentions_path = self.root / f"mentions.{fmt}"
+        # Parquet readers filter the mentions table on keep instead.
+        self.rejections_path = self.root / "rejections.csv" if fmt == "csv" else None
+        self.places_path = self.root / "places.csv"
+        self.cog_path = self.root / "cog.json"
+        self.places = PlaceAccumulator()
+        self.cog = CenterOfGravityAccumulator()
+        self.plays = 0
+        self.mentions = 0
+        self.paths: dict | None = None
+        self._writer: pq.ParquetWriter | None = None
+        self._started: set[Path] = set()
+
+    def __enter__(self) -> MentionSink:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self.paths is not None:
+            return
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def add_play(self, play_id: str, mentions_path: Path) -> None:
+        for chunk in iter_mention_chunks(mentions_path, self.chunk_rows):
+            # Play partitions carry play_id in their directory name only.
+            if "play_id" not in chunk:
+                chunk.insert(0, "play_id", play_id)
+            self.write(chunk)
+        self.plays += 1
+
+    def write(self, mentions: pd.DataFrame) -> None:
+        spatial = mentions[spatial_mask(mentions)]
+        self.places.update(spatial)
+        self.cog.update(spatial)
+        self.mentions += len(mentions)
+
+        if self.fmt == "parquet":
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.mentions_path, MENTION_SCHEMA)
+            self._writer.write_table(to_arrow(mentions, MENTION_SCHEMA))
+        else:
+            self._append_csv(self.mentions_path, mentions)
+            self._append_csv(self.rejections_path, mentions[mentions["keep"] != True])
+
+    def _append_csv(self, path: Path, frame: pd.DataFrame) -> None:
+        first = path not in self._started
+        frame.reindex(columns=MENTION_SCHEMA.names).to_csv(
+            path, mode="w" if first else "a", header=first, index=False
+        )
+        self._started.add(path)
+
+    def close(self) -> dict:
+        # Empty tables (with headers/schema) when no play produced output.
+        if self.fmt == "parquet":
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.mentions_path, MENTION_SCHEMA)
+            self._writer.close()
+            self._writer = None
+        else:
+            for path in (self.mentions_path, self.rejections_path):
+                if path not in self._started:
+                    self._append_csv(path, pd.DataFrame(columns=MENTION_SCHEMA.names))
+
+        places_df = self.places.frame()
+        if not places_df.empty:
+            places_df = merge_near_duplicate_places(places_df, radius_km=self.merge_radius_km)
+        places_df.to_csv(self.places_path, index=False)
+
+        self.cog_path.write_text(
+            json.dumps(
+                {"plays": self.plays, "accumulator": self.cog.to_dict()},
+                indent=2,
+                sort_keys=True,
+            )
+        )
+        paths = {"mentions": str(self.mentions_path), "places_csv": str(self.places_path)}
+        if self.rejections_path is not None:
+            paths["rejections_csv"] = str(self.rejections_path)
+        paths["cog_json"] = str(self.cog_path)
+        self.paths = paths
+        return paths
+
+    def abort(self) -> None:
+        # A run that failed part-way leaves no corpus tables or sums rather
+        # than ones that look complete; per-play outputs are untouched.
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        for path in (self.mentions_path, self.rejections_path, self.places_path, self.cog_path):
+            if path is not None:
+                path.unlink(missing_ok=True)
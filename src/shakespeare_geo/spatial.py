@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import math
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+from shakespeare_geo.aggregate import EARTH_RADIUS_KM, to_unit_vectors
+from shakespeare_geo.filtering import normalize_text
+
+
+DEFAULT_MERGE_RADIUS_KM = 5.0
+_NEIGHBOUR_OFFSETS = tuple(product((-1, 0, 1), repeat=3))
+
+
+def haversine_km(
+    lat1: object,
+    lon1: object,
+    lat2: object,
+    lon2: object,
+) -> np.ndarray:
+    lat1, lon1, lat2, lon2 = (
+        np.radians(np.asarray(v, dtype=float)) for v in (lat1, lon1, lat2, lon2)
+    )
+    a = (
+        np.sin((lat2 - lat1) / 2.0) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2.0) ** 2
+    )
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class GridIndex:
+    # Buckets points into cubic cells over 3D unit vectors rather than lat/lon
+    # so cells have the same size everywhere and nothing special happens at
+    # the poles or the antimeridian. Chord length never exceeds arc length,
+    # so two points within cell_km of each other always share a cell or sit
+    # in adjacent ones.
+
+    def __init__(self, lat: object, lon: object, cell_km: float = DEFAULT_MERGE_RADIUS_KM):
+        if cell_km <= 0:
+            raise ValueError("cell_km must be positive")
+        self.lat = np.asarray(lat, dtype=float)
+        self.lon = np.asarray(lon, dtype=float)
+        if not (np.isfinite(self.lat).all() and np.isfinite(self.lon).all()):
+            raise ValueError("GridIndex requires finite coordinates")
+
+        self.cell_km = cell_km
+        self.cell = cell_km / EARTH_RADIUS_KM
+        self.points = to_unit_vectors(self.lat, self.lon).reshape(-1, 3)
+        keys = np.floor(self.points / self.cell).astype(np.int64)
+
+        # Pack each cell's integer (x, y, z) into one int64 code; neighbouring
+        # cells are then fixed code offsets and lookups are a searchsorted
+        # over the sorted codes.
+        self._shift = int(math.ceil(1.0 / self.cell)) + 2
+        self._base = 2 * self._shift + 1
+        if self._base**3 >= 2**62:
+            raise ValueError("cell_km is too small for the grid encoding")
+        self.codes = self._encode(keys)
+        self._order = np.argsort(self.codes, kind="stable")
+        self._sorted_codes = self.codes[self._order]
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _encode(self, keys: np.ndarray) -> np.ndarray:
+        shifted = keys + self._shift
+        return (shifted[..., 0] * self._base + shifted[..., 1]) * self._base + shifted[..., 2]
+
+    def _offset_code(self, offset: tuple[int, int, int]) -> int:
+        dx, dy, dz = offset
+        return (dx * self._base + dy) * self._base + dz
+
+    def _members(self, codes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # For every query code, the points sharing that cell: returns
+        # (query position, point index) pairs.
+        lo = np.searchsorted(self._sorted_codes, codes, side="left")
+        hi = np.searchsorted(self._sorted_codes, codes, side="right")
+        counts = hi - lo
+        total = int(counts.sum())
+        query = np.repeat(np.arange(codes.size), counts)
+        starts = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+        return query, self._order[starts + np.arange(total)]
+
+    def _collect(self, key: np.ndarray, offsets) -> np.ndarray:
+        code = int(self._encode(key))
+        codes = np.array([code + self._offset_code(offset) for offset in offsets], dtype=np.int64)
+        if not len(self.points) or not codes.size:
+            return np.empty(0, dtype=np.int64)
+        return self._members(codes)[1]
+
+    def _cells_within(self, key: np.ndarray, reach: int) -> np.ndarray:
+        return self._collect(key, product(range(-reach, reach + 1), repeat=3))
+
+    def _shell(self, key: np.ndarray, ring: int) -> np.ndarray:
+        offsets = (
+            offset
+            for offset in product(range(-ring, ring + 1), repeat=3)
+            if max(abs(o) for o in offset) == ring
+        )
+        return self._collect(key, offsets)
+
+    def query_radius(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        point = to_unit_vectors(np.array([lat]), np.array([lon]))[0]
+        key = np.floor(point / self.cell).astype(np.int64)
+        reach = max(1, math.ceil(radius_km / self.cell_km))
+        candidates = self._cells_within(key, reach)
+        if candidates.size == 0:
+            return candidates
+        distances = haversine_km(lat, lon, self.lat[candidates], self.lon[candidates])
+        return np.unique(candidates[distances <= radius_km])
+
+    def nearest(self, lat: float, lon: float) -> tuple[int | None, float]:
+        if not len(self.points):
+            return None, math.inf
+        point = to_unit_vectors(np.array([lat]), np.array([lon]))[0]
+        key = np.floor(point / self.cell).astype(np.int64)
+
+        best_idx: int | None = None
+        best_chord = math.inf
+        # Grow Chebyshev shells until the best hit is closer than anything an
+        # unvisited shell could hold. Far-away queries (sparse data) fall back
+        # to a single vectorized scan once shells get larger than the data.
+        ring = 0
+        while True:
+            if (2 * ring + 1) ** 3 > 4 * len(self.points) + 27 or ring > self._shift:
+                chords = np.linalg.norm(self.points - point, axis=1)
+                idx = int(np.argmin(chords))
+                return idx, float(haversine_km(lat, lon, self.lat[idx], self.lon[idx]))
+
+            shell = self._shell(key, ring)
+            if shell.size:
+                chords = np.linalg.norm(self.points[shell] - point, axis=1)
+                pos = int(np.argmin(chords))
+                if chords[pos] < best_chord:
+                    best_chord = float(chords[pos])
+                    best_idx = int(shell[pos])
+            if best_idx is not None and best_chord <= ring * self.cell:
+                break
+            ring += 1
+
+        return best_idx, float(haversine_km(lat, lon, self.lat[best_idx], self.lon[best_idx]))
+
+    def pairs_within(self, radius_km: float) -> np.ndarray:
+        if radius_km > self.cell_km:
+            raise ValueError("radius_km must not exceed the index cell size")
+
+        pairs = []
+        for offset in _NEIGHBOUR_OFFSETS:
+            left, right = self._members(self.codes + self._offset_code(offset))
+            keep = left < right
+            left, right = left[keep], right[keep]
+            distances = haversine_km(
+                self.lat[left], self.lon[left], self.lat[right], self.lon[right]
+            )
+            close = distances <= radius_km
+            pairs.append(np.column_stack((left[close], right[close])))
+
+        pairs = np.concatenate(pairs) if pairs else np.empty((0, 2), dtype=np.int64)
+        order = np.lexsort((pairs[:, 1], pairs[:, 0]))
+        return pairs[order]
+
+
+def place_name_key(geocode_name: object, normalized_place: object) -> str:
+    # Nominatim display names lead with the place itself ("Verona, Veneto,
+    # Italia"), which is what node and relation duplicates have in common.
+    if isinstance(geocode_name, str) and geocode_name.strip():
+        return normalize_text(geocode_name.split(",", 1)[0])
+    if isinstance(normalized_place, str):
+        return normalize_text(normalized_place)
+    return ""
+
+
+def _find(parents: np.ndarray, idx: int) -> int:
+    root = idx
+    while parents[root] != root:
+        root = parents[root]
+    while parents[idx] != root:
+        parents[idx], idx = root, parents[idx]
+    return root
+
+
+def merge_near_duplicate_places(
+    places: pd.DataFrame,
+    radius_km: float = DEFAULT_MERGE_RADIUS_KM,
+) -> pd.DataFrame:
+    if places.empty or radius_km <= 0:
+        return places
+
+    lat = pd.to_numeric(places["geocode_lat"], errors="coerce").to_numpy(dtype=float)
+    lon = pd.to_numeric(places["geocode_lon"], errors="coerce").to_numpy(dtype=float)
+    located = np.flatnonzero(np.isfinite(lat) & np.isfinite(lon))
+    if located.size < 2:
+        return places
+
+    names = np.array(
+        [
+            place_name_key(name, place)
+            for name, place in zip(
+                places["geocode_name"].to_numpy()[located],
+                places["normalized_place"].to_numpy()[located],
+            )
+        ],
+        dtype=object,
+    )
+    index = GridIndex(lat[located], lon[located], cell_km=radius_km)
+    pairs = index.pairs_within(radius_km)
+    pairs = pairs[(names[pairs[:, 0]] == names[pairs[:, 1]]) & (names[pairs[:, 0]] != "")]
+    if not len(pairs):
+        return places
+
+    parents = np.arange(located.size)
+    for left, right in pairs:
+        root_left, root_right = _find(parents, left), _find(parents, right)
+        if root_left != root_right:
+            parents[max(root_left, root_right)] = min(root_left, root_right)
+    roots = np.array([_find(parents, i) for i in range(located.size)])
+
+    cluster = np.arange(len(places))
+    cluster[located] = located[roots]
+    counts = pd.to_numeric(places["mention_count"], errors="coerce").fillna(0)
+    merged_counts = counts.groupby(cluster).transform("sum")
+
+    # Keep the most-mentioned member of each cluster as its representative.
+    ranked = places.assign(
+        _cluster=cluster,
+        _count=counts.to_numpy(),
+        _order=np.arange(len(places)),
+    ).sort_values(["_cluster", "_count", "_order"], ascending=[True, False, True])
+    representatives = ranked.drop_duplicates("_cluster").sort_values("_order")
+
+    merged = places.loc[representatives.index].copy()
+    merged["mention_count"] = merged_counts.loc[representatives.index].astype(
+        places["mention_count"].dtype
+    )
+    return merged.reset_index(drop=True)
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Iterable
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from shakespeare_geo.filtering import parse_bool
+
+
+# Typed Parquet tables under <output-dir>/parquet/, one hive-style
+# partition directory per play (mentions/play_id=romeo_juliet/...), so
+# corpus workers write disjoint files and a rerun replaces only its play.
+PARQUET_DIRNAME = "parquet"
+PARTITION_FILENAME = "part-0.parquet"
+
+MENTION_SCHEMA = pa.schema(
+    [
+        ("play_id", pa.string()),
+        ("play_title", pa.string()),
+        ("act", pa.string()),
+        ("scene", pa.string()),
+        ("line", pa.int32()),
+        ("speaker", pa.string()),
+        ("mention_text", pa.string()),
+        ("mention_sentence", pa.string()),
+        ("span_start", pa.int64()),
+        ("span_end", pa.int64()),
+        ("normalized_place", pa.string()),
+        ("entity_kind", pa.string()),
+        ("place_granularity", pa.string()),
+        ("settlement_scope", pa.bool_()),
+        ("is_real_world", pa.bool_()),
+        ("should_keep_llm", pa.bool_()),
+        ("spatial_usable", pa.bool_()),
+        ("spatial_blocked_reason", pa.string()),
+        ("geocode_query", pa.string()),
+        ("geocode_name", pa.string()),
+        ("geocode_lat", pa.float64()),
+        ("geocode_lon", pa.float64()),
+        ("geocode_precision", pa.string()),
+        ("geocode_addresstype", pa.string()),
+        ("geocode_class", pa.string()),
+        ("geocode_id", pa.string()),
+        ("keep", pa.bool_()),
+        ("rejected_reason", pa.string()),
+        ("source_url", pa.string()),
+        ("model_name", pa.string()),
+        ("run_id", pa.string()),
+    ]
+)
+PLACE_SCHEMA = pa.schema(
+    [
+        ("play_id", pa.string()),
+        ("normalized_place", pa.string()),
+        ("mention_sentence", pa.string()),
+        ("geocode_name", pa.string()),
+        ("geocode_lat", pa.float64()),
+        ("geocode_lon", pa.float64()),
+        ("geocode_precision", pa.string()),
+        ("geocode_addresstype", pa.string()),
+        ("geocode_class", pa.string()),
+        ("geocode_id", pa.string()),
+        ("mention_count", pa.int64()),
+    ]
+)
+SCHEMAS = {"mentions": MENTION_SCHEMA, "places": PLACE_SCHEMA}
+# Nullable pandas dtypes, so ints and bools with gaps do not turn into
+# floats and objects on load.
+_PANDAS_TYPES = {
+    pa.int32(): pd.Int32Dtype(),
+    pa.int64(): pd.Int64Dtype(),
+    pa.bool_(): pd.BooleanDtype(),
+    pa.string(): pd.StringDtype(),
+}
+
+
+def _column_for_field(values: pd.Series, field: pa.Field) -> pd.Series:
+    # LLM attributes arrive as "true"/"false" strings, bools or None.
+    if pa.types.is_boolean(field.type):
+        return values.map(parse_bool, na_action="ignore").astype("boolean")
+    if pa.types.is_integer(field.type):
+        return pd.to_numeric(values, errors="coerce").astype("Int64")
+    if pa.types.is_floating(field.type):
+        return pd.to_numeric(values, errors="coerce").astype("float64")
+    return values.astype("string")
+
+
+def to_arrow(frame: pd.DataFrame, schema: pa.Schema) -> pa.Table:
+    columns = {
+        field.name: _column_for_field(
+            frame[field.name] if field.name in frame else pd.Series(None, index=frame.index),
+            field,
+        )
+        for field in schema
+    }
+    return pa.Table.from_pandas(
+        pd.DataFrame(columns, index=frame.index), schema=schema, preserve_index=False
+    )
+
+
+def partition_schema(table: str) -> pa.Schema:
+    # The partition column lives in the directory name, not the file.
+    schema = SCHEMAS[table]
+    return schema.remove(schema.get_field_index("play_id"))
+
+
+def partition_path(root: Path, table: str, play_id: str) -> Path:
+    return Path(root) / table / f"play_id={play_id}" / PARTITION_FILENAME
+
+
+def write_play_partition(frame: pd.DataFrame, root: Path, table: str, play_id: str) -> Path:
+    path = partition_path(root, table, play_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Dot-prefixed, so readers skip it until the rename.
+    partial = path.with_name(f".{path.name}.part")
+    pq.write_table(to_arrow(frame, partition_schema(table)), partial)
+    os.replace(partial, path)
+    return path
+
+
+def read_table(
+    root: Path,
+    table: str,
+    play_ids: Iterable[str] | None = None,
+    where: ds.Expression | None = None,
+) -> pd.DataFrame:
+    # Reads only the requested play partitions; play_id comes back from the
+    # directory names.
+    dataset = ds.dataset(
+        Path(root) / table,
+        schema=SCHEMAS[table],
+        format="parquet",
+        partitioning="hive",
+    )
+    if play_ids is not None:
+        play_filter = ds.field("play_id").isin(list(play_ids))
+        where = play_filter if where is None else where & play_filter
+    return dataset.to_table(filter=where).to_pandas(types_mapper=_PANDAS_TYPES.get)
+
+
+def read_rejections(root: Path, play_ids: Iterable[str] | None = None) -> pd.DataFrame:
+    return read_table(root, "mentions", play_ids, where=ds.field("keep") == False)
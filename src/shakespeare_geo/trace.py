@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Callable, ContextManager, Iterator, TypeVar
+
+
+F = TypeVar("F", bound=Callable)
+
+# Module-level so library code can record spans and counters without a
+# tracer being threaded through every call. While it is None, span(),
+# count() and traced functions only pay for one global lookup.
+_tracer: Tracer | None = None
+_NO_SPAN = nullcontext()
+
+
+class Tracer:
+    # Span timings and counters for one run. Spans nest per thread (the
+    # pipelined runner extracts and geocodes on worker threads); counters
+    # are summed across threads.
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: list[dict] = []
+        self.counters: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        stack = self._local.__dict__.setdefault("stack", [])
+        parent = stack[-1] if stack else None
+        stack.append(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            stack.pop()
+            with self._lock:
+                self.spans.append(
+                    {
+                        "name": name,
+                        "parent": parent,
+                        "thread": threading.current_thread().name,
+                        "start_s": round(start - self.started, 6),
+                        "seconds": round(seconds, 6),
+                    }
+                )
+
+    def count(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def totals(self) -> dict[str, dict]:
+        totals: dict[str, dict] = {}
+        for span in self.spans:
+            total = totals.setdefault(span["name"], {"calls": 0, "seconds": 0.0})
+            total["calls"] += 1
+            total["seconds"] += span["seconds"]
+        return totals
+
+    def to_dict(self) -> dict:
+        return {
+            "wall_seconds": round(time.perf_counter() - self.started, 6),
+            "totals": {
+                name: {"calls": total["calls"], "seconds": round(total["seconds"], 6)}
+                for name, total in self.totals().items()
+            },
+            "counters": dict(sorted(self.counters.items())),
+            "spans": sorted(self.spans, key=lambda span: span["start_s"]),
+        }
+
+    def write(self, path: Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2))
+        return path
+
+    def summary_table(self) -> str:
+        # Spans by total time; nested spans are counted in their parents
+        # too, so the share column does not sum to 100%.
+        wall = max(time.perf_counter() - self.started, 1e-9)
+        totals = sorted(self.totals().items(), key=lambda item: -item[1]["seconds"])
+        width = max([len(name) for name, _ in totals] + [len(name) for name in self.counters] + [4])
+        lines = [f"{'span':<{width}} {'calls':>7} {'seconds':>10} {'share':>7}"]
+        for name, total in totals:
+            lines.append(
+                f"{name:<{width}} {total['calls']:>7} {total['seconds']:>10.3f} "
+                f"{total['seconds'] / wall:>7.1%}"
+            )
+        if self.counters:
+            lines.append("")
+            lines.append(f"{'counter':<{width}} {'value':>7}")
+            for name, value in sorted(self.counters.items()):
+                shown = f"{value:.3f}" if isinstance(value, float) else str(value)
+                lines.append(f"{name:<{width}} {shown:>7}")
+        return "\n".join(lines)
+
+
+def active() -> Tracer | None:
+    return _tracer
+
+
+@contextmanager
+def tracing() -> Iterator[Tracer]:
+    global _tracer
+    previous = _tracer
+    _tracer = Tracer()
+    try:
+        yield _tracer
+    finally:
+        _tracer = previous
+
+
+def span(name: str) -> ContextManager[None]:
+    tracer = _tracer
+    return _NO_SPAN if tracer is None else tracer.span(name)
+
+
+def count(name: str, value: float = 1) -> None:
+    tracer = _tracer
+    if tracer is not None:
+        tracer.count(name, value)
+
+
+def count_bytes(*paths: Path | str, name: str = "bytes_written") -> None:
+    # Sizes files just written; skips the stat calls when tracing is off.
+    tracer = _tracer
+    if tracer is not None:
+        tracer.count(name, sum(Path(path).stat().st_size for path in paths))
+
+
+def traced(name: str) -> Callable[[F], F]:
+    def decorate(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tracer = _tracer
+            if tracer is None:
+                return func(*args, **kwargs)
+            with tracer.span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
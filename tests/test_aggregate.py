@@ -1,4 +1,18 @@
-from shakespeare_geo.aggregate import center_of_gravity
+import numpy as np
+import pandas as pd
+
+from shakespeare_geo.aggregate import (
+    bootstrap_center_of_gravity,
+    CenterOfGravityAccumulator,
+    center_of_gravity,
+    center_of_gravity_arrays,
+    center_of_gravity_frame,
+    center_of_gravity_trajectory,
+    geometric_median,
+    grouped_center_of_gravity,
+    merge_accumulators,
+    spherical_centroid,
+)
 
 
 def test_center_of_gravity_weighted_mean():
@@ -29,3 +43,168 @@ def test_center_of_gravity_ignores_nan_values():
     lat, lon = center_of_gravity(rows)
     assert lat == 45.0
     assert lon == 10.0
+
+
+def test_center_of_gravity_arrays_matches_row_version():
+    rng = np.random.default_rng(0)
+    lat = rng.uniform(-60, 60, size=200)
+    lon = rng.uniform(-120, 120, size=200)
+    weight = rng.uniform(-0.5, 3.0, size=200)
+    lat[::17] = np.nan
+    weight[::23] = np.inf
+    rows = [
+        {"geocode_lat": a, "geocode_lon": b, "weight": w}
+        for a, b, w in zip(lat, lon, weight)
+    ]
+
+    expected = center_of_gravity(rows)
+    actual = center_of_gravity_arrays(lat, lon, weight)
+
+    assert np.allclose(actual, expected)
+
+
+def test_center_of_gravity_frame_defaults_weight_and_skips_missing():
+    frame = pd.DataFrame(
+        {
+            "geocode_lat": [10.0, None, 30.0],
+            "geocode_lon": [20.0, 5.0, 40.0],
+        },
+        dtype=object,
+    )
+
+    assert center_of_gravity_frame(frame) == (20.0, 30.0)
+    assert center_of_gravity_frame(frame.iloc[0:0]) == (0.0, 0.0)
+
+
+def test_spherical_centroid_handles_antimeridian():
+    lat, lon = spherical_centroid([0.0, 0.0], [179.0, -179.0])
+
+    assert abs(lat) < 1e-9
+    assert abs(abs(lon) - 180.0) < 1e-9
+
+
+def test_geometric_median_resists_far_flung_outlier():
+    lat = [45.44, 45.16, 45.44, 41.89, 40.71]
+    lon = [10.99, 10.79, 10.99, 12.48, -74.01]
+
+    median_lat, median_lon = geometric_median(lat, lon, tol_km=1e-6, max_iter=500)
+    centroid_lat, centroid_lon = spherical_centroid(lat, lon)
+
+    # The New York mention drags the centroid into the Atlantic; the median
+    # stays in northern Italy.
+    assert 44.0 < median_lat < 46.0
+    assert 10.0 < median_lon < 12.0
+    assert centroid_lon < 0.0
+
+
+def test_center_of_gravity_frame_rejects_unknown_method():
+    frame = pd.DataFrame({"geocode_lat": [1.0], "geocode_lon": [2.0]})
+
+    try:
+        center_of_gravity_frame(frame, method="harmonic")
+        assert False, "Expected ValueError for unknown method"
+    except ValueError as exc:
+        assert "harmonic" in str(exc)
+
+
+def test_grouped_center_of_gravity_matches_per_group_calls():
+    frame = pd.DataFrame(
+        {
+            "act": ["ACT I", "ACT I", "ACT II", "ACT II", "ACT II"],
+            "line": [5, 9, 20, 22, 30],
+            "geocode_lat": [45.4, 45.2, 41.9, None, 40.7],
+            "geocode_lon": [11.0, 10.8, 12.5, 3.0, -74.0],
+        }
+    )
+
+    for method in ("arithmetic", "spherical", "geometric_median"):
+        grouped = grouped_center_of_gravity(frame, ["act"], method=method)
+        assert grouped["act"].tolist() == ["ACT I", "ACT II"]
+        assert grouped["mention_count"].tolist() == [2, 2]
+        for _, row in grouped.iterrows():
+            expected = center_of_gravity_frame(frame[frame["act"] == row["act"]], method=method)
+            assert np.allclose((row["cog_lat"], row["cog_lon"]), expected)
+
+
+def test_center_of_gravity_trajectory_orders_groups_by_first_line():
+    frame = pd.DataFrame(
+        {
+            "act": ["ACT I", "ACT I", "ACT II"],
+            "scene": ["SCENE II.", "SCENE I.", "SCENE I."],
+            "speaker": ["ROMEO", "BENVOLIO", "ROMEO"],
+            "line": [12, 4, 40],
+            "geocode_lat": [45.0, 46.0, 44.0],
+            "geocode_lon": [10.0, 12.0, 11.0],
+        }
+    )
+
+    trajectory = center_of_gravity_trajectory(frame)
+
+    scenes = trajectory[trajectory["level"] == "scene"]
+    assert scenes["scene"].tolist() == ["SCENE I.", "SCENE II.", "SCENE I."]
+    speakers = trajectory[trajectory["level"] == "speaker"].set_index("speaker")
+    assert speakers.loc["ROMEO", "cog_lat"] == 44.5
+    assert speakers.loc["ROMEO", "mention_count"] == 2
+    assert str(trajectory["first_line"].dtype) == "Int64"
+    assert scenes["first_line"].tolist() == [4, 12, 40]
+
+
+def test_accumulator_batches_and_merges_match_single_pass():
+    rng = np.random.default_rng(1)
+    frame = pd.DataFrame(
+        {
+            "geocode_lat": rng.uniform(30, 60, size=90),
+            "geocode_lon": rng.uniform(-170, 170, size=90),
+            "weight": rng.uniform(0.5, 2.0, size=90),
+        }
+    )
+
+    streamed = CenterOfGravityAccumulator()
+    for start in range(0, 90, 25):
+        streamed.update(frame.iloc[start : start + 25])
+    partials = [
+        CenterOfGravityAccumulator().update(frame.iloc[:40]),
+        CenterOfGravityAccumulator().update(frame.iloc[40:]),
+    ]
+    merged = merge_accumulators(partials)
+
+    for method in ("arithmetic", "spherical"):
+        expected = center_of_gravity_frame(frame, method=method)
+        assert np.allclose(streamed.center(method), expected)
+        assert np.allclose(merged.center(method), expected)
+    assert merged.count == 90
+
+
+def test_accumulator_json_roundtrip():
+    accumulator = CenterOfGravityAccumulator().update_arrays([45.0, 41.9], [11.0, 12.5])
+
+    restored = CenterOfGravityAccumulator.from_json(accumulator.to_json())
+
+    assert restored == accumulator
+    assert CenterOfGravityAccumulator().center() == (0.0, 0.0)
+
+
+def test_bootstrap_region_brackets_center_and_is_reproducible():
+    rng = np.random.default_rng(2)
+    lat = rng.normal(45.0, 1.0, size=40)
+    lon = rng.normal(11.0, 1.5, size=40)
+
+    for method in ("arithmetic", "spherical", "geometric_median"):
+        region = bootstrap_center_of_gravity(lat, lon, n_resamples=300, method=method, seed=7)
+        again = bootstrap_center_of_gravity(lat, lon, n_resamples=300, method=method, seed=7)
+
+        assert region == again
+        assert region.lat_low < region.center_lat < region.lat_high
+        assert region.lon_low < region.center_lon < region.lon_high
+        assert len(region.ellipse_points(16)) == 16
+
+    assert bootstrap_center_of_gravity([], []) is None
+    assert bootstrap_center_of_gravity(lat, lon, n_resamples=0) is None
+
+
+def test_bootstrap_region_stays_contiguous_across_antimeridian():
+    region = bootstrap_center_of_gravity(
+        [10.0, 11.0, 12.0, 10.5], [179.0, -179.5, 179.5, -178.0], method="spherical", seed=3
+    )
+
+    assert region.lon_high - region.lon_low < 5.0
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import importlib.util
+from pathlib import Path
+
+
+def load_check_regression():
+    script_path = Path(__file__).resolve().parents[1] / "benchmarks" / "check_regression.py"
+    spec = importlib.util.spec_from_file_location("check_regression_module", script_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    spec.loader.exec_module(module)
+    return module
+
+
+def report(**stages) -> dict:
+    return {
+        "results": [
+            {
+                "scale": 1.0,
+                "stages": {
+                    stage: {"seconds": seconds, "rss_growth_mb": mb}
+                    for stage, (seconds, mb) in stages.items()
+                },
+            }
+        ]
+    }
+
+
+def test_compare_flags_time_and_memory_regressions_past_tolerance():
+    check = load_check_regression()
+    baseline = report(index=(1.0, 10.0), filter=(1.0, 4.0), render=(0.001, 2.0))
+    current = report(index=(1.4, 12.0), filter=(1.6, 8.0), render=(0.04, 2.0))
+
+    rows = check.compare(
+        baseline, current, time_tolerance=0.5, memory_tolerance=0.25, min_seconds=0.05, min_mb=2.0
+    )
+
+    regressed = {row["stage"]: row["regressed"] for row in rows}
+    assert regressed["index"] == []
+    # Doubling the stage's own RSS growth is caught.
+    assert regressed["filter"] == ["time", "memory"]
+    # Within the absolute slack despite a 40x relative slowdown.
+    assert regressed["render"] == []
+
+
+def test_compare_reports_stages_missing_from_current_run():
+    check = load_check_regression()
+    baseline = report(index=(1.0, 100.0), extract=(1.0, 100.0))
+    current = report(index=(1.0, 100.0))
+
+    rows = check.compare(
+        baseline, current, time_tolerance=0.5, memory_tolerance=0.25, min_seconds=0.0, min_mb=0.0
+    )
+
+    assert [row["regressed"] for row in rows] == [[], ["missing"]]
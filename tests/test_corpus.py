@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from shakespeare_geo.corpus import load_places_by_play, play_distance_matrix
+from shakespeare_geo.spatial import haversine_km
+
+
+def _places(rows):
+    return pd.DataFrame(rows, columns=["normalized_place", "geocode_lat", "geocode_lon", "mention_count"])
+
+
+def test_play_distance_matrix_matches_pairwise_loop_and_is_block_invariant():
+    places_by_play = {
+        "romeo_juliet": _places([("Verona", 45.44, 10.99, 5), ("Mantua", 45.16, 10.79, 2)]),
+        "othello": _places([("Venice", 45.44, 12.33, 4), ("Cyprus", 35.1, 33.4, 3)]),
+        "tempest": _places([("Naples", 40.85, 14.27, 1), ("Tunis", 36.8, 10.18, 1)]),
+        "empty": _places([]),
+    }
+
+    mean = play_distance_matrix(places_by_play, metric="mean_haversine")
+    small_blocks = play_distance_matrix(places_by_play, metric="mean_haversine", block_cells=3)
+
+    a, b = places_by_play["romeo_juliet"], places_by_play["othello"]
+    expected = 0.0
+    for _, pa in a.iterrows():
+        for _, pb in b.iterrows():
+            weight = pa["mention_count"] / 7 * pb["mention_count"] / 7
+            expected += weight * haversine_km(
+                pa["geocode_lat"], pa["geocode_lon"], pb["geocode_lat"], pb["geocode_lon"]
+            )
+    assert np.isclose(mean.loc["romeo_juliet", "othello"], expected)
+    assert np.allclose(mean.to_numpy(), small_blocks.to_numpy(), equal_nan=True)
+    assert mean.loc["empty"].isna().all()
+
+
+def test_energy_distance_is_zero_on_diagonal_and_symmetric():
+    places_by_play = {
+        "a": _places([("Verona", 45.44, 10.99, 1)]),
+        "b": _places([("Verona", 45.44, 10.99, 3)]),
+        "c": _places([("Rome", 41.89, 12.48, 1)]),
+    }
+
+    energy = play_distance_matrix(places_by_play, metric="energy")
+
+    assert np.allclose(np.diag(energy), 0.0)
+    assert np.isclose(energy.loc["a", "b"], 0.0)
+    assert energy.loc["a", "c"] > 0
+    assert np.allclose(energy.to_numpy(), energy.to_numpy().T)
+
+
+def test_load_places_by_play_reads_play_ids_from_filenames(tmp_path):
+    _places([("Verona", 45.44, 10.99, 1)]).to_csv(tmp_path / "romeo_juliet_places.csv", index=False)
+    (tmp_path / "romeo_juliet_mentions.csv").write_text("ignored\n")
+
+    assert list(load_places_by_play(tmp_path)) == ["romeo_juliet"]
@@ -1,4 +1,13 @@
-from shakespeare_geo.gutenberg import strip_gutenberg_header_footer, trim_play_front_matter
+import hashlib
+import json
+
+from shakespeare_geo.gutenberg import (
+    mirror_gutenberg_source,
+    read_source_slice,
+    split_complete_works,
+    strip_gutenberg_header_footer,
+    trim_play_front_matter,
+)
 
 
 def test_strip_gutenberg_header_footer_extracts_body():
@@ -46,3 +55,165 @@ Verona.
 """
     trimmed = trim_play_front_matter(text)
     assert trimmed.startswith("ACT I\nSCENE I. A public place.")
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=b"", headers=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+        self.encoding = "utf-8"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start : start + chunk_size]
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, headers, stream, timeout):
+        assert stream
+        self.requests.append(headers)
+        return self.responses.pop(0)
+
+
+def test_mirror_gutenberg_source_revalidates_with_conditional_get(tmp_path):
+    url = "https://example.org/files/1513/1513-0.txt"
+    body = "ROMEO. Verona.\n".encode() * 10_000
+    session = FakeSession(
+        [
+            FakeResponse(200, body, {"ETag": '"abc"', "Last-Modified": "Tue, 01 Oct 2024 00:00:00 GMT"}),
+            FakeResponse(304),
+        ]
+    )
+
+    path, meta = mirror_gutenberg_source(url, mirror_dir=tmp_path, session=session)
+    assert meta["status"] == 200
+    assert path.read_bytes() == body
+    assert meta["bytes"] == len(body)
+    assert session.requests[0] == {}
+
+    path_again, meta_again = mirror_gutenberg_source(url, mirror_dir=tmp_path, session=session)
+    assert meta_again["status"] == 304
+    assert path_again == path and path.read_bytes() == body
+    assert session.requests[1] == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Tue, 01 Oct 2024 00:00:00 GMT",
+    }
+
+
+COMPLETE_WORKS = """﻿The Project Gutenberg eBook of The Complete Works of William Shakespeare
+*** START OF THE PROJECT GUTENBERG EBOOK THE COMPLETE WORKS OF WILLIAM SHAKESPEARE ***
+The Complete Works of William Shakespeare
+
+                    Contents
+
+    THE SONNETS
+    THE TRAGEDY OF ROMEO AND JULIET
+    THE TEMPEST
+
+
+
+THE SONNETS
+
+                    1
+
+From fairest creatures we desire increase,
+
+THE TRAGEDY OF ROMEO AND JULIET
+
+Contents
+
+ACT I
+Scene I. A public place.
+
+Dramatis Personæ
+
+ROMEO, son to Montague.
+
+THE PROLOGUE
+
+CHORUS.
+In fair Verona, where we lay our scene,
+
+ACT I
+
+SCENE I. A public place.
+ROMEO.
+Mantua’s not far.
+
+
+THE TEMPEST
+
+ACT I
+SCENE I. On a ship at sea.
+MASTER.
+Boatswain!
+
+*** END OF THE PROJECT GUTENBERG EBOOK THE COMPLETE WORKS OF WILLIAM SHAKESPEARE ***
+Footer line
+"""
+
+
+def test_split_complete_works_writes_plays_and_manifest(tmp_path):
+    source = tmp_path / "pg100.txt"
+    source.write_bytes(COMPLETE_WORKS.replace("\n", "\r\n").encode("utf-8"))
+
+    manifest = split_complete_works(source, tmp_path / "plays")
+
+    assert [entry["play_id"] for entry in manifest["plays"]] == ["romeo_juliet", "tempest"]
+    romeo = manifest["plays"][0]
+    romeo_text = (tmp_path / "plays" / "romeo_juliet.txt").read_text(encoding="utf-8")
+    assert romeo_text.startswith("THE PROLOGUE\n\nCHORUS.")
+    assert romeo_text.endswith("Mantua’s not far.")
+    assert romeo["title"] == "THE TRAGEDY OF ROMEO AND JULIET"
+    assert romeo["sha256"] == hashlib.sha256(romeo_text.encode("utf-8")).hexdigest()
+    assert manifest["source_sha256"] == hashlib.sha256(source.read_bytes()).hexdigest()
+    assert not (tmp_path / "plays" / "sonnets.txt").exists()
+
+    for entry in manifest["plays"]:
+        text = (tmp_path / "plays" / f"{entry['play_id']}.txt").read_text(encoding="utf-8")
+        assert read_source_slice(source, entry) == text
+        assert trim_play_front_matter(text) == text
+
+    on_disk = json.loads((tmp_path / "plays" / "manifest.json").read_text())
+    assert on_disk == manifest
+
+
+def test_strip_gutenberg_header_footer_streams_file_objects(tmp_path):
+    text = """Header line
+*** START OF THE PROJECT GUTENBERG EBOOK ROMEO AND JULIET ***
+Contents
+ACT I
+Dramatis Personae
+ROMEO
+ACT I
+SCENE I. A public place.
+*** END OF THE PROJECT GUTENBERG EBOOK ROMEO AND JULIET ***
+"""
+    path = tmp_path / "play.txt"
+    path.write_text(text)
+
+    with path.open() as handle:
+        streamed = strip_gutenberg_header_footer(handle)
+
+    assert streamed == trim_play_front_matter(strip_gutenberg_header_footer(text))
+    assert streamed == "ACT I\nSCENE I. A public place."
+
+
+def test_strip_gutenberg_header_footer_without_markers_returns_streamed_input():
+    lines = iter(["No markers\r\n", "ACT I\n"])
+    assert strip_gutenberg_header_footer(lines) == "No markers\r\nACT I\n"
@@ -0,0 +1,158 @@
+import math
+
+import pandas as pd
+
+import shakespeare_geo.map as map_module
+from shakespeare_geo.map import build_corpus_map, build_map, places_to_feature_collection
+
+
+PLACES = [
+    {"geocode_name": "Verona, Veneto, Italia", "geocode_lat": 45.4384, "geocode_lon": 10.9916, "mention_count": 3},
+    {"normalized_place": "Mantua", "geocode_lat": 45.1564, "geocode_lon": 10.7914, "mention_count": 1},
+    {"normalized_place": "Nowhere", "geocode_lat": math.nan, "geocode_lon": 1.0},
+]
+
+
+def test_places_to_feature_collection_skips_unlocated_places():
+    collection = places_to_feature_collection(PLACES)
+
+    assert collection["type"] == "FeatureCollection"
+    assert [f["properties"]["name"] for f in collection["features"]] == [
+        "Verona, Veneto, Italia",
+        "Mantua",
+    ]
+    assert collection["features"][0]["geometry"]["coordinates"] == [10.9916, 45.4384]
+
+
+def test_build_map_geojson_mode_emits_one_layer_instead_of_per_marker_blocks(tmp_path):
+    markers_path = tmp_path / "markers.html"
+    geojson_path = tmp_path / "geojson.html"
+
+    build_map(45.0, 11.0, PLACES, str(markers_path))
+    build_map(45.0, 11.0, PLACES, str(geojson_path), mode="geojson")
+
+    markers_html = markers_path.read_text()
+    geojson_html = geojson_path.read_text()
+    assert markers_html.count("L.circleMarker(") == 2
+    assert geojson_html.count("L.geoJSON(") == 1
+    assert "L.markerClusterGroup" in geojson_html
+    assert "FeatureCollection" in geojson_html
+
+
+def _write_places(path, rows):
+    pd.DataFrame(
+        rows, columns=["normalized_place", "geocode_name", "geocode_lat", "geocode_lon", "mention_count"]
+    ).to_csv(path, index=False)
+
+
+def test_build_corpus_map_only_rebuilds_changed_play_layers(tmp_path, monkeypatch):
+    romeo = tmp_path / "romeo_juliet_places.csv"
+    othello = tmp_path / "othello_places.csv"
+    _write_places(romeo, [("Verona", "Verona, Veneto, Italia", 45.4384, 10.9916, 3)])
+    _write_places(othello, [("Venice", None, 45.4371, 12.3326, 2)])
+    cache_dir = tmp_path / "layers"
+    output = tmp_path / "corpus.html"
+
+    build_corpus_map({"romeo_juliet": romeo, "othello": othello}, str(output), cache_dir)
+    html = output.read_text()
+    assert html.count("L.geoJSON(") == 2
+    assert "Corpus CoG (2 plays)" in html
+
+    read_paths = []
+    real_read_csv = map_module.pd.read_csv
+    monkeypatch.setattr(
+        map_module.pd,
+        "read_csv",
+        lambda path, *args, **kwargs: read_paths.append(path) or real_read_csv(path, *args, **kwargs),
+    )
+    _write_places(othello, [("Venice", None, 45.4371, 12.3326, 5)])
+    tempest = tmp_path / "tempest_places.csv"
+    _write_places(tempest, [("Naples", None, 40.8518, 14.2681, 1)])
+
+    build_corpus_map(
+        {"romeo_juliet": romeo, "othello": othello, "tempest": tempest},
+        str(output),
+        cache_dir,
+        titles={"tempest": "The Tempest"},
+    )
+
+    assert read_paths == [othello, tempest]
+    assert "The Tempest" in output.read_text()
+
+
+def test_build_map_offline_inlines_assets_and_skips_tiles(tmp_path, monkeypatch):
+    fetched = []
+
+    def fake_get(url, timeout):
+        raise AssertionError(f"unexpected network fetch: {url}")
+
+    def fake_fetch(url, cache_dir, timeout_s=30):
+        fetched.append(url)
+        return f"/* {url.rsplit('/', 1)[-1]} */"
+
+    monkeypatch.setattr(map_module.requests, "get", fake_get)
+    monkeypatch.setattr(map_module, "fetch_map_asset", fake_fetch)
+    output_path = tmp_path / "offline.html"
+
+    build_map(45.0, 11.0, PLACES, str(output_path), offline=True, asset_cache_dir=tmp_path)
+
+    html = output_path.read_text()
+    assert "<script src=" not in html
+    assert '<link rel="stylesheet"' not in html
+    assert "tile.openstreetmap" not in html
+    assert "/* leaflet.js */" in html
+    assert any("markercluster" in url for url in fetched)
+    assert not any("jquery" in url or "bootstrap" in url for url in fetched)
+    assert html.count("L.geoJSON(") == 1
+
+
+def test_fetch_map_asset_reads_from_cache(tmp_path, monkeypatch):
+    calls = []
+
+    class Response:
+        text = "L = {};"
+        encoding = "utf-8"
+
+        def raise_for_status(self):
+            pass
+
+    def fake_get(url, timeout):
+        calls.append(url)
+        return Response()
+
+    monkeypatch.setattr(map_module.requests, "get", fake_get)
+    url = "https://cdn.example.org/leaflet.js"
+
+    assert map_module.fetch_map_asset(url, tmp_path) == "L = {};"
+    assert map_module.fetch_map_asset(url, tmp_path) == "L = {};"
+    assert calls == [url]
+
+
+def test_build_corpus_map_offline_has_no_relative_image_urls(tmp_path, monkeypatch):
+    def fake_fetch(url, cache_dir, timeout_s=30):
+        if url.endswith(".css"):
+            return (
+                ".leaflet-default-icon-path { background-image: url(images/marker-icon.png); }\n"
+                ".leaflet-control-layers-toggle { background-image: url('images/layers.png'); }\n"
+                ".keep { background-image: url(data:image/png;base64,AAAA); }"
+            )
+        return f"/* {url.rsplit('/', 1)[-1]} */"
+
+    monkeypatch.setattr(map_module, "fetch_map_asset", fake_fetch)
+    places = tmp_path / "romeo_juliet_places.csv"
+    _write_places(places, [("Verona", "Verona, Veneto, Italia", 45.4384, 10.9916, 3)])
+    output = tmp_path / "corpus.html"
+
+    build_corpus_map(
+        {"romeo_juliet": places},
+        str(output),
+        tmp_path / "layers",
+        offline=True,
+        asset_cache_dir=tmp_path,
+    )
+
+    html = output.read_text()
+    assert "images/" not in html
+    assert "url(data:image/png;base64,AAAA)" in html
+    assert "L.marker(" not in html
+    assert "Corpus CoG (1 plays)" in html
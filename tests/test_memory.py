@@ -0,0 +1,33 @@
+import json
+import tracemalloc
+
+from shakespeare_geo import memory
+from shakespeare_geo.checkpoint import CheckpointStore
+
+
+def test_memory_tracking_reports_peak_retained_and_retained_sites(tmp_path):
+    store = CheckpointStore(tmp_path / "checkpoints")
+    kept = []
+
+    def build_stage() -> int:
+        scratch = [bytes(1024) for _ in range(4096)]  # ~4 MB, freed on return
+        kept.extend(bytearray(1024) for _ in range(1024))  # ~1 MB, retained
+        return len(scratch)
+
+    with memory.tracking(top=3) as tracker:
+        store.run("aggregate", "key", build_stage)
+    assert not tracemalloc.is_tracing()
+    assert memory.stage("ignored") is memory._NO_STAGE
+
+    stage = tracker.stages["aggregate"]
+    assert stage["peak_mb"] > 4
+    assert 0.9 < stage["retained_mb"] < stage["peak_mb"]
+    sites = [site["site"] for site in stage["retained_sites"]]
+    assert len(sites) <= 3
+    assert sites[0].endswith("test_memory.py:14")
+    # The freed scratch list counts towards the peak but is not retained.
+    assert not any(site.endswith("test_memory.py:13") for site in sites)
+
+    payload = json.loads(tracker.write(tmp_path / "memory.json").read_text())
+    assert payload["stages"]["aggregate"]["retained_mb"] == stage["retained_mb"]
+    assert "test_memory.py:14" in tracker.summary_table()
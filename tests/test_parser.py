@@ -1,7 +1,12 @@
+import numpy as np
+
 from shakespeare_geo.parser import (
+    context_indices_for_spans,
     extract_sentence_for_span,
+    find_context_for_span,
     find_span_for_text,
     index_text_lines,
+    sentences_for_spans,
 )
 
 
@@ -48,3 +53,28 @@ def test_index_text_lines_marks_dialogue_only_for_spoken_lines():
     assert by_text["ROMEO."].is_dialogue is False
     assert by_text["To Mantua I go."].is_dialogue is True
     assert by_text[" Enter BENVOLIO."].is_dialogue is False
+
+
+def test_batched_span_lookups_match_single_span_helpers():
+    text = "ACT I\nSCENE I\nROMEO.\nIn fair Verona, where we lay our scene.\nFrom Mantua? No.\n"
+    contexts = index_text_lines(text)
+    spans = [
+        find_span_for_text(text, "Verona")[:2],
+        find_span_for_text(text, "Mantua")[:2],
+        (0, 3),
+        (len(text) - 1, None),
+        (None, None),
+    ]
+    starts = [start for start, _ in spans]
+    ends = [end for _, end in spans]
+
+    assert sentences_for_spans(text, starts, ends) == [
+        extract_sentence_for_span(text, start, end) for start, end in spans
+    ]
+
+    positions = np.array([start or 0 for start in starts] + [len(text) + 5])
+    expected = [find_context_for_span(contexts, int(position)) for position in positions]
+    assert [
+        contexts[index] if index >= 0 else None
+        for index in context_indices_for_spans(contexts, positions)
+    ] == expected
@@ -0,0 +1,31 @@
+import pstats
+import time
+
+from shakespeare_geo import profiling
+from shakespeare_geo.checkpoint import CheckpointStore
+
+
+def busy_filter_stage() -> int:
+    deadline = time.perf_counter() + 0.05
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(100))
+    return total
+
+
+def test_profiling_writes_pstats_and_collapsed_stacks_per_stage(tmp_path):
+    store = CheckpointStore(tmp_path / "checkpoints")
+
+    with profiling.profiling(tmp_path / "profile") as profiler:
+        store.run("filter", "key", busy_filter_stage)
+    assert profiling.stage("ignored") is profiling._NO_STAGE
+
+    stats = pstats.Stats(str(tmp_path / "profile" / "filter.pstats"))
+    assert any(func[2] == "busy_filter_stage" for func in stats.stats)
+
+    lines = (tmp_path / "profile" / "stacks.collapsed").read_text().splitlines()
+    assert lines and all(line.startswith("filter;") for line in lines)
+    _, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert any("busy_filter_stage (test_profiling.py" in line for line in lines)
+    assert profiler.pstats_paths == {"filter": tmp_path / "profile" / "filter.pstats"}
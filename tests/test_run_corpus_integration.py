@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import importlib.util
+import json
+import multiprocessing
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from test_run_play_integration import FakeExtraction, find_span, load_run_play_module
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+PLAY_TEXT = "ACT I\nSCENE I\nROMEO.\nVerona and Mantua.\n"
+GEOCODES = {
+    "Verona": {
+        "geocode_name": "Verona, Veneto, Italy",
+        "geocode_lat": 45.4384,
+        "geocode_lon": 10.9916,
+        "geocode_precision": "city",
+        "geocode_addresstype": "city",
+        "geocode_class": "place",
+        "geocode_id": "relation:44874",
+    },
+    "Mantua": {
+        "geocode_name": "Mantua, Lombardia, Italy",
+        "geocode_lat": 45.1564,
+        "geocode_lon": 10.7914,
+        "geocode_precision": "city",
+        "geocode_addresstype": "city",
+        "geocode_class": "place",
+        "geocode_id": "relation:44550",
+    },
+}
+
+
+def load_run_corpus_module(monkeypatch):
+    load_run_play_module(REPO_ROOT)
+    monkeypatch.syspath_prepend(str(REPO_ROOT / "scripts"))
+    monkeypatch.delitem(sys.modules, "run_play", raising=False)
+    spec = importlib.util.spec_from_file_location(
+        "run_corpus_module", REPO_ROOT / "scripts" / "run_corpus.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    # Registered so the process pool can pickle run_one by reference.
+    monkeypatch.setitem(sys.modules, "run_corpus_module", module)
+    spec.loader.exec_module(module)
+    return module
+
+
+def install_fakes(monkeypatch, run_play, failing_play: str | None = None):
+    def fake_extract_places(text: str, model_id: str):
+        if failing_play and "Tempest" in text:
+            raise RuntimeError("LLM timeout")
+        verona = find_span(text, "Verona")
+        mantua = find_span(text, "Mantua")
+        return [
+            FakeExtraction("Verona", *verona, "Verona"),
+            FakeExtraction("Mantua", *mantua, "Mantua"),
+        ]
+
+    def fake_geocode_place(query, session, user_agent, email, cache):
+        cache[query] = GEOCODES.get(query)
+        return cache[query]
+
+    monkeypatch.setattr(run_play, "extract_places", fake_extract_places)
+    monkeypatch.setattr(run_play, "geocode_place", fake_geocode_place)
+    monkeypatch.setattr(run_play, "build_map", lambda *args, **kwargs: None)
+
+
+def write_plays(tmp_path: Path) -> Path:
+    plays_dir = tmp_path / "data" / "plays"
+    plays_dir.mkdir(parents=True)
+    (plays_dir / "romeo_juliet.txt").write_text(PLAY_TEXT)
+    (plays_dir / "tempest.txt").write_text(PLAY_TEXT.replace("ROMEO.", "Tempest.\nPROSPERO."))
+    manifest = {
+        "plays": [
+            {"play_id": "romeo_juliet", "title": "Romeo and Juliet", "kind": "play", "path": str(plays_dir / "romeo_juliet.txt")},
+            {"play_id": "sonnets", "title": "The Sonnets", "kind": "poem", "path": str(plays_dir / "sonnets.txt")},
+            {"play_id": "tempest", "title": "The Tempest", "kind": "play", "path": str(plays_dir / "tempest.txt")},
+        ]
+    }
+    manifest_path = plays_dir / "manifest.json"
+    manifest_path.write_text(json.dumps(manifest))
+    return manifest_path
+
+
+def corpus_argv(manifest_path: Path, workers: int) -> list[str]:
+    return [
+        "--manifest",
+        str(manifest_path),
+        "--workers",
+        str(workers),
+        "--nominatim-email",
+        "test@example.com",
+        "--bootstrap-resamples",
+        "0",
+    ]
+
+
+def test_run_corpus_isolates_failing_plays_and_writes_summary(tmp_path, monkeypatch):
+    run_corpus = load_run_corpus_module(monkeypatch)
+    install_fakes(monkeypatch, run_corpus.run_play, failing_play="tempest")
+    monkeypatch.chdir(tmp_path)
+    manifest_path = write_plays(tmp_path)
+
+    run_corpus.main(corpus_argv(manifest_path, workers=1))
+
+    summary = pd.read_csv(tmp_path / "outputs" / "corpus_summary.csv")
+    assert summary["play_id"].tolist() == ["romeo_juliet", "tempest"]
+    assert summary["status"].tolist() == ["ok", "failed"]
+    assert "LLM timeout" in summary.loc[1, "error"]
+    assert int(summary.loc[0, "spatial"]) == 2
+    assert (tmp_path / "outputs" / "romeo_juliet_places.csv").exists()
+
+    cache = json.loads((tmp_path / "data" / "geocode_cache.json").read_text())
+    assert sorted(cache) == ["Mantua", "Verona"]
+
+
+@pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork",
+    reason="workers only inherit the monkeypatched fakes when forked",
+)
+def test_run_corpus_process_pool_shares_geocode_cache(tmp_path, monkeypatch):
+    run_corpus = load_run_corpus_module(monkeypatch)
+    install_fakes(monkeypatch, run_corpus.run_play)
+    monkeypatch.chdir(tmp_path)
+    manifest_path = write_plays(tmp_path)
+
+    run_corpus.main(
+        corpus_argv(manifest_path, workers=2) + ["--parquet", "--combined", "parquet"]
+    )
+
+    summary = pd.read_csv(tmp_path / "outputs" / "corpus_summary.csv")
+    assert summary["status"].tolist() == ["ok", "ok"]
+    cache = json.loads((tmp_path / "data" / "geocode_cache.json").read_text())
+    assert sorted(cache) == ["Mantua", "Verona"]
+
+    combined = pd.read_parquet(tmp_path / "outputs" / "corpus" / "mentions.parquet")
+    assert sorted(combined["play_id"]) == ["romeo_juliet", "romeo_juliet", "tempest", "tempest"]
+    places = pd.read_csv(tmp_path / "outputs" / "corpus" / "places.csv")
+    assert places["mention_count"].tolist() == [2, 2]
+
+
+def test_run_corpus_passes_trace_and_memory_options_to_each_play(tmp_path, monkeypatch):
+    run_corpus = load_run_corpus_module(monkeypatch)
+    install_fakes(monkeypatch, run_corpus.run_play)
+    monkeypatch.chdir(tmp_path)
+    manifest_path = write_plays(tmp_path)
+
+    run_corpus.main(corpus_argv(manifest_path, workers=1) + ["--trace", "--trace-memory"])
+
+    for play_id in ("romeo_juliet", "tempest"):
+        trace_payload = json.loads((tmp_path / "outputs" / f"{play_id}_trace.json").read_text())
+        assert trace_payload["counters"]["mentions_kept"] == 2
+        memory_payload = json.loads((tmp_path / "outputs" / f"{play_id}_memory.json").read_text())
+        assert "aggregate" in memory_payload["stages"]
+
+
+@pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork",
+    reason="workers only inherit the monkeypatched fakes when forked",
+)
+def test_run_corpus_times_plays_whose_worker_died(tmp_path, monkeypatch):
+    run_corpus = load_run_corpus_module(monkeypatch)
+    install_fakes(monkeypatch, run_corpus.run_play)
+
+    def dying_extract_places(text: str, model_id: str):
+        if "Tempest" in text:
+            os._exit(1)
+        return [FakeExtraction("Verona", *find_span(text, "Verona"), "Verona")]
+
+    monkeypatch.setattr(run_corpus.run_play, "extract_places", dying_extract_places)
+    monkeypatch.chdir(tmp_path)
+    manifest_path = write_plays(tmp_path)
+
+    run_corpus.main(corpus_argv(manifest_path, workers=2))
+
+    summary = pd.read_csv(tmp_path / "outputs" / "corpus_summary.csv").set_index("play_id")
+    assert summary.loc["tempest", "status"] == "failed"
+    assert "BrokenProcessPool" in summary.loc["tempest", "error"]
+    assert summary["seconds"].notna().all()
+
+
+class CountingLimit:
+    def __init__(self):
+        self.acquired = 0
+
+    def __enter__(self):
+        self.acquired += 1
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+def test_geocode_limit_is_only_taken_for_cache_misses(tmp_path, monkeypatch):
+    run_corpus = load_run_corpus_module(monkeypatch)
+    run_play = run_corpus.run_play
+    install_fakes(monkeypatch, run_play)
+    monkeypatch.chdir(tmp_path)
+    args = run_play.parse_args(
+        ["--play-id", "romeo_juliet", "--title", "Romeo and Juliet", "--nominatim-email", "test@example.com"]
+    )
+    cache = {"Verona": GEOCODES["Verona"]}
+    limit = CountingLimit()
+
+    results = run_play.geocode_queries(["Verona", "Mantua"], args, cache, geocode_limit=limit)
+
+    assert results == GEOCODES
+    assert limit.acquired == 1
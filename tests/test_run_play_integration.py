@@ -2,12 +2,17 @@ from __future__ import annotations
 
 import argparse
 import importlib.util
+import json
 import sys
+import threading
+import time
 import types
 from pathlib import Path
 
 import pandas as pd
 
+from shakespeare_geo.tables import read_rejections, read_table
+
 
 class FakeExtraction:
     def __init__(
@@ -60,6 +65,30 @@ def load_run_play_module(repo_root: Path):
     return module
 
 
+def make_args(run_play, **overrides) -> argparse.Namespace:
+    args = run_play.parse_args(
+        [
+            "--play-id",
+            "romeo_juliet",
+            "--title",
+            "Romeo and Juliet",
+            "--gutenberg-url",
+            "https://example.org/romeo.txt",
+            "--model",
+            "gpt-4o-mini",
+            "--user-agent",
+            "shakespeare-geo/0.1 (test@example.com)",
+            "--nominatim-email",
+            "test@example.com",
+            "--output-dir",
+            "outputs",
+        ]
+    )
+    for key, value in overrides.items():
+        setattr(args, key, value)
+    return args
+
+
 def find_span(text: str, needle: str, start_at: int = 0) -> tuple[int, int]:
     start = text.find(needle, start_at)
     assert start >= 0, f"Needle not found: {needle}"
@@ -73,17 +102,9 @@ def test_run_play_main_writes_outputs(tmp_path, monkeypatch):
     play_text = "ACT I\nSCENE I\nROMEO.\nVerona.\nBENVOLIO.\nMantua.\nROMEO.\nVerona.\n"
 
     monkeypatch.chdir(tmp_path)
-    args = argparse.Namespace(
-        play_id="romeo_juliet",
-        title="Romeo and Juliet",
-        gutenberg_url="https://example.org/romeo.txt",
-        model="gpt-4o-mini",
-        user_agent="shakespeare-geo/0.1 (test@example.com)",
-        nominatim_email="test@example.com",
-        output_dir="outputs",
-    )
+    args = make_args(run_play)
     monkeypatch.setattr(run_play, "parse_args", lambda: args)
-    monkeypatch.setattr(run_play, "fetch_gutenberg_text", lambda url: play_text)
+    monkeypatch.setattr(run_play, "fetch_gutenberg_text", lambda url, **kwargs: play_text)
     monkeypatch.setattr(run_play, "strip_gutenberg_header_footer", lambda text: text)
 
     def fake_extract_places(text: str, model_id: str):
@@ -127,7 +148,8 @@ def test_run_play_main_writes_outputs(tmp_path, monkeypatch):
         lambda query, session, user_agent, email, cache: geocode_lookup.get(query),
     )
 
-    def fake_build_map(center_lat, center_lon, places, output_path):
+    def fake_build_map(center_lat, center_lon, places, output_path, confidence_region=None, mode=None, **kwargs):
+        assert confidence_region is not None
         Path(output_path).write_text(f"center={center_lat:.4f},{center_lon:.4f}")
 
     monkeypatch.setattr(run_play, "build_map", fake_build_map)
@@ -162,20 +184,32 @@ def test_run_play_main_writes_outputs(tmp_path, monkeypatch):
     assert str(verona_row["mention_sentence"]).strip() != ""
     assert len(rejections_df) == 0
 
+    trajectory_df = pd.read_csv(tmp_path / "outputs" / "romeo_juliet_trajectory.csv")
+    act_row = trajectory_df[trajectory_df["level"] == "act"].iloc[0]
+    assert act_row["act"] == "ACT I"
+    assert int(act_row["mention_count"]) == 3
+    speakers = trajectory_df[trajectory_df["level"] == "speaker"]["speaker"].tolist()
+    assert speakers == ["ROMEO", "BENVOLIO"]
+
+    confidence_df = pd.read_csv(tmp_path / "outputs" / "romeo_juliet_cog_confidence.csv")
+    assert confidence_df["level"].tolist() == ["play", "act"]
+    play_ci = confidence_df.iloc[0]
+    assert play_ci["lat_low"] <= play_ci["center_lat"] <= play_ci["lat_high"]
+
+    cog_partial = json.loads((tmp_path / "outputs" / "romeo_juliet_cog.json").read_text())
+    assert cog_partial["play_id"] == "romeo_juliet"
+    assert cog_partial["accumulator"]["count"] == 3
+
 
 def test_run_play_requires_real_nominatim_identity(tmp_path, monkeypatch):
     repo_root = Path(__file__).resolve().parents[1]
     run_play = load_run_play_module(repo_root)
 
     monkeypatch.chdir(tmp_path)
-    args = argparse.Namespace(
-        play_id="romeo_juliet",
-        title="Romeo and Juliet",
-        gutenberg_url="https://example.org/romeo.txt",
-        model="gpt-4o-mini",
+    args = make_args(
+        run_play,
         user_agent="shakespeare-geo/0.1 (contact: you@example.com)",
         nominatim_email=None,
-        output_dir="outputs",
     )
     monkeypatch.setattr(run_play, "parse_args", lambda: args)
 
@@ -193,17 +227,9 @@ def test_run_play_rejects_country_and_person_like_mentions(tmp_path, monkeypatch
     play_text = "ACT I\nSCENE I\nROMEO.\nFriar John went from Italy to Verona.\n"
 
     monkeypatch.chdir(tmp_path)
-    args = argparse.Namespace(
-        play_id="romeo_juliet",
-        title="Romeo and Juliet",
-        gutenberg_url="https://example.org/romeo.txt",
-        model="gpt-4o-mini",
-        user_agent="shakespeare-geo/0.1 (test@example.com)",
-        nominatim_email="test@example.com",
-        output_dir="outputs",
-    )
+    args = make_args(run_play)
     monkeypatch.setattr(run_play, "parse_args", lambda: args)
-    monkeypatch.setattr(run_play, "fetch_gutenberg_text", lambda url: play_text)
+    monkeypatch.setattr(run_play, "fetch_gutenberg_text", lambda url, **kwargs: play_text)
     monkeypatch.setattr(run_play, "strip_gutenberg_header_footer", lambda text: text)
 
     def fake_extract_places(text: str, model_id: str):
@@ -245,7 +271,7 @@ def test_run_play_rejects_country_and_person_like_mentions(tmp_path, monkeypatch
     monkeypatch.setattr(
         run_play,
         "build_map",
-        lambda center_lat, center_lon, places, output_path: Path(output_path).write_text("ok"),
+        lambda center_lat, center_lon, places, output_path, **kwargs: Path(output_path).write_text("ok"),
     )
 
     run_play.main()
@@ -270,17 +296,9 @@ def test_run_play_infers_span_context_when_extraction_offsets_missing(tmp_path,
     )
 
     monkeypatch.chdir(tmp_path)
-    args = argparse.Namespace(
-        play_id="romeo_juliet",
-        title="Romeo and Juliet",
-        gutenberg_url="https://example.org/romeo.txt",
-        model="gpt-4o-mini",
-        user_agent="shakespeare-geo/0.1 (test@example.com)",
-        nominatim_email="test@example.com",
-        output_dir="outputs",
-    )
+    args = make_args(run_play)
     monkeypatch.setattr(run_play, "parse_args", lambda: args)
-    monkeypatch.setattr(run_play, "fetch_gutenberg_text", lambda url: play_text)
+    monkeypatch.setattr(run_play, "fetch_gutenberg_text", lambda url, **kwargs: play_text)
     monkeypatch.setattr(run_play, "strip_gutenberg_header_footer", lambda text: text)
     monkeypatch.setattr(
         run_play,
@@ -306,7 +324,7 @@ def test_run_play_infers_span_context_when_extraction_offsets_missing(tmp_path,
     monkeypatch.setattr(
         run_play,
         "build_map",
-        lambda center_lat, center_lon, places, output_path: Path(output_path).write_text("ok"),
+        lambda center_lat, center_lon, places, output_path, **kwargs: Path(output_path).write_text("ok"),
     )
 
     run_play.main()
@@ -330,17 +348,9 @@ def test_run_play_skips_scene_instruction_mentions(tmp_path, monkeypatch):
     play_text = "ACT I\nSCENE I. Verona.\nROMEO.\nI travel to Mantua tonight.\n"
 
     monkeypatch.chdir(tmp_path)
-    args = argparse.Namespace(
-        play_id="romeo_juliet",
-        title="Romeo and Juliet",
-        gutenberg_url="https://example.org/romeo.txt",
-        model="gpt-4o-mini",
-        user_agent="shakespeare-geo/0.1 (test@example.com)",
-        nominatim_email="test@example.com",
-        output_dir="outputs",
-    )
+    args = make_args(run_play)
     monkeypatch.setattr(run_play, "parse_args", lambda: args)
-    monkeypatch.setattr(run_play, "fetch_gutenberg_text", lambda url: play_text)
+    monkeypatch.setattr(run_play, "fetch_gutenberg_text", lambda url, **kwargs: play_text)
     monkeypatch.setattr(run_play, "strip_gutenberg_header_footer", lambda text: text)
 
     def fake_extract_places(text: str, model_id: str):
@@ -368,7 +378,7 @@ def test_run_play_skips_scene_instruction_mentions(tmp_path, monkeypatch):
     monkeypatch.setattr(
         run_play,
         "build_map",
-        lambda center_lat, center_lon, places, output_path: Path(output_path).write_text("ok"),
+        lambda center_lat, center_lon, places, output_path, **kwargs: Path(output_path).write_text("ok"),
     )
 
     run_play.main()
@@ -393,17 +403,9 @@ def test_run_play_trims_front_matter_before_context_mapping(tmp_path, monkeypatc
     )
 
     monkeypatch.chdir(tmp_path)
-    args = argparse.Namespace(
-        play_id="romeo_juliet",
-        title="Romeo and Juliet",
-        gutenberg_url="https://example.org/romeo.txt",
-        model="gpt-4o-mini",
-        user_agent="shakespeare-geo/0.1 (test@example.com)",
-        nominatim_email="test@example.com",
-        output_dir="outputs",
-    )
+    args = make_args(run_play)
     monkeypatch.setattr(run_play, "parse_args", lambda: args)
-    monkeypatch.setattr(run_play, "fetch_gutenberg_text", lambda url: play_text)
+    monkeypatch.setattr(run_play, "fetch_gutenberg_text", lambda url, **kwargs: play_text)
     monkeypatch.setattr(run_play, "strip_gutenberg_header_footer", lambda text: text)
 
     def fake_extract_places(text: str, model_id: str):
@@ -427,7 +429,7 @@ def test_run_play_trims_front_matter_before_context_mapping(tmp_path, monkeypatc
     monkeypatch.setattr(
         run_play,
         "build_map",
-        lambda center_lat, center_lon, places, output_path: Path(output_path).write_text("ok"),
+        lambda center_lat, center_lon, places, output_path, **kwargs: Path(output_path).write_text("ok"),
     )
 
     run_play.main()
@@ -438,6 +440,22 @@ def test_run_play_trims_front_matter_before_context_mapping(tmp_path, monkeypatc
     assert mentions_df.iloc[0]["scene"] == "PROLOGUE"
 
 
+def test_load_play_text_trims_unmarked_source_even_when_strip_copies_it(tmp_path, monkeypatch):
+    repo_root = Path(__file__).resolve().parents[1]
+    run_play = load_run_play_module(repo_root)
+
+    play_text = "Contents\nACT V\nDramatis Personae\nROMEO.\n\nACT I\nSCENE I\nVerona.\n"
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(run_play, "fetch_gutenberg_text", lambda url, **kwargs: play_text)
+    # No START/END markers: an unchanged but freshly built copy comes back.
+    monkeypatch.setattr(
+        run_play, "strip_gutenberg_header_footer", lambda text: "".join(text.splitlines(True))
+    )
+
+    assert run_play.load_play_text(make_args(run_play)) == "ACT I\nSCENE I\nVerona."
+
+
 def test_run_play_rejects_subtoken_spans_like_rome_inside_romeo(tmp_path, monkeypatch):
     repo_root = Path(__file__).resolve().parents[1]
     run_play = load_run_play_module(repo_root)
@@ -445,17 +463,9 @@ def test_run_play_rejects_subtoken_spans_like_rome_inside_romeo(tmp_path, monkey
     play_text = "ACT I\nSCENE I.\nBENVOLIO.\nO Romeo, Romeo, brave Mercutio's dead.\n"
 
     monkeypatch.chdir(tmp_path)
-    args = argparse.Namespace(
-        play_id="romeo_juliet",
-        title="Romeo and Juliet",
-        gutenberg_url="https://example.org/romeo.txt",
-        model="gpt-4o-mini",
-        user_agent="shakespeare-geo/0.1 (test@example.com)",
-        nominatim_email="test@example.com",
-        output_dir="outputs",
-    )
+    args = make_args(run_play)
     monkeypatch.setattr(run_play, "parse_args", lambda: args)
-    monkeypatch.setattr(run_play, "fetch_gutenberg_text", lambda url: play_text)
+    monkeypatch.setattr(run_play, "fetch_gutenberg_text", lambda url, **kwargs: play_text)
     monkeypatch.setattr(run_play, "strip_gutenberg_header_footer", lambda text: text)
 
     def fake_extract_places(text: str, model_id: str):
@@ -483,7 +493,7 @@ def test_run_play_rejects_subtoken_spans_like_rome_inside_romeo(tmp_path, monkey
     monkeypatch.setattr(
         run_play,
         "build_map",
-        lambda center_lat, center_lon, places, output_path: Path(output_path).write_text("ok"),
+        lambda center_lat, center_lon, places, output_path, **kwargs: Path(output_path).write_text("ok"),
     )
 
     run_play.main()
@@ -506,17 +516,9 @@ def test_run_play_geocode_failure_does_not_flip_semantic_keep(tmp_path, monkeypa
     play_text = "ACT I\nSCENE I.\nROMEO.\nI go to Mantua.\n"
 
     monkeypatch.chdir(tmp_path)
-    args = argparse.Namespace(
-        play_id="romeo_juliet",
-        title="Romeo and Juliet",
-        gutenberg_url="https://example.org/romeo.txt",
-        model="gpt-4o-mini",
-        user_agent="shakespeare-geo/0.1 (test@example.com)",
-        nominatim_email="test@example.com",
-        output_dir="outputs",
-    )
+    args = make_args(run_play)
     monkeypatch.setattr(run_play, "parse_args", lambda: args)
-    monkeypatch.setattr(run_play, "fetch_gutenberg_text", lambda url: play_text)
+    monkeypatch.setattr(run_play, "fetch_gutenberg_text", lambda url, **kwargs: play_text)
     monkeypatch.setattr(run_play, "strip_gutenberg_header_footer", lambda text: text)
     monkeypatch.setattr(
         run_play,
@@ -533,7 +535,7 @@ def test_run_play_geocode_failure_does_not_flip_semantic_keep(tmp_path, monkeypa
     monkeypatch.setattr(
         run_play,
         "build_map",
-        lambda center_lat, center_lon, places, output_path: Path(output_path).write_text("ok"),
+        lambda center_lat, center_lon, places, output_path, **kwargs: Path(output_path).write_text("ok"),
     )
 
     run_play.main()
@@ -548,3 +550,494 @@ def test_run_play_geocode_failure_does_not_flip_semantic_keep(tmp_path, monkeypa
     assert mentions_df.iloc[0]["spatial_blocked_reason"] == "geocode_not_found"
     assert len(rejections_df) == 0
     assert len(places_df) == 0
+
+
+def test_run_play_merges_node_and_relation_for_same_town(tmp_path, monkeypatch):
+    repo_root = Path(__file__).resolve().parents[1]
+    run_play = load_run_play_module(repo_root)
+
+    play_text = "ACT I\nSCENE I.\nROMEO.\nVerona, fair Verona, and Verona's walls.\n"
+
+    monkeypatch.chdir(tmp_path)
+    args = make_args(run_play)
+    monkeypatch.setattr(run_play, "parse_args", lambda: args)
+    monkeypatch.setattr(run_play, "fetch_gutenberg_text", lambda url, **kwargs: play_text)
+    monkeypatch.setattr(run_play, "strip_gutenberg_header_footer", lambda text: text)
+
+    def fake_extract_places(text: str, model_id: str):
+        first = find_span(text, "Verona")
+        second = find_span(text, "fair Verona")
+        return [
+            FakeExtraction("Verona", *first, "Verona"),
+            FakeExtraction("fair Verona", *second, "Verona city"),
+        ]
+
+    geocode_lookup = {
+        "Verona": {
+            "geocode_name": "Verona, Veneto, Italia",
+            "geocode_lat": 45.4384,
+            "geocode_lon": 10.9916,
+            "geocode_precision": "administrative",
+            "geocode_addresstype": "city",
+            "geocode_class": "boundary",
+            "geocode_id": "relation:44874",
+        },
+        "Verona city": {
+            "geocode_name": "Verona, Veneto, Italia",
+            "geocode_lat": 45.4430,
+            "geocode_lon": 10.9850,
+            "geocode_precision": "city",
+            "geocode_addresstype": "city",
+            "geocode_class": "place",
+            "geocode_id": "node:26814424",
+        },
+    }
+
+    monkeypatch.setattr(run_play, "extract_places", fake_extract_places)
+    monkeypatch.setattr(
+        run_play,
+        "geocode_place",
+        lambda query, session, user_agent, email, cache: geocode_lookup.get(query),
+    )
+    monkeypatch.setattr(
+        run_play,
+        "build_map",
+        lambda center_lat, center_lon, places, output_path, **kwargs: Path(output_path).write_text("ok"),
+    )
+
+    run_play.main()
+
+    places_df = pd.read_csv(tmp_path / "outputs" / "romeo_juliet_places.csv")
+    assert len(places_df) == 1
+    assert int(places_df.iloc[0]["mention_count"]) == 2
+
+
+def test_run_play_resume_skips_stages_before_a_failed_render(tmp_path, monkeypatch):
+    repo_root = Path(__file__).resolve().parents[1]
+    run_play = load_run_play_module(repo_root)
+
+    play_text = "ACT I\nSCENE I\nROMEO.\nVerona and Mantua.\n"
+    calls = {"extract": 0, "geocode": 0, "map": 0}
+
+    def fake_extract_places(text: str, model_id: str):
+        calls["extract"] += 1
+        return [
+            FakeExtraction("Verona", *find_span(text, "Verona"), "Verona"),
+            FakeExtraction("Mantua", *find_span(text, "Mantua"), "Mantua"),
+        ]
+
+    def fake_geocode_place(query, session, user_agent, email, cache):
+        calls["geocode"] += 1
+        return {
+            "geocode_name": f"{query}, Italy",
+            "geocode_lat": 45.0 if query == "Verona" else 45.1,
+            "geocode_lon": 10.9 if query == "Verona" else 10.8,
+            "geocode_precision": "city",
+            "geocode_addresstype": "city",
+            "geocode_class": "place",
+            "geocode_id": f"relation:{query}",
+        }
+
+    def failing_build_map(*args, **kwargs):
+        raise RuntimeError("tile server down")
+
+    def fake_build_map(center_lat, center_lon, places, output_path, **kwargs):
+        calls["map"] += 1
+        Path(output_path).write_text("ok")
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(run_play, "fetch_gutenberg_text", lambda url, **kwargs: play_text)
+    monkeypatch.setattr(run_play, "extract_places", fake_extract_places)
+    monkeypatch.setattr(run_play, "geocode_place", fake_geocode_place)
+    monkeypatch.setattr(run_play, "build_map", failing_build_map)
+
+    try:
+        run_play.run(make_args(run_play, bootstrap_seed=7))
+        assert False, "Expected the render stage to fail"
+    except RuntimeError:
+        pass
+    assert calls == {"extract": 1, "geocode": 2, "map": 0}
+
+    monkeypatch.setattr(run_play, "build_map", fake_build_map)
+    summary = run_play.run(make_args(run_play, bootstrap_seed=7, resume=True))
+    assert calls == {"extract": 1, "geocode": 2, "map": 1}
+    assert summary["stages_reused"] == ["load", "index", "extract", "filter", "geocode", "aggregate"]
+    assert summary["stages_ran"] == ["render"]
+    assert summary["spatial"] == 2
+
+    summary = run_play.run(make_args(run_play, bootstrap_seed=7, from_stage="geocode"))
+    assert calls == {"extract": 1, "geocode": 4, "map": 2}
+    assert summary["stages_ran"] == ["geocode", "aggregate", "render"]
+
+    # Changing an aggregation input reruns aggregate; render is skipped again
+    # because the places and region it draws come out the same.
+    summary = run_play.run(make_args(run_play, bootstrap_seed=7, resume=True, merge_radius_km=0.0))
+    assert summary["stages_ran"] == ["aggregate"]
+    assert summary["stages_reused"][-1] == "render"
+
+
+def test_run_play_resume_redraws_map_when_cog_method_changes(tmp_path, monkeypatch):
+    repo_root = Path(__file__).resolve().parents[1]
+    run_play = load_run_play_module(repo_root)
+
+    play_text = "ACT I\nSCENE I\nROMEO.\nVerona, Verona and Mantua.\n"
+    centers = []
+
+    def fake_extract_places(text: str, model_id: str):
+        first = find_span(text, "Verona")
+        return [
+            FakeExtraction("Verona", *first, "Verona"),
+            FakeExtraction("Verona", *find_span(text, "Verona", first[1]), "Verona"),
+            FakeExtraction("Mantua", *find_span(text, "Mantua"), "Mantua"),
+        ]
+
+    def fake_geocode_place(query, session, user_agent, email, cache):
+        return {
+            "geocode_name": f"{query}, Italy",
+            "geocode_lat": 45.44 if query == "Verona" else 45.16,
+            "geocode_lon": 10.99 if query == "Verona" else 10.79,
+            "geocode_precision": "city",
+            "geocode_addresstype": "city",
+            "geocode_class": "place",
+            "geocode_id": f"relation:{query}",
+        }
+
+    def fake_build_map(center_lat, center_lon, places, output_path, **kwargs):
+        centers.append((center_lat, center_lon))
+        Path(output_path).write_text("ok")
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(run_play, "fetch_gutenberg_text", lambda url, **kwargs: play_text)
+    monkeypatch.setattr(run_play, "extract_places", fake_extract_places)
+    monkeypatch.setattr(run_play, "geocode_place", fake_geocode_place)
+    monkeypatch.setattr(run_play, "build_map", fake_build_map)
+
+    run_play.run(make_args(run_play, bootstrap_resamples=0))
+    summary = run_play.run(
+        make_args(run_play, bootstrap_resamples=0, resume=True, cog_method="geometric_median")
+    )
+
+    # Same places and no confidence region, but the CoG marker moved.
+    assert summary["stages_ran"] == ["aggregate", "render"]
+    assert len(centers) == 2
+    assert centers[1] != centers[0]
+    assert centers[1] == (summary["cog_lat"], summary["cog_lon"])
+
+
+def test_run_play_refilter_reuses_cached_extractions_and_writes_diff(tmp_path, monkeypatch):
+    repo_root = Path(__file__).resolve().parents[1]
+    run_play = load_run_play_module(repo_root)
+
+    play_text = "ACT I\nSCENE I\nROMEO.\nVerona and Mantua.\n"
+    geocodes = {
+        "Verona": {
+            "geocode_name": "Verona, Veneto, Italy",
+            "geocode_lat": 45.4384,
+            "geocode_lon": 10.9916,
+            "geocode_precision": "city",
+            "geocode_addresstype": "city",
+            "geocode_class": "place",
+            "geocode_id": "relation:44874",
+        },
+        "Mantua": {
+            "geocode_name": "Mantua, Lombardia, Italy",
+            "geocode_lat": 45.1564,
+            "geocode_lon": 10.7914,
+            "geocode_precision": "city",
+            "geocode_addresstype": "city",
+            "geocode_class": "place",
+            "geocode_id": "relation:44550",
+        },
+    }
+
+    def fake_geocode_place(query, session, user_agent, email, cache):
+        cache[query] = geocodes[query]
+        return cache[query]
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(run_play, "fetch_gutenberg_text", lambda url, **kwargs: play_text)
+    monkeypatch.setattr(
+        run_play,
+        "extract_places",
+        lambda text, model_id: [
+            FakeExtraction("Verona", *find_span(text, "Verona"), "Verona"),
+            FakeExtraction("Mantua", *find_span(text, "Mantua"), "Mantua"),
+        ],
+    )
+    monkeypatch.setattr(run_play, "geocode_place", fake_geocode_place)
+    monkeypatch.setattr(run_play, "build_map", lambda *args, **kwargs: Path(args[3]).write_text("ok"))
+    run_play.run(make_args(run_play))
+
+    def offline(*args, **kwargs):
+        raise AssertionError("refilter must not call the LLM or Nominatim")
+
+    original_prefilter = run_play.prefilter_rejection_reason
+
+    def stricter_prefilter(mention_text, normalized_place, character_lexicon):
+        if normalized_place == "Mantua":
+            return "pre_test_rule"
+        return original_prefilter(mention_text, normalized_place, character_lexicon)
+
+    monkeypatch.setattr(run_play, "extract_places", offline)
+    monkeypatch.setattr(run_play, "geocode_place", offline)
+    monkeypatch.setattr(run_play, "prefilter_rejection_reason", stricter_prefilter)
+
+    summary = run_play.run(make_args(run_play, refilter=True))
+
+    assert summary["stages_reused"][:3] == ["load", "index", "extract"]
+    assert summary["refilter_changes"] == {"kept_to_rejected": 1}
+    diff_df = pd.read_csv(summary["refilter_diff_csv"])
+    assert diff_df["mention_text"].tolist() == ["Mantua"]
+    assert diff_df["rejected_reason_after"].tolist() == ["pre_test_rule"]
+    places_df = pd.read_csv(tmp_path / "outputs" / "romeo_juliet_places.csv")
+    assert places_df["normalized_place"].tolist() == ["Verona"]
+
+
+def test_run_play_pipeline_geocodes_while_later_chunks_extract(tmp_path, monkeypatch):
+    repo_root = Path(__file__).resolve().parents[1]
+    run_play = load_run_play_module(repo_root)
+
+    play_text = "ACT I\nSCENE I\nROMEO.\nVerona.\n\nBENVOLIO.\nMantua.\n"
+    first_chunk_geocoded = threading.Event()
+
+    def fake_extract_places(text: str, model_id: str):
+        if "Mantua" in text:
+            # With one extraction worker this chunk only finishes if the
+            # first chunk's place was geocoded in the meantime.
+            assert first_chunk_geocoded.wait(timeout=5)
+            return [FakeExtraction("Mantua", *find_span(text, "Mantua"), "Mantua")]
+        return [FakeExtraction("Verona", *find_span(text, "Verona"), "Verona")]
+
+    def fake_geocode_place(query, session, user_agent, email, cache):
+        if query == "Verona":
+            first_chunk_geocoded.set()
+        return {
+            "geocode_name": f"{query}, Italy",
+            "geocode_lat": 45.0 if query == "Verona" else 45.1,
+            "geocode_lon": 10.9 if query == "Verona" else 10.8,
+            "geocode_precision": "city",
+            "geocode_addresstype": "city",
+            "geocode_class": "place",
+            "geocode_id": f"relation:{query}",
+        }
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(run_play, "fetch_gutenberg_text", lambda url, **kwargs: play_text)
+    monkeypatch.setattr(run_play, "extract_places", fake_extract_places)
+    monkeypatch.setattr(run_play, "geocode_place", fake_geocode_place)
+    monkeypatch.setattr(run_play, "build_map", lambda *args, **kwargs: Path(args[3]).write_text("ok"))
+
+    summary = run_play.run(
+        make_args(run_play, pipeline=True, extract_chunk_chars=30, extract_workers=1)
+    )
+
+    assert summary["spatial"] == 2
+    assert summary["stages_ran"][:5] == ["load", "index", "extract", "filter", "geocode"]
+    mentions_df = pd.read_csv(tmp_path / "outputs" / "romeo_juliet_mentions.csv")
+    assert mentions_df["mention_text"].tolist() == ["Verona", "Mantua"]
+    assert mentions_df["speaker"].tolist() == ["ROMEO", "BENVOLIO"]
+
+    summary = run_play.run(
+        make_args(run_play, pipeline=True, extract_chunk_chars=30, resume=True)
+    )
+    assert summary["stages_reused"][:5] == ["load", "index", "extract", "filter", "geocode"]
+
+
+def test_run_play_pipeline_extraction_error_abandons_queued_geocodes(tmp_path, monkeypatch):
+    repo_root = Path(__file__).resolve().parents[1]
+    run_play = load_run_play_module(repo_root)
+
+    play_text = "ACT I\nSCENE I\nROMEO.\nVerona, Mantua, Padua and Milan.\n\nBENVOLIO.\nVenice.\n"
+    places = ["Verona", "Mantua", "Padua", "Milan"]
+    geocoding_started = threading.Event()
+    extraction_failed = threading.Event()
+    geocoded = []
+
+    def fake_extract_places(text: str, model_id: str):
+        if "Venice" in text:
+            # Fail only once the first chunk's places are queued.
+            assert geocoding_started.wait(timeout=5)
+            extraction_failed.set()
+            raise RuntimeError("LLM quota exceeded")
+        return [FakeExtraction(place, *find_span(text, place), place) for place in places]
+
+    def fake_geocode_place(query, session, user_agent, email, cache):
+        if not geocoded:
+            geocoding_started.set()
+            assert extraction_failed.wait(timeout=5)
+        geocoded.append(query)
+        # Stands in for the Nominatim rate limit.
+        time.sleep(0.2)
+        cache[query] = {"lat": "45.0", "lon": "10.9", "display_name": query}
+        return None
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(run_play, "fetch_gutenberg_text", lambda url, **kwargs: play_text)
+    monkeypatch.setattr(run_play, "extract_places", fake_extract_places)
+    monkeypatch.setattr(run_play, "geocode_place", fake_geocode_place)
+
+    try:
+        run_play.run(make_args(run_play, pipeline=True, extract_chunk_chars=60, extract_workers=1))
+        assert False, "Expected the extraction error to propagate"
+    except RuntimeError as exc:
+        assert str(exc) == "LLM quota exceeded"
+
+    # The lookup in flight when the error arrived (at most one more) runs;
+    # the rest of the queue is dropped, and what finished is still cached.
+    assert 1 <= len(geocoded) <= 2 < len(places)
+    cache = json.loads((tmp_path / "data" / "geocode_cache.json").read_text())
+    assert set(cache) == set(geocoded)
+
+
+def test_run_play_refilter_reuses_pipelined_extractions(tmp_path, monkeypatch):
+    repo_root = Path(__file__).resolve().parents[1]
+    run_play = load_run_play_module(repo_root)
+
+    play_text = "ACT I\nSCENE I\nROMEO.\nVerona.\n\nBENVOLIO.\nMantua.\n"
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(run_play, "fetch_gutenberg_text", lambda url, **kwargs: play_text)
+    monkeypatch.setattr(
+        run_play,
+        "extract_places",
+        lambda text, model_id: [
+            FakeExtraction(place, *find_span(text, place), place)
+            for place in ("Verona", "Mantua")
+            if place in text
+        ],
+    )
+    monkeypatch.setattr(
+        run_play,
+        "geocode_place",
+        lambda query, session, user_agent, email, cache: {
+            "geocode_name": f"{query}, Italy",
+            "geocode_lat": 45.0,
+            "geocode_lon": 10.9,
+            "geocode_precision": "city",
+            "geocode_addresstype": "city",
+            "geocode_class": "place",
+            "geocode_id": f"relation:{query}",
+        },
+    )
+    monkeypatch.setattr(run_play, "build_map", lambda *args, **kwargs: Path(args[3]).write_text("ok"))
+
+    run_play.run(make_args(run_play, pipeline=True, extract_chunk_chars=30))
+
+    def no_llm(text, model_id):
+        raise AssertionError("refilter must not call the LLM")
+
+    def no_network(query, session, user_agent, email, cache):
+        raise AssertionError("refilter must not geocode")
+
+    monkeypatch.setattr(run_play, "extract_places", no_llm)
+    monkeypatch.setattr(run_play, "geocode_place", no_network)
+    summary = run_play.run(
+        make_args(run_play, pipeline=True, extract_chunk_chars=30, refilter=True)
+    )
+
+    assert summary["stages_reused"][:4] == ["load", "index", "extract", "geocode"]
+    assert summary["spatial"] == 2
+    assert summary["refilter_changes"] == {}
+
+
+def test_run_play_writes_parquet_partition_without_rejections_copy(tmp_path, monkeypatch):
+    repo_root = Path(__file__).resolve().parents[1]
+    run_play = load_run_play_module(repo_root)
+
+    play_text = "ACT I\nSCENE I\nROMEO.\nVerona and France.\n"
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(run_play, "fetch_gutenberg_text", lambda url, **kwargs: play_text)
+    monkeypatch.setattr(
+        run_play,
+        "extract_places",
+        lambda text, model_id: [
+            FakeExtraction("Verona", *find_span(text, "Verona"), "Verona"),
+            FakeExtraction("France", *find_span(text, "France"), "France", "country"),
+        ],
+    )
+    monkeypatch.setattr(
+        run_play,
+        "geocode_place",
+        lambda query, session, user_agent, email, cache: {
+            "geocode_name": "Verona, Veneto, Italy",
+            "geocode_lat": 45.4384,
+            "geocode_lon": 10.9916,
+            "geocode_precision": "city",
+            "geocode_addresstype": "city",
+            "geocode_class": "place",
+            "geocode_id": "relation:44874",
+        },
+    )
+    monkeypatch.setattr(run_play, "build_map", lambda *args, **kwargs: Path(args[3]).write_text("ok"))
+
+    summary = run_play.run(make_args(run_play, parquet=True))
+
+    parquet_root = tmp_path / "outputs" / "parquet"
+    assert summary["mentions_parquet"].endswith("mentions/play_id=romeo_juliet/part-0.parquet")
+    assert sorted(path.name for path in parquet_root.iterdir()) == ["mentions", "places"]
+    mentions = read_table(parquet_root, "mentions")
+    assert mentions["span_start"].tolist() == [
+        find_span(play_text, "Verona")[0],
+        find_span(play_text, "France")[0],
+    ]
+    assert read_rejections(parquet_root)["mention_text"].tolist() == ["France"]
+    places = read_table(parquet_root, "places")
+    assert places["play_id"].tolist() == ["romeo_juliet"]
+    assert places["mention_count"].tolist() == [1]
+
+
+def test_run_play_writes_trace_profile_and_memory_reports(tmp_path, monkeypatch, capsys):
+    repo_root = Path(__file__).resolve().parents[1]
+    run_play = load_run_play_module(repo_root)
+
+    play_text = "ACT I\nSCENE I\nROMEO.\nVerona and France.\n"
+
+    monkeypatch.chdir(tmp_path)
+    args = make_args(run_play, trace=True, profile=True, trace_memory=True)
+    monkeypatch.setattr(run_play, "parse_args", lambda: args)
+    monkeypatch.setattr(run_play, "fetch_gutenberg_text", lambda url, **kwargs: play_text)
+    monkeypatch.setattr(
+        run_play,
+        "extract_places",
+        lambda text, model_id: [
+            FakeExtraction("Verona", *find_span(text, "Verona"), "Verona"),
+            FakeExtraction("France", *find_span(text, "France"), "France", "country"),
+        ],
+    )
+    monkeypatch.setattr(
+        run_play,
+        "geocode_place",
+        lambda query, session, user_agent, email, cache: {
+            "geocode_name": "Verona, Veneto, Italy",
+            "geocode_lat": 45.4384,
+            "geocode_lon": 10.9916,
+            "geocode_precision": "city",
+            "geocode_addresstype": "city",
+            "geocode_class": "place",
+            "geocode_id": "relation:44874",
+        },
+    )
+    monkeypatch.setattr(run_play, "build_map", lambda *args, **kwargs: Path(args[3]).write_text("ok"))
+
+    run_play.main()
+
+    payload = json.loads((tmp_path / "outputs" / "romeo_juliet_trace.json").read_text())
+    assert {f"stage:{stage}" for stage in ("load", "index", "filter", "aggregate", "render")} <= set(
+        payload["totals"]
+    )
+    assert payload["totals"]["index_text_lines"]["calls"] == 1
+    counters = payload["counters"]
+    assert counters["mentions_kept"] == 1
+    assert counters["mentions_rejected"] == 1
+    assert counters["lines_indexed"] == 4
+    assert counters["bytes_written"] > 0
+    assert "stage:aggregate" in capsys.readouterr().out
+
+    profile_dir = tmp_path / "outputs" / "profile" / "romeo_juliet"
+    assert (profile_dir / "filter.pstats").exists()
+    assert (profile_dir / "stacks.collapsed").exists()
+
+    stages = json.loads((tmp_path / "outputs" / "romeo_juliet_memory.json").read_text())["stages"]
+    assert list(stages) == ["load", "index", "extract", "filter", "geocode", "aggregate", "render"]
+    assert stages["aggregate"]["peak_mb"] > 0
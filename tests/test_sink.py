@@ -0,0 +1,74 @@
+import json
+
+import pandas as pd
+
+from shakespeare_geo.sink import MentionSink
+
+
+def play_mentions(play_id: str, places: list[tuple[str, float, float]]) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "play_id": play_id,
+            "mention_text": [name for name, _, _ in places] + ["France"],
+            "normalized_place": [name for name, _, _ in places] + ["France"],
+            "mention_sentence": [f"To {name}." for name, _, _ in places] + ["In France."],
+            "span_start": range(len(places) + 1),
+            "geocode_name": [name for name, _, _ in places] + [None],
+            "geocode_lat": [lat for _, lat, _ in places] + [None],
+            "geocode_lon": [lon for _, _, lon in places] + [None],
+            "geocode_precision": ["city"] * len(places) + [None],
+            "geocode_addresstype": ["city"] * len(places) + [None],
+            "geocode_class": ["place"] * len(places) + [None],
+            "geocode_id": [f"relation:{name}" for name, _, _ in places] + [None],
+            "settlement_scope": [True] * len(places) + [False],
+            "spatial_usable": [True] * len(places) + [False],
+            "keep": [True] * len(places) + [False],
+            "rejected_reason": [None] * len(places) + ["llm_not_settlement"],
+        }
+    )
+
+
+def test_mention_sink_streams_plays_in_chunks_and_accumulates_places(tmp_path):
+    hamlet = tmp_path / "hamlet_mentions.csv"
+    play_mentions("hamlet", [("Wittenberg", 51.87, 12.65), ("Paris", 48.86, 2.35)]).to_csv(
+        hamlet, index=False
+    )
+    othello = tmp_path / "othello_mentions.csv"
+    play_mentions("othello", [("Venice", 45.44, 12.33), ("Paris", 48.86, 2.35)]).to_csv(
+        othello, index=False
+    )
+
+    with MentionSink(tmp_path, chunk_rows=2, merge_radius_km=0.0) as sink:
+        sink.add_play("hamlet", hamlet)
+        sink.add_play("othello", othello)
+    paths = sink.paths
+
+    mentions = pd.read_csv(paths["mentions"])
+    assert len(mentions) == 6
+    assert mentions["play_id"].tolist() == ["hamlet"] * 3 + ["othello"] * 3
+    rejections = pd.read_csv(paths["rejections_csv"])
+    assert rejections["mention_text"].tolist() == ["France", "France"]
+
+    places = pd.read_csv(paths["places_csv"]).set_index("normalized_place")
+    assert places["mention_count"].to_dict() == {"Paris": 2, "Venice": 1, "Wittenberg": 1}
+    assert places.loc["Paris", "mention_sentence"] == "To Paris."
+
+    cog = json.loads((tmp_path / "corpus" / "cog.json").read_text())
+    assert cog["plays"] == 2
+    assert cog["accumulator"]["count"] == 4
+
+
+def test_mention_sink_leaves_no_corpus_outputs_when_the_run_fails(tmp_path):
+    hamlet = tmp_path / "hamlet_mentions.csv"
+    play_mentions("hamlet", [("Wittenberg", 51.87, 12.65)]).to_csv(hamlet, index=False)
+
+    for fmt in ("csv", "parquet"):
+        try:
+            with MentionSink(tmp_path, fmt=fmt) as sink:
+                sink.add_play("hamlet", hamlet)
+                raise KeyboardInterrupt
+        except KeyboardInterrupt:
+            pass
+
+        assert sink.paths is None
+        assert list((tmp_path / "corpus").iterdir()) == []
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from shakespeare_geo.spatial import GridIndex, haversine_km, merge_near_duplicate_places
+
+
+def test_grid_index_nearest_and_radius_match_brute_force():
+    rng = np.random.default_rng(0)
+    lat = rng.uniform(-80, 80, size=400)
+    lon = rng.uniform(-180, 180, size=400)
+    index = GridIndex(lat, lon, cell_km=50.0)
+
+    for q_lat, q_lon in [(45.0, 11.0), (0.0, 179.9), (-60.0, -179.9), (89.0, 0.0)]:
+        distances = haversine_km(q_lat, q_lon, lat, lon)
+
+        idx, dist = index.nearest(q_lat, q_lon)
+        assert idx == int(np.argmin(distances))
+        assert np.isclose(dist, distances.min())
+
+        within = index.query_radius(q_lat, q_lon, 800.0)
+        assert within.tolist() == np.flatnonzero(distances <= 800.0).tolist()
+
+
+def test_grid_index_pairs_within_crosses_antimeridian():
+    index = GridIndex([10.0, 10.0, 10.0], [179.99, -179.99, 0.0], cell_km=5.0)
+
+    assert index.pairs_within(5.0).tolist() == [[0, 1]]
+
+
+def test_merge_near_duplicate_places_sums_counts_for_same_named_neighbours():
+    places = pd.DataFrame(
+        {
+            "normalized_place": ["Verona", "Verona", "Mantua", "Villafranca"],
+            "geocode_name": [
+                "Verona, Veneto, Italia",
+                "Verona, Veneto, Italia",
+                "Mantova, Lombardia, Italia",
+                "Villafranca di Verona, Veneto, Italia",
+            ],
+            "geocode_lat": [45.4384, 45.4420, 45.1564, 45.3540],
+            "geocode_lon": [10.9916, 10.9900, 10.7914, 10.8450],
+            "geocode_id": ["node:1", "relation:44874", "relation:44550", "node:2"],
+            "mention_count": [1, 3, 2, 1],
+        }
+    )
+
+    merged = merge_near_duplicate_places(places, radius_km=5.0)
+
+    assert merged["geocode_id"].tolist() == ["relation:44874", "relation:44550", "node:2"]
+    assert merged["mention_count"].tolist() == [4, 2, 1]
+    assert merge_near_duplicate_places(places, radius_km=0).equals(places)
@@ -0,0 +1,39 @@
+import pandas as pd
+
+from shakespeare_geo.tables import read_rejections, read_table, write_play_partition
+
+
+def test_play_partitions_round_trip_with_types(tmp_path):
+    mentions = pd.DataFrame(
+        {
+            "play_id": ["hamlet", "hamlet"],
+            "line": [12, None],
+            "mention_text": ["Wittenberg", "Norway"],
+            "span_start": [140, None],
+            "is_real_world": ["true", False],
+            "geocode_lat": [51.87, None],
+            "keep": [True, False],
+            "rejected_reason": [None, "llm_not_settlement"],
+        }
+    )
+    write_play_partition(mentions, tmp_path, "mentions", "hamlet")
+    write_play_partition(mentions.iloc[:1], tmp_path, "mentions", "othello")
+
+    loaded = read_table(tmp_path, "mentions").sort_values(["play_id", "mention_text"])
+    assert loaded["play_id"].tolist() == ["hamlet", "hamlet", "othello"]
+    assert str(loaded["span_start"].dtype) == "Int64"
+    assert str(loaded["line"].dtype) == "Int32"
+    assert str(loaded["keep"].dtype) == "boolean"
+    assert loaded["is_real_world"].tolist() == [False, True, True]
+    assert loaded["scene"].isna().all()
+
+    rejections = read_rejections(tmp_path)
+    assert rejections["mention_text"].tolist() == ["Norway"]
+    assert rejections["rejected_reason"].tolist() == ["llm_not_settlement"]
+
+    # Rewriting a play replaces its partition and leaves the others alone.
+    write_play_partition(mentions.iloc[1:], tmp_path, "mentions", "hamlet")
+    assert read_table(tmp_path, "mentions", play_ids=["hamlet"])["mention_text"].tolist() == [
+        "Norway"
+    ]
+    assert len(read_table(tmp_path, "mentions")) == 2
@@ -0,0 +1,77 @@
+import json
+import threading
+
+from shakespeare_geo import trace
+from shakespeare_geo.geocode import geocode_place
+from shakespeare_geo.parser import index_text_lines
+
+
+class FakeResponse:
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return [
+            {
+                "display_name": "Verona, Veneto, Italy",
+                "lat": "45.4384",
+                "lon": "10.9916",
+                "type": "city",
+                "class": "place",
+                "osm_type": "relation",
+                "osm_id": 44874,
+            }
+        ]
+
+
+class FakeSession:
+    def get(self, url, params=None, headers=None, timeout=None):
+        return FakeResponse()
+
+
+def test_disabled_tracing_records_nothing():
+    assert trace.active() is None
+    with trace.span("ignored"):
+        trace.count("ignored")
+    trace.count_bytes("does/not/exist")
+    assert index_text_lines("ACT I\n")[0].act == "ACT I"
+
+
+def test_spans_nest_per_thread_and_counters_sum(tmp_path):
+    def work():
+        with trace.span("worker"):
+            trace.count("items")
+
+    with trace.tracing() as tracer:
+        with trace.span("outer"):
+            with trace.span("inner"):
+                trace.count("items", 2)
+            worker = threading.Thread(target=work)
+            worker.start()
+            worker.join()
+            trace.count("items", 3)
+    assert trace.active() is None
+
+    parents = {span["name"]: span["parent"] for span in tracer.spans}
+    # The worker thread's span does not nest under this thread's "outer".
+    assert parents == {"inner": "outer", "worker": None, "outer": None}
+    assert tracer.counters == {"items": 6}
+
+    path = tracer.write(tmp_path / "trace.json")
+    payload = json.loads(path.read_text())
+    assert payload["totals"]["outer"]["calls"] == 1
+    assert payload["counters"] == {"items": 6}
+    assert "inner" in tracer.summary_table()
+
+
+def test_geocode_place_counts_cache_hits_requests_and_sleep():
+    cache = {}
+    with trace.tracing() as tracer:
+        for _ in range(2):
+            geocode_place("Verona", FakeSession(), "shakespeare-geo/0.1", None, cache, sleep_s=0)
+
+    assert tracer.counters["geocode_cache_misses"] == 1
+    assert tracer.counters["geocode_cache_hits"] == 1
+    assert tracer.counters["nominatim_requests"] == 1
+    assert tracer.counters["nominatim_sleep_s"] == 0
+    assert tracer.totals()["geocode_place"]["calls"] == 2